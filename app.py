@@ -2,18 +2,30 @@
 Interface gráfica principal do aplicativo
 """
 
-import asyncio
 import os
+import queue
+import secrets
 import threading
 from datetime import datetime
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 import tkinter as tk
-from PIL import Image, ImageTk
 
+from utils.async_runner import AsyncLoopThread
+from utils.campaign_journal import CampaignJournal
+from utils.circuit_breaker import CircuitBreaker
 from utils.config_manager import ConfigManager
+from utils.contact_store import ContactStore
+from utils.control_server import ControlServer
+from utils.db_contact_source import DBContactSource
 from utils.excel_reader import ExcelReader
+from utils.lease_store import LeasedContactSource, SQLiteLeaseStore
 from utils.logger import Logger
+from utils.profile_manager import ProfileManager
 from utils.progress_tracker import ProgressTracker
+from utils.rate_scheduler import RateScheduler
+from utils.result_sinks import ResultDispatcher
+from utils.xlsx_inspector import XlsxInspector
+from memory_watchdog import MemoryWatchdog
 from whatsapp_sender import WhatsAppSender
 
 
@@ -36,16 +48,80 @@ class App:
 
         # Variáveis de controle
         self.arquivo_excel = None
+        self.arquivos_excel = []  # Todas as planilhas selecionadas (a primeira é arquivo_excel)
+
+        # O Tk só pode ser usado na thread principal: as outras threads enfileiram
+        # as atualizações da interface, aplicadas por _poll_ui_queue
+        self._ui_thread = threading.get_ident()
+        self._ui_queue = queue.Queue()
         
         # Inicializa componentes
         self._create_widgets()
         
+        # Laço asyncio único para todas as campanhas, controlado pela interface
+        self.loop_thread = AsyncLoopThread()
+
         # Inicializa o sender com callbacks para log e progresso
         self.sender = WhatsAppSender(
             logger=Logger(self.log_msg),
             progress_tracker=ProgressTracker(self.update_progress)
         )
 
+        # Ajustes durante a campanha: spinboxes e, se configurado, endpoint local
+        self._syncing_settings = False
+        for var in (self.wait_var, self.retry_var, self.rate_var):
+            var.trace_add("write", self._on_live_setting)
+
+        self.control_server = None
+        if self.config.get("control_port"):
+            if not self.config.get("control_token"):
+                # Token gerado uma vez e guardado para os scripts que usam o endpoint
+                self.config["control_token"] = secrets.token_urlsafe(24)
+                ConfigManager.save(self.config)
+            self.control_server = ControlServer(
+                self.config["control_port"],
+                self.sender.current_settings,
+                self._apply_remote_settings,
+                self.config["control_token"],
+                self.sender.logger
+            )
+            self.control_server.start()
+
+        self._poll_ui_queue()
+
+    def _run_on_ui(self, callback, *args):
+        """Executa a chamada na thread do Tk, enfileirando-a se vier de outra thread
+
+        Não espera a execução: chamar o Tk diretamente de outra thread trava
+        enquanto a thread principal estiver ocupada (ex.: ao fechar a janela).
+
+        Args:
+            callback (callable): Função que usa widgets do Tk
+            *args: Argumentos da função
+        """
+        if threading.get_ident() == self._ui_thread:
+            callback(*args)
+        else:
+            self._ui_queue.put((callback, args))
+
+    def _poll_ui_queue(self, interval=50, max_items=500):
+        """Aplica as atualizações de interface enfileiradas por outras threads
+
+        Args:
+            interval (int): Intervalo entre verificações da fila em milissegundos
+            max_items (int): Chamadas aplicadas por verificação, para não travar a janela
+        """
+        for _ in range(max_items):
+            try:
+                callback, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except tk.TclError:
+                pass  # Janela já destruída
+        self.master.after(interval, self._poll_ui_queue)
+
     def _create_widgets(self):
         """Cria os widgets da interface"""
         self._create_logo_section()
@@ -60,11 +136,25 @@ class App:
         self.log_msg("🚀 Aplicativo iniciado. Selecione uma planilha Excel para começar.")
 
     def _create_logo_section(self):
-        """Cria a seção do logo"""
+        """Cria a seção do logo
+
+        A imagem é carregada depois que a janela aparece, para que o PIL
+        não atrase a abertura do aplicativo.
+        """
         logo_container = tk.Frame(self.master)
         logo_container.pack(fill=tk.X)
+        # Agendado na segunda passagem ociosa, depois que a janela é desenhada
+        self.master.after_idle(self.master.after_idle, self._load_logo, logo_container)
 
+    def _load_logo(self, logo_container):
+        """Carrega o logo na seção já criada
+
+        Args:
+            logo_container: Frame que recebe o logo
+        """
         try:
+            from PIL import Image, ImageTk
+
             logo_image = Image.open("topfama_logo.png")
             logo_image = logo_image.resize((250, 90), Image.LANCZOS)
             self.logo_topfama_img = ImageTk.PhotoImage(logo_image)
@@ -127,6 +217,22 @@ class App:
         profile_entry = ttk.Entry(profile_frame, textvariable=self.profile_var)
         profile_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
+        # Configuração de anexo enviado junto com as mensagens
+        attachment_frame = ttk.Frame(config_frame)
+        attachment_frame.pack(fill=tk.X, pady=2)
+
+        ttk.Label(attachment_frame, text="Anexo (opcional):").pack(side=tk.LEFT, padx=(0, 5))
+
+        self.attachment_var = tk.StringVar(value=self.config.get("attachment_path", ""))
+        attachment_entry = ttk.Entry(attachment_frame, textvariable=self.attachment_var)
+        attachment_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+
+        ttk.Button(
+            attachment_frame,
+            text="Selecionar Anexo",
+            command=self.selecionar_anexo
+        ).pack(side=tk.RIGHT)
+
         # Configuração de tempo de espera
         wait_frame = ttk.Frame(config_frame)
         wait_frame.pack(fill=tk.X, pady=2)
@@ -147,6 +253,16 @@ class App:
         retry_spinbox = ttk.Spinbox(retry_frame, from_=1, to=10, textvariable=self.retry_var, width=5)
         retry_spinbox.pack(side=tk.LEFT)
 
+        # Configuração do limite de envios por minuto
+        rate_frame = ttk.Frame(config_frame)
+        rate_frame.pack(fill=tk.X, pady=2)
+
+        ttk.Label(rate_frame, text="Limite de mensagens por minuto (0 = sem limite):").pack(side=tk.LEFT, padx=(0, 5))
+
+        self.rate_var = tk.IntVar(value=self.config.get("rate_per_minute", 0))
+        rate_spinbox = ttk.Spinbox(rate_frame, from_=0, to=60, textvariable=self.rate_var, width=5)
+        rate_spinbox.pack(side=tk.LEFT)
+
         # Opção de modo headless
         self.headless_var = tk.BooleanVar(value=self.config.get("headless", False))
         headless_check = ttk.Checkbutton(
@@ -198,6 +314,22 @@ class App:
         )
         self.stop_button.pack(side=tk.LEFT, padx=5)
 
+        self.harvest_button = ttk.Button(
+            control_frame,
+            text="Verificar Entregas",
+            command=self.verificar_entregas,
+            state=tk.DISABLED
+        )
+        self.harvest_button.pack(side=tk.RIGHT, padx=5)
+
+        self.verify_button = ttk.Button(
+            control_frame,
+            text="Verificar Números",
+            command=self.verificar_numeros,
+            state=tk.DISABLED
+        )
+        self.verify_button.pack(side=tk.RIGHT, padx=5)
+
     def _create_progress_section(self, parent):
         """Cria a seção de progresso
         
@@ -213,6 +345,10 @@ class App:
         self.progress_label = ttk.Label(progress_frame, text="0/0 mensagens processadas")
         self.progress_label.pack(anchor=tk.E, pady=2)
 
+        # Taxa de envio, sucesso, reenvios pendentes e previsão de término
+        self.stats_label = ttk.Label(progress_frame, text="")
+        self.stats_label.pack(anchor=tk.E)
+
     def _create_log_section(self, parent):
         """Cria a seção de log
         
@@ -230,40 +366,108 @@ class App:
         save_log_button.pack(anchor=tk.E, pady=5)
 
     def selecionar_arquivo(self):
-        """Seleciona o arquivo Excel com os contatos
+        """Seleciona os arquivos Excel com os contatos
         
-        Abre um diálogo para seleção de arquivo Excel e
-        verifica se o formato está correto.
+        Abre um diálogo para seleção de uma ou mais planilhas Excel (ou
+        de um banco SQLite) e verifica se o formato está correto.
         """
         # Diretório inicial baseado na última seleção
         initial_dir = self.config.get("last_directory", "")
         if not os.path.exists(initial_dir):
             initial_dir = os.path.expanduser("~")
 
-        arquivo = filedialog.askopenfilename(
-            filetypes=[("Excel Files", "*.xlsx")],
+        arquivos = filedialog.askopenfilenames(
+            filetypes=[("Excel Files", "*.xlsx"), ("Banco SQLite", "*.db *.sqlite *.sqlite3")],
             initialdir=initial_dir
         )
 
-        if arquivo:
+        if arquivos:
+            arquivo = arquivos[0]
             self.arquivo_excel = arquivo
+            # Bancos de dados são sempre uma fonte única
+            self.arquivos_excel = [arquivo] if self._is_database() else list(arquivos)
             self.path_entry.delete(0, tk.END)
-            self.path_entry.insert(0, arquivo)
+            self.path_entry.insert(0, "; ".join(self.arquivos_excel))
             self.start_button.config(state=tk.NORMAL)
+            self.harvest_button.config(state=tk.NORMAL)
+            self.verify_button.config(state=tk.NORMAL)
 
             # Salva o diretório para uso futuro
             self.config["last_directory"] = os.path.dirname(arquivo)
             ConfigManager.save(self.config)
 
-            self.log_msg(f"✅ Planilha selecionada: {arquivo}")
+            if len(self.arquivos_excel) > 1:
+                self.log_msg(f"✅ {len(self.arquivos_excel)} planilhas selecionadas, lidas em paralelo no envio.")
+            else:
+                self.log_msg(f"✅ Planilha selecionada: {arquivo}")
 
-            # Tenta ler a planilha para verificar se está no formato correto
+            # Bancos de dados são lidos em lotes só durante o envio
+            if self._is_database():
+                self.log_msg("🗄️ Contatos serão lidos do banco em lotes durante o envio "
+                             f"(consulta: {self.config.get('contact_db_query', '')})")
+                return
+
+            # Confere as planilhas em segundo plano, sem travar a janela
+            threading.Thread(target=self._inspecionar_planilhas, args=(self.arquivos_excel,),
+                             daemon=True).start()
+
+    def _inspecionar_planilhas(self, arquivos):
+        """Conta os contatos e amostra problemas das planilhas (executado em thread)
+
+        Args:
+            arquivos (list): Caminhos das planilhas selecionadas
+        """
+        for arquivo in arquivos:
             try:
-                contatos = ExcelReader.read_contacts(arquivo)
-                self.log_msg(f"📋 {len(contatos)} contatos encontrados na planilha.")
+                resultado = XlsxInspector.inspect(arquivo)
             except Exception as e:
-                messagebox.showerror("Erro", str(e))
-                self.log_msg(f"❌ Erro ao ler a planilha: {str(e)}")
+                resultado = e
+            self._run_on_ui(self._mostrar_inspecao, arquivo, resultado)
+
+    def _mostrar_inspecao(self, arquivo, resultado):
+        """Exibe no log o resultado da inspeção da planilha
+
+        Args:
+            arquivo (str): Caminho da planilha inspecionada
+            resultado (dict | Exception): Retorno de XlsxInspector.inspect ou o erro
+        """
+        if arquivo not in self.arquivos_excel:
+            return  # Outra planilha foi selecionada enquanto esta era lida
+
+        if isinstance(resultado, Exception):
+            messagebox.showerror("Erro", str(resultado))
+            self.log_msg(f"❌ Erro ao ler a planilha: {str(resultado)}")
+            return
+
+        quantidade = resultado["rows"] if resultado["exact"] else f"cerca de {resultado['rows']}"
+        nome = f"{os.path.basename(arquivo)}, " if len(self.arquivos_excel) > 1 else ""
+        self.log_msg(f"📋 {quantidade} contatos encontrados na planilha "
+                     f"({nome}aba '{resultado['sheet']}', {resultado['elapsed'] * 1000:.0f} ms).")
+        if resultado["columns"]:
+            self.log_msg(f"🗂️ Colunas: {', '.join(resultado['columns'])}")
+
+        if resultado["problem_count"]:
+            self.log_msg(f"⚠️ {resultado['problem_count']} problemas nas primeiras "
+                         f"{len(resultado['sample'])} linhas, por exemplo:")
+            for linha, telefone, problema in resultado["problems"]:
+                self.log_msg(f"  - Linha {linha}: {telefone} → {problema}")
+
+    def selecionar_anexo(self):
+        """Seleciona o arquivo enviado como anexo em todas as mensagens
+
+        O texto da mensagem de cada contato é enviado como legenda.
+        """
+        anexo = filedialog.askopenfilename(
+            filetypes=[
+                ("Imagens e Documentos", "*.png *.jpg *.jpeg *.gif *.mp4 *.pdf *.docx *.xlsx"),
+                ("Todos os Arquivos", "*.*")
+            ],
+            initialdir=self.config.get("last_directory", "") or os.path.expanduser("~")
+        )
+
+        if anexo:
+            self.attachment_var.set(anexo)
+            self.log_msg(f"📎 Anexo selecionado: {anexo}")
 
     def iniciar_envio(self):
         """Inicia o processo de envio de mensagens
@@ -283,6 +487,40 @@ class App:
         self.sender.wait_time = self.config["wait_time"]
         self.sender.headless = self.config["headless"]
         self.sender.user_data_dir = self.config["browser_profile"]
+        self.sender.profile_snapshot = self._profile_snapshot()
+        self.sender.attachment_path = self.config["attachment_path"] or None
+        self.sender.message_attachments = self.config.get("message_attachments", {})
+        self.sender.async_confirmation = self.config.get("async_confirmation", True)
+        self.sender.text_insert_mode = self.config.get("text_insert_mode", "auto")
+        self.sender.url_max_length = self.config.get("url_max_length", 2000)
+        self.sender.journal = self._campaign_journal()
+        self.sender.results = ResultDispatcher.from_config(self.config, self.sender.logger)
+        if self.sender.results:
+            self.sender.results.campaign = os.path.splitext(os.path.basename(self.arquivo_excel))[0]
+        # Com banco, campanha distribuída ou várias abas não há uma planilha
+        # completa para receber o resultado
+        distribuida = (self._is_database() or self.config.get("lease_store_path")
+                       or self._multiplas_origens())
+        self.sender.source_path = None if distribuida else self.arquivo_excel
+        self.sender.watchdog = MemoryWatchdog(
+            heap_limit_mb=self.config.get("memory_heap_limit_mb", 768),
+            drift_ratio=self.config.get("latency_drift_ratio", 2.0),
+            check_every=self.config.get("memory_check_every", 25),
+            process_limit_mb=self.config.get("memory_process_limit_mb", 1536)
+        )
+        self.sender.recycle_mode = self.config.get("recycle_mode", "page")
+        self.sender.breaker = CircuitBreaker(
+            threshold=self.config.get("breaker_threshold", 3),
+            cooldown=self.config.get("breaker_cooldown", 600),
+            max_trips=self.config.get("breaker_max_trips", 3),
+            recovery_successes=self.config.get("breaker_recovery_successes", 50)
+        )
+
+        try:
+            self.sender.scheduler = RateScheduler.from_config(self.config, self.sender.logger)
+        except (ValueError, KeyError) as e:
+            messagebox.showerror("Erro", f"Configuração de janelas de envio inválida: {str(e)}")
+            return
 
         # Atualiza os botões
         self._update_buttons_state(sending=True)
@@ -294,14 +532,220 @@ class App:
         # Inicia o processo em uma thread separada
         threading.Thread(target=self.executar_envios, daemon=True).start()
 
+    def _profile_snapshot(self):
+        """Pasta do instantâneo de perfil configurado
+
+        Returns:
+            str | None: Caminho do instantâneo, ou None se não configurado
+        """
+        nome = self.config.get("profile_snapshot")
+        return ProfileManager.snapshot_dir(nome) if nome else None
+
+    def _is_database(self):
+        """Indica se o arquivo selecionado é um banco SQLite
+
+        Returns:
+            bool: True para .db, .sqlite e .sqlite3
+        """
+        return self.arquivo_excel.lower().endswith((".db", ".sqlite", ".sqlite3"))
+
+    def _contact_source(self):
+        """Cria a fonte de contatos do banco SQLite selecionado
+
+        Returns:
+            DBContactSource: Fonte configurada com a consulta das configurações
+        """
+        return DBContactSource.sqlite(
+            self.arquivo_excel,
+            self.config.get("contact_db_query") or "SELECT telefone, mensagem FROM contatos",
+            batch_size=self.config.get("contact_db_batch_size", 500),
+            count_query=self.config.get("contact_db_count_query") or None
+        )
+
+    def _multiplas_origens(self):
+        """Indica se a campanha junta várias planilhas ou abas
+
+        Returns:
+            bool: True com mais de um arquivo ou com excel_sheets configurado
+        """
+        return len(self.arquivos_excel) > 1 or bool(self.config.get("excel_sheets"))
+
+    def _read_contacts(self):
+        """Lê todos os contatos dos arquivos selecionados em armazenamento compacto
+
+        Várias planilhas ou abas (excel_sheets) são lidas em paralelo e
+        juntas sem repetir a mesma mensagem para o mesmo telefone.
+
+        Returns:
+            ContactStore: Contatos das planilhas ou do banco
+        """
+        if self._multiplas_origens() and not self._is_database():
+            contatos, repetidos = ExcelReader.read_many(
+                self.arquivos_excel,
+                sheets=self.config.get("excel_sheets", ""),
+                max_workers=self.config.get("excel_workers") or None
+            )
+            self.log_msg(f"📋 {len(contatos)} contatos de {len(contatos.sources) or 1} abas"
+                         + (f" ({repetidos} contatos repetidos descartados)." if repetidos else "."))
+            return contatos
+
+        if not self._is_database():
+            return ExcelReader.read_contact_store(self.arquivo_excel)
+
+        store = ContactStore()
+        for batch in self._contact_source().batches():
+            for phone, message, _ in batch:
+                store.append(phone, message, len(store) + 1)
+        return store
+
+    def _campaign_journal(self):
+        """Retorna o diário da campanha da planilha selecionada
+
+        Returns:
+            CampaignJournal: Diário nomeado a partir da planilha
+        """
+        nome = os.path.splitext(os.path.basename(self.arquivo_excel))[0]
+        return CampaignJournal.for_campaign(nome)
+
+    def verificar_entregas(self):
+        """Verifica entrega e leitura das mensagens já enviadas da campanha
+
+        Visita apenas as conversas ainda não confirmadas como lidas e
+        exporta um relatório CSV ao final.
+        """
+        if not self.arquivo_excel:
+            messagebox.showerror("Erro", "Selecione uma planilha Excel primeiro.")
+            return
+
+        self._update_config()
+        self.sender.headless = self.config["headless"]
+        self.sender.user_data_dir = self.config["browser_profile"]
+        self.sender.profile_snapshot = self._profile_snapshot()
+        self._update_buttons_state(sending=True)
+
+        journal = self._campaign_journal()
+        threading.Thread(target=self.executar_verificacao_entregas, args=(journal,), daemon=True).start()
+
+    def executar_verificacao_entregas(self, journal):
+        """Executa a verificação de entregas em uma thread separada
+
+        Args:
+            journal (CampaignJournal): Diário da campanha
+        """
+        try:
+            self.loop_thread.run(self.sender.harvest_delivery_states(
+                journal,
+                wait_time=self.config.get("harvest_wait_time", 3),
+                min_recheck=self.config.get("harvest_min_recheck", 1800)
+            ))
+        except Exception as e:
+            self.log_msg(f"❌ Erro durante a verificação de entregas: {str(e)}")
+        finally:
+            self._run_on_ui(self._update_buttons_state)
+
+    def verificar_numeros(self):
+        """Verifica quais números da planilha estão registrados no WhatsApp
+
+        Gera, ao lado da planilha original, uma planilha apenas com os
+        contatos registrados e um CSV com a classificação de cada número.
+        """
+        if not self.arquivo_excel:
+            messagebox.showerror("Erro", "Selecione uma planilha Excel primeiro.")
+            return
+
+        self._update_config()
+        self.sender.headless = self.config["headless"]
+        self.sender.user_data_dir = self.config["browser_profile"]
+        self.sender.profile_snapshot = self._profile_snapshot()
+        self._update_buttons_state(sending=True)
+
+        destino = os.path.splitext(self.arquivo_excel)[0] + "_verificado.xlsx"
+        threading.Thread(target=self.executar_verificacao_numeros, args=(destino,), daemon=True).start()
+
+    def executar_verificacao_numeros(self, destino):
+        """Executa a verificação de números em uma thread separada
+
+        Args:
+            destino (str): Caminho da planilha filtrada
+        """
+        try:
+            contatos = self._read_contacts()
+            self.loop_thread.run(self.sender.verify_contacts(
+                contatos,
+                destino,
+                wait_time=self.config.get("verify_wait_time", 2)
+            ))
+        except Exception as e:
+            self.log_msg(f"❌ Erro durante a verificação de números: {str(e)}")
+        finally:
+            self._run_on_ui(self._update_buttons_state)
+
     def _update_config(self):
         """Atualiza as configurações com os valores da interface"""
         self.config["browser_profile"] = self.profile_var.get()
         self.config["wait_time"] = self.wait_var.get()
         self.config["max_retries"] = self.retry_var.get()
+        self.config["rate_per_minute"] = self.rate_var.get()
         self.config["headless"] = self.headless_var.get()
+        self.config["attachment_path"] = self.attachment_var.get().strip()
+        ConfigManager.save(self.config)
+
+    def _on_live_setting(self, *args):
+        """Repassa ao sender os valores das spinboxes durante a campanha
+
+        Os novos valores valem a partir do próximo envio, sem reiniciar.
+        """
+        if self._syncing_settings or not self.sender.running:
+            return
+
+        try:
+            settings = {
+                "wait_time": self.wait_var.get(),
+                "max_retries": self.retry_var.get(),
+                "rate_per_minute": self.rate_var.get(),
+            }
+        except tk.TclError:
+            return  # Campo vazio ou incompleto durante a digitação
+
+        self.loop_thread.call(self.sender.update_settings, settings)
+
+    def _apply_remote_settings(self, settings):
+        """Aplica as configurações recebidas pelo endpoint de controle
+
+        Chamado na thread do servidor HTTP.
+
+        Args:
+            settings (dict): Nome da configuração → novo valor
+
+        Returns:
+            dict: Configurações em vigor após a alteração
+
+        Raises:
+            ValueError: Se alguma configuração for inválida
+        """
+        settings = WhatsAppSender.parse_settings(settings)
+        self.loop_thread.call(self.sender.update_settings, settings)
+        self._run_on_ui(self._sync_live_settings, settings)
+        return {**self.sender.current_settings(), **settings}
+
+    def _sync_live_settings(self, settings):
+        """Reflete na interface e no arquivo de configuração os ajustes remotos
+
+        Args:
+            settings (dict): Configurações já validadas
+        """
+        self.config.update(settings)
         ConfigManager.save(self.config)
 
+        self._syncing_settings = True
+        try:
+            for key, var in (("wait_time", self.wait_var), ("max_retries", self.retry_var),
+                             ("rate_per_minute", self.rate_var)):
+                if key in settings:
+                    var.set(int(round(settings[key])))
+        finally:
+            self._syncing_settings = False
+
     def _update_buttons_state(self, sending=False, paused=False):
         """Atualiza o estado dos botões de controle
         
@@ -311,6 +755,8 @@ class App:
         """
         if sending:
             self.start_button.config(state=tk.DISABLED)
+            self.harvest_button.config(state=tk.DISABLED)
+            self.verify_button.config(state=tk.DISABLED)
             self.pause_button.config(state=tk.NORMAL)
             self.resume_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
@@ -319,6 +765,8 @@ class App:
             self.resume_button.config(state=tk.NORMAL)
         else:
             self.start_button.config(state=tk.NORMAL)
+            self.harvest_button.config(state=tk.NORMAL)
+            self.verify_button.config(state=tk.NORMAL)
             self.pause_button.config(state=tk.DISABLED)
             self.resume_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.DISABLED)
@@ -330,31 +778,93 @@ class App:
         de mensagens de forma assíncrona.
         """
         try:
-            # Lê os contatos da planilha
-            contatos = ExcelReader.read_contacts(self.arquivo_excel)
+            if self.config.get("text_benchmark_phone"):
+                # Comparação opcional dos modos de preenchimento antes da campanha
+                self.loop_thread.run(self.sender.benchmark_text_modes(
+                    self.config["text_benchmark_phone"],
+                    rounds=self.config.get("text_benchmark_rounds", 3)
+                ))
+                if self.sender.interrupted:
+                    return
+
+            if self.config.get("lease_store_path"):
+                self._executar_envios_distribuidos()
+                return
+
+            if self._is_database():
+                # Os contatos chegam do banco em lotes enquanto o envio já começou
+                self.loop_thread.run(self.sender.process_contacts(self._contact_source()))
+                return
+
+            # Lê os contatos das planilhas em armazenamento compacto
+            contatos = self._read_contacts()
 
             if not contatos:
                 self.log_msg("⚠️ Nenhum contato válido encontrado na planilha.")
-                self._update_buttons_state()
+                self._run_on_ui(self._update_buttons_state)
                 return
 
             # Executa o envio de mensagens
-            asyncio.run(self.sender.process_contacts(contatos))
+            self.loop_thread.run(self.sender.process_contacts(contatos))
 
         except Exception as e:
             self.log_msg(f"❌ Erro durante o processo: {str(e)}")
-            messagebox.showerror("Erro", str(e))
+            self._run_on_ui(messagebox.showerror, "Erro", str(e))
         finally:
-            self._update_buttons_state()
+            self._manter_perfil()
+            self._run_on_ui(self._update_buttons_state)
+
+    def _manter_perfil(self):
+        """Compacta o perfil do navegador ao fim da campanha, se configurado
+
+        Não é executado depois de uma interrupção, para não atrasar o
+        fechamento do aplicativo.
+        """
+        if not self.config.get("profile_compact_after_campaign") or self.sender.interrupted:
+            return
+        try:
+            self.loop_thread.run(self.sender.maintain_profile(
+                min_mb=self.config.get("profile_compact_min_mb", 200),
+                measure=self.config.get("profile_compact_measure", True)
+            ))
+        except Exception as e:
+            self.log_msg(f"⚠️ Erro na manutenção do perfil: {str(e)}")
+
+    def _executar_envios_distribuidos(self):
+        """Envia a campanha em conjunto com outras máquinas
+
+        Os contatos são cadastrados na tabela de arrendamentos compartilhada
+        (a carga é idempotente, então todas as máquinas podem fazê-la com a
+        mesma planilha) e cada máquina arrenda lotes até não restar nenhum.
+        """
+        store = SQLiteLeaseStore(self.config["lease_store_path"])
+        campanha = os.path.splitext(os.path.basename(self.arquivo_excel))[0]
+
+        novos = store.load(campanha, self._read_contacts())
+        if novos:
+            self.log_msg(f"📋 {novos} contatos cadastrados na campanha compartilhada '{campanha}'.")
+
+        source = LeasedContactSource(
+            store,
+            campanha,
+            worker=self.config.get("worker_id") or None,
+            batch_size=self.config.get("lease_batch_size", 20),
+            lease_seconds=self.config.get("lease_seconds", 600)
+        )
+        self.log_msg(f"🖧 Participando da campanha como '{source.worker}'.")
+        self.loop_thread.run(self.sender.process_contacts(source))
+
+        resumo = ", ".join(f"{quantidade} {status}" for status, quantidade in store.counts(campanha).items())
+        self.log_msg(f"🖧 Situação da campanha em todas as máquinas: {resumo}")
 
     def pausar_envio(self):
         """Pausa o processo de envio"""
-        self.sender.pause()
+        self.loop_thread.call(self.sender.pause)
         self._update_buttons_state(sending=True, paused=True)
 
     def retomar_envio(self):
         """Retoma o processo de envio"""
-        self.sender.resume()
+        self.loop_thread.call(self.sender.resume)
         self._update_buttons_state(sending=True)
 
     def interromper_envio(self):
@@ -363,25 +873,61 @@ class App:
         Solicita confirmação do usuário antes de interromper.
         """
         if messagebox.askyesno("Confirmar", "Tem certeza que deseja interromper o envio?"):
-            self.sender.stop()
+            self.loop_thread.submit(self.sender.stop())
             self._update_buttons_state()
 
+    def encerrar(self, timeout=5.0):
+        """Interrompe qualquer envio em andamento e encerra o laço asyncio
+
+        Chamado ao fechar a janela principal. Os logs emitidos pelo stop() só
+        são enfileirados para a interface, então a espera aqui não trava.
+
+        Args:
+            timeout (float): Tempo máximo de espera pelo fechamento do navegador
+        """
+        try:
+            self.loop_thread.run(self.sender.stop(), timeout)
+        except Exception as e:
+            print(f"Erro ao interromper o envio: {str(e)}")
+        if self.control_server:
+            self.control_server.stop()
+        self.loop_thread.shutdown()
+
     def log_msg(self, msg):
-        """Adiciona uma mensagem ao log
+        """Adiciona uma mensagem ao log (pode ser chamado de qualquer thread)
         
         Args:
             msg (str): Mensagem a ser adicionada
         """
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log.insert(tk.END, f"[{timestamp}] {msg}\n")
+        self._run_on_ui(self._append_log, f"[{timestamp}] {msg}\n")
+
+    def _append_log(self, line):
+        """Insere a linha no widget de log (thread do Tk)
+
+        Args:
+            line (str): Linha já formatada com o horário
+        """
+        self.log.insert(tk.END, line)
         self.log.see(tk.END)
 
-    def update_progress(self, value, max_value):
-        """Atualiza a barra de progresso
+    def update_progress(self, value, max_value, stats=None):
+        """Atualiza a barra de progresso (pode ser chamado de qualquer thread)
         
         Args:
             value (int): Valor atual do progresso
             max_value (int): Valor máximo do progresso
+            stats (dict, optional): Taxa, sucesso, reenvios e previsão (ProgressTracker.stats)
+        """
+        self._run_on_ui(self._render_progress, value, max_value, stats)
+
+    def _render_progress(self, value, max_value, stats):
+        """Aplica o progresso aos widgets (thread do Tk)
+
+        Args:
+            value (int): Valor atual do progresso
+            max_value (int): Valor máximo do progresso
+            stats (dict | None): Estatísticas do ProgressTracker
         """
         if max_value > 0:
             self.progress["value"] = (value / max_value) * 100
@@ -390,6 +936,29 @@ class App:
             self.progress["value"] = 0
             self.progress_label.config(text="0/0 mensagens processadas")
 
+        self.stats_label.config(text=self._format_stats(stats or {}))
+
+    @staticmethod
+    def _format_stats(stats):
+        """Monta o texto com taxa, sucesso, reenvios pendentes e previsão de término
+
+        Args:
+            stats (dict): Estatísticas do ProgressTracker
+
+        Returns:
+            str: Texto para o rótulo de estatísticas (vazio sem medições)
+        """
+        parts = []
+        if stats.get("rate"):
+            parts.append(f"{stats['rate']:.1f} msg/min")
+        if stats.get("success_ratio") is not None:
+            parts.append(f"{stats['success_ratio']:.0%} de sucesso")
+        if stats.get("retries"):
+            parts.append(f"{stats['retries']} reenvios pendentes")
+        if stats.get("eta"):
+            parts.append(f"término previsto {stats['eta']:%d/%m %H:%M}")
+        return " · ".join(parts)
+
     def salvar_log(self):
         """Salva o conteúdo do log em um arquivo de texto
         
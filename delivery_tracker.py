@@ -0,0 +1,232 @@
+"""
+Acompanhamento assíncrono da confirmação de entrega das mensagens
+"""
+
+import asyncio
+import re
+import time
+
+
+# Lê o estado do último ícone de confirmação dentro de um elemento
+_STATE_OF_JS = """
+    const stateOf = (root) => {
+        const icon = root.querySelector(
+            'span[data-icon="msg-dblcheck"], span[data-icon="msg-check"], span[data-icon="msg-time"]');
+        if (!icon) return null;
+        const kind = icon.getAttribute('data-icon');
+        if (kind === 'msg-time') return 'pending';
+        if (kind === 'msg-check') return 'sent';
+        const label = (icon.getAttribute('aria-label') || '').toLowerCase();
+        return (label.includes('lida') || label.includes('read')) ? 'read' : 'delivered';
+    };
+"""
+
+# Estado da última mensagem enviada na conversa aberta
+OPEN_CHAT_STATE_JS = "() => {" + _STATE_OF_JS + """
+    const outgoing = document.querySelectorAll('div.message-out');
+    const last = outgoing[outgoing.length - 1];
+    return last ? stateOf(last) : null;
+}"""
+
+# Estado da última mensagem de cada conversa visível na lista lateral
+_CHAT_LIST_JS = "() => {" + _STATE_OF_JS + """
+    const rows = document.querySelectorAll(
+        'div[role="grid"] div[role="row"], div[role="grid"] div[role="listitem"]');
+    const result = [];
+    for (const row of rows) {
+        const title = row.querySelector('span[title]');
+        const state = stateOf(row);
+        if (title && state) result.push([title.getAttribute('title'), state]);
+    }
+    return result;
+}"""
+
+
+class DeliveryTracker:
+    """Acompanha a confirmação das mensagens fora do caminho crítico do envio
+
+    O envio apenas registra o telefone depois de pressionar Enter e segue
+    para o próximo contato. A confirmação é conciliada depois, lendo os
+    ícones de enviada/entregue/lida:
+
+    - da conversa aberta, logo antes de navegar para o próximo contato;
+    - da lista de conversas, por uma task em segundo plano que não navega.
+    """
+
+    STATE_PENDING = "pending"
+    STATE_SENT = "sent"
+    STATE_DELIVERED = "delivered"
+    STATE_READ = "read"
+
+    STATE_NAMES = {
+        STATE_PENDING: "pendentes",
+        STATE_SENT: "enviadas",
+        STATE_DELIVERED: "entregues",
+        STATE_READ: "lidas",
+    }
+
+    # Os estados só avançam: pendente → enviada → entregue → lida
+    _RANK = {STATE_PENDING: 0, STATE_SENT: 1, STATE_DELIVERED: 2, STATE_READ: 3}
+
+    def __init__(self, interval=5.0, on_update=None):
+        """Inicializa o rastreador
+
+        Args:
+            interval (float): Intervalo em segundos entre leituras da lista de conversas
+            on_update (callable, optional): Chamado com (telefone, índice, estado)
+                sempre que um estado avança
+        """
+        self.interval = interval
+        self.on_update = on_update
+
+        self.records = {}  # telefone → {"index", "state", "sent_at", "updated_at"}
+        self._open_chat = None
+        self._task = None
+
+    def record(self, phone, index=None):
+        """Registra uma mensagem enviada aguardando confirmação
+
+        Args:
+            phone (str): Telefone normalizado do destinatário
+            index (int, optional): Índice do contato na campanha
+        """
+        now = time.time()
+        self.records[phone] = {
+            "index": index,
+            "state": self.STATE_PENDING,
+            "sent_at": now,
+            "updated_at": now,
+        }
+        self._open_chat = phone
+
+    def update(self, phone, state):
+        """Atualiza o estado de uma mensagem, apenas se for um avanço
+
+        Args:
+            phone (str): Telefone normalizado do destinatário
+            state (str): Um dos valores STATE_*
+
+        Returns:
+            bool: True se o estado avançou
+        """
+        record = self.records.get(phone)
+        if not record or self._RANK[state] <= self._RANK[record["state"]]:
+            return False
+
+        record["state"] = state
+        record["updated_at"] = time.time()
+        if self.on_update:
+            self.on_update(phone, record["index"], state)
+        return True
+
+    def unresolved(self, min_state=STATE_DELIVERED):
+        """Lista os telefones que ainda não atingiram o estado indicado
+
+        Args:
+            min_state (str): Estado mínimo considerado resolvido
+
+        Returns:
+            list: Telefones com confirmação pendente
+        """
+        rank = self._RANK[min_state]
+        return [phone for phone, record in self.records.items() if self._RANK[record["state"]] < rank]
+
+    def counts(self):
+        """Conta as mensagens por estado
+
+        Returns:
+            dict: Mapeamento estado → quantidade
+        """
+        counts = dict.fromkeys(self._RANK, 0)
+        for record in self.records.values():
+            counts[record["state"]] += 1
+        return counts
+
+    async def sample_open_chat(self, page):
+        """Lê o estado da última mensagem da conversa aberta, sem esperar
+
+        Deve ser chamado antes de navegar para outra conversa.
+
+        Args:
+            page: Página do Playwright com a conversa aberta
+        """
+        if not self._open_chat or not page:
+            return
+
+        try:
+            state = await page.evaluate(OPEN_CHAT_STATE_JS)
+        except Exception:
+            return
+
+        if state:
+            self.update(self._open_chat, state)
+
+    async def scan_chat_list(self, page):
+        """Concilia os estados a partir da lista de conversas
+
+        Conversas com números não salvos exibem o próprio telefone como
+        título, o que permite associar a linha ao destinatário.
+
+        Args:
+            page: Página do Playwright com o WhatsApp Web carregado
+        """
+        if not page:
+            return
+
+        try:
+            rows = await page.evaluate(_CHAT_LIST_JS)
+        except Exception:
+            # A página pode estar navegando; a próxima leitura tenta de novo
+            return
+
+        for title, state in rows:
+            phone = re.sub(r'\D', '', title)
+            if phone in self.records:
+                self.update(phone, state)
+
+    def start(self, page):
+        """Inicia a leitura periódica da lista de conversas em segundo plano
+
+        Args:
+            page: Página do Playwright com o WhatsApp Web carregado
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch(page))
+
+    async def stop(self, page=None):
+        """Encerra a leitura em segundo plano
+
+        Args:
+            page: Se informada, faz uma última conciliação antes de encerrar
+        """
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+        if page:
+            await self.sample_open_chat(page)
+            await self.scan_chat_list(page)
+
+    async def _watch(self, page):
+        """Laço da conciliação em segundo plano
+
+        Args:
+            page: Página do Playwright com o WhatsApp Web carregado
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.unresolved(self.STATE_READ):
+                await self.scan_chat_list(page)
+
+    def summary(self):
+        """Resumo textual dos estados para o relatório final
+
+        Returns:
+            str: Contagem de mensagens por estado
+        """
+        counts = self.counts()
+        return ", ".join(f"{counts[state]} {name}" for state, name in self.STATE_NAMES.items())
@@ -1,14 +1,22 @@
 import os
 import json
+import re
 import sys
+import time
 import zipfile
 import shutil
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox as mb
 import requests
 
+from updater import ManifestUpdater
+
 URL_VERSAO = "https://raw.githubusercontent.com/DiLucaYVL/OPSender/refs/heads/main/versao.json"
 
+# Intervalo mínimo entre consultas ao servidor (segundos)
+INTERVALO_VERIFICACAO = 6 * 3600
+
 def get_current_version():
     try:
         with open('version.json', 'r', encoding='utf-8') as f:
@@ -18,16 +26,91 @@ def get_current_version():
         print(f"[Updater] Erro ao ler versão local: {e}")
         return "0.0.0"
 
-def verificar_atualizacao():
+def parse_versao(versao):
+    """
+    Converte "1.2.10" ou "v1.2.10-beta" em uma chave comparável.
+    Pré-lançamentos (com sufixo) vêm antes da versão final correspondente.
+    """
+    texto = str(versao).strip().lstrip("vV")
+    numeros, _, sufixo = texto.partition("-")
+    partes = [int(p) if p.isdigit() else 0 for p in re.split(r"[.+]", numeros)[:3]]
+    partes += [0] * (3 - len(partes))
+    return tuple(partes), sufixo == "", sufixo
+
+def versao_maior(remota, local):
+    return parse_versao(remota) > parse_versao(local)
+
+def get_cache_path():
+    """
+    Arquivo com o resultado da última verificação, no diretório de dados do aplicativo.
+    """
+    data_dir = os.path.join(get_base_path(), "data")
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, "update_check.json")
+
+def ler_cache():
+    try:
+        with open(get_cache_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def salvar_cache(cache):
+    try:
+        caminho = get_cache_path()
+        temporario = caminho + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=4)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        print(f"[Updater] Erro ao salvar cache de versão: {e}")
+
+def verificar_atualizacao(forcar=False):
+    """
+    Consulta o versao.json remoto e guarda o resultado em cache.
+
+    Usa ETag/Last-Modified para que o servidor responda 304 quando nada
+    mudou e não consulta de novo antes de INTERVALO_VERIFICACAO.
+    Retorna os dados da versão remota (ou None se não houver).
+    """
+    cache = ler_cache()
+    if not forcar and time.time() - cache.get("checked_at", 0) < INTERVALO_VERIFICACAO:
+        return cache.get("remote")
+
+    headers = {}
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+
     try:
-        versao_atual = get_current_version()
-        resp = requests.get(URL_VERSAO, timeout=5)
+        resp = requests.get(URL_VERSAO, headers=headers, timeout=5)
         if resp.status_code == 200:
-            dados = resp.json()
-            if dados["version"] > versao_atual:
-                return dados["download_url"]
+            cache["remote"] = resp.json()
+            cache["etag"] = resp.headers.get("ETag")
+            cache["last_modified"] = resp.headers.get("Last-Modified")
+        elif resp.status_code != 304:
+            print(f"[Updater] Resposta inesperada ao verificar atualização: {resp.status_code}")
+            return cache.get("remote")
+        cache["checked_at"] = time.time()
+        salvar_cache(cache)
     except Exception as e:
         print(f"[Updater] Erro ao verificar atualização: {e}")
+    return cache.get("remote")
+
+def atualizacao_pendente():
+    """
+    Dados da versão encontrada por uma verificação anterior, se for maior
+    que a instalada. Contém "manifest_url" (atualização incremental) e/ou
+    "download_url" (pacote zip completo).
+    """
+    remota = ler_cache().get("remote") or {}
+    try:
+        if (remota.get("manifest_url") or remota.get("download_url")) and \
+                versao_maior(remota["version"], get_current_version()):
+            return remota
+    except (KeyError, TypeError) as e:
+        print(f"[Updater] Cache de versão inválido: {e}")
     return None
 
 def baixar_zip_com_progresso(url, status_label, progress_bar):
@@ -40,23 +123,41 @@ def baixar_zip_com_progresso(url, status_label, progress_bar):
     zip_path = os.path.join(temp_dir, "TopChatUpdate.zip")
 
     try:
-        with requests.get(url, stream=True) as r:
-            total = int(r.headers.get('Content-Length', 0))
+        with requests.get(url, stream=True, timeout=30) as r:
+            r.raise_for_status()
+            total = int(r.headers.get('Content-Length') or 0)
             baixado = 0
+            ultima_atualizacao = 0.0
             with open(zip_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
+                for chunk in r.iter_content(chunk_size=64 * 1024):
                     if chunk:
                         f.write(chunk)
                         baixado += len(chunk)
-                        porcentagem = int((baixado / total) * 100)
-                        status_label.config(text=f"Baixando... ({porcentagem}%)")
-                        progress_bar['value'] = porcentagem
-                        status_label.update_idletasks()
-                        progress_bar.update_idletasks()
+                        # Atualiza a janela no máximo 10 vezes por segundo
+                        agora = time.monotonic()
+                        if agora - ultima_atualizacao >= 0.1:
+                            ultima_atualizacao = agora
+                            mostrar_progresso(baixado, total, status_label, progress_bar)
     except Exception as e:
         raise RuntimeError(f"Erro durante download: {str(e)}")
     return zip_path
 
+def mostrar_progresso(baixado, total, status_label, progress_bar, arquivo=None):
+    """
+    Atualiza a janela de download. Sem tamanho total conhecido, mostra só os MB baixados.
+    """
+    if total > 0:
+        porcentagem = min(100, int((baixado / total) * 100))
+        texto = f"Baixando... ({porcentagem}%)"
+        progress_bar['value'] = porcentagem
+    else:
+        texto = f"Baixando... ({baixado / (1024 * 1024):.1f} MB)"
+    if arquivo:
+        texto += f" {os.path.basename(arquivo)}"
+    status_label.config(text=texto)
+    status_label.update_idletasks()
+    progress_bar.update_idletasks()
+
 def extrair_com_progresso(zip_path, status_label, progress_bar):
     with zipfile.ZipFile(zip_path, 'r') as zip_ref:
         arquivos = zip_ref.infolist()
@@ -104,7 +205,7 @@ def iniciar_aplicacao():
     else:
         mb.showerror("Erro", f"Arquivo '{app_path}' não encontrado.")
 
-def atualizar_com_janela(url, root):
+def atualizar_com_janela(remota, root):
     janela = tk.Toplevel(root)
     janela.title("Atualizando TopChat")
     janela.resizable(False, False)
@@ -134,9 +235,20 @@ def atualizar_com_janela(url, root):
     janela.update()
 
     try:
-        zip_path = baixar_zip_com_progresso(url, status_label, progress)
-        caminho_atualizacao = extrair_com_progresso(zip_path, status_label, progress)
-        substituir_arquivos(caminho_atualizacao, get_base_path())  # ← Correção aqui
+        if remota.get("manifest_url"):
+            # Baixa só os arquivos alterados, com retomada e verificação de hash
+            updater = ManifestUpdater(
+                remota["manifest_url"],
+                get_base_path(),
+                progress=lambda baixado, total, arquivo: mostrar_progresso(
+                    baixado, total, status_label, progress, arquivo)
+            )
+            atualizados = updater.update()
+            print(f"[Updater] {len(atualizados)} arquivos atualizados")
+        else:
+            zip_path = baixar_zip_com_progresso(remota["download_url"], status_label, progress)
+            caminho_atualizacao = extrair_com_progresso(zip_path, status_label, progress)
+            substituir_arquivos(caminho_atualizacao, get_base_path())
         janela.destroy()
     except Exception as e:
         janela.destroy()
@@ -146,9 +258,13 @@ def main():
     root = tk.Tk()
     root.withdraw()
 
-    url = verificar_atualizacao()
-    if url:
-        atualizar_com_janela(url, root)
+    # Aplica a atualização encontrada na execução anterior, se houver
+    remota = atualizacao_pendente()
+    if remota:
+        atualizar_com_janela(remota, root)
+
+    # A verificação roda em segundo plano e só vale para a próxima abertura
+    threading.Thread(target=verificar_atualizacao, name="verificacao-atualizacao").start()
 
     iniciar_aplicacao()
 
@@ -2,10 +2,12 @@
 Arquivo principal para inicialização do aplicativo TopChat
 """
 
+import multiprocessing
 import os
 import sys
 import tkinter as tk
-from app import App
+
+from utils.startup_profiler import StartupProfiler
 
 
 def main():
@@ -14,13 +16,22 @@ def main():
     Inicializa a interface gráfica e configura o encerramento
     adequado da aplicação.
     """
+    # Medição opcional da inicialização (--profile-startup)
+    profiler = StartupProfiler.from_environment()
+    profiler.install()
+
     # Adiciona o diretório atual ao PATH para garantir que as importações funcionem
     base_dir = os.path.dirname(os.path.abspath(__file__))
     if base_dir not in sys.path:
         sys.path.insert(0, base_dir)
 
+    # Importado aqui para que a medição inclua a interface e suas dependências
+    from app import App
+    profiler.mark("módulos da interface importados")
+
     root = tk.Tk()
     app = App(root)
+    profiler.mark("interface montada")
 
     # Configura o ícone da aplicação
     try:
@@ -34,16 +45,22 @@ def main():
     def on_closing():
         if hasattr(app, 'sender') and app.sender.running:
             if tk.messagebox.askyesno("Confirmar Saída", "O processo de envio está em andamento. Deseja realmente sair?"):
-                app.sender.stop()
+                app.encerrar()
                 root.destroy()
         else:
+            app.encerrar()
             root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
 
+    # O relatório é gerado quando o laço de eventos desenha a janela
+    root.after_idle(profiler.finish)
+
     # Inicia o loop principal
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # Necessário no executável empacotado para os processos de leitura de planilhas
+    multiprocessing.freeze_support()
     main()
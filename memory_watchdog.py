@@ -0,0 +1,218 @@
+"""
+Monitoramento de memória do navegador e da degradação do tempo de envio
+"""
+
+import asyncio
+import os
+
+try:
+    import psutil
+except ImportError:  # opcional: sem ele, só o heap JS é monitorado
+    psutil = None
+
+
+class MemoryWatchdog:
+    """Monitoramento de memória do navegador e da degradação do tempo de envio
+
+    Coleta o heap JavaScript e os contadores do DOM da página do WhatsApp
+    Web via CDP (Chrome DevTools Protocol), a memória residente dos
+    processos renderer do Chromium (com psutil) e acompanha a média móvel
+    exponencial do tempo por mensagem. Quando o heap ou o renderer passa do
+    limite ou a latência se afasta demais da referência medida no início,
+    indica que a página deve ser reciclada.
+
+    O CDP da página não informa a memória do processo (SystemInfo.getProcessInfo
+    só traz PID e CPU e exige a sessão do navegador, que não existe no contexto
+    persistente); por isso os renderers são localizados pela árvore de
+    processos do navegador que usa o perfil.
+    """
+
+    def __init__(self, heap_limit_mb=768, drift_ratio=2.0, check_every=25,
+                 warmup=10, alpha=0.1, process_limit_mb=1536):
+        """Inicializa o monitor
+
+        Args:
+            heap_limit_mb (float): Heap JS usado (MB) que dispara a reciclagem. 0 desativa
+            drift_ratio (float): Quantas vezes a latência média pode crescer em
+                relação à referência antes de reciclar. 0 desativa
+            check_every (int): Intervalo, em mensagens, entre as coletas via CDP
+            warmup (int): Mensagens usadas para medir a latência de referência
+            alpha (float): Peso da amostra mais recente na média móvel
+            process_limit_mb (float): Memória residente (MB) dos renderers que
+                dispara a reciclagem. 0 desativa; ignorado sem psutil
+        """
+        self.heap_limit_mb = heap_limit_mb
+        self.process_limit_mb = process_limit_mb
+        self.drift_ratio = drift_ratio
+        self.check_every = check_every
+        self.warmup = warmup
+        self.alpha = alpha
+
+        self.recycles = []  # (heap antes em MB, heap depois em MB)
+        self._session = None
+        self._session_page = None
+        self.reset_latency()
+
+    def reset_latency(self):
+        """Descarta as medições de latência (após reciclar a página)"""
+        self.latency = None
+        self.baseline = None
+        self._samples = 0
+
+    def record_latency(self, seconds):
+        """Registra o tempo gasto em uma mensagem
+
+        As primeiras `warmup` mensagens formam a referência; as seguintes
+        alimentam a média móvel comparada a ela.
+
+        Args:
+            seconds (float): Duração do envio da mensagem
+        """
+        self._samples += 1
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = self.alpha * seconds + (1 - self.alpha) * self.latency
+
+        if self._samples == self.warmup:
+            self.baseline = self.latency
+
+    def due(self, messages):
+        """Indica se chegou a hora de uma nova coleta
+
+        Args:
+            messages (int): Mensagens processadas até agora
+
+        Returns:
+            bool: True a cada `check_every` mensagens
+        """
+        return self.check_every > 0 and messages > 0 and messages % self.check_every == 0
+
+    async def sample(self, page, profile_dir=None):
+        """Coleta as métricas de memória da página via CDP e dos renderers
+
+        Args:
+            page: Página do Playwright (Chromium)
+            profile_dir (str, optional): Perfil do navegador, usado para achar
+                os processos renderer
+
+        Returns:
+            dict: heap_used_mb, heap_total_mb, nodes, documents e, se possível,
+                renderer_mb; vazio se a coleta via CDP falhar
+        """
+        try:
+            if self._session_page is not page:
+                await self.detach()
+                self._session = await page.context.new_cdp_session(page)
+                await self._session.send("Performance.enable")
+                self._session_page = page
+
+            response = await self._session.send("Performance.getMetrics")
+        except Exception:
+            self._session = None
+            self._session_page = None
+            return {}
+
+        metrics = {item["name"]: item["value"] for item in response.get("metrics", [])}
+        sample = {
+            "heap_used_mb": metrics.get("JSHeapUsedSize", 0) / (1024 * 1024),
+            "heap_total_mb": metrics.get("JSHeapTotalSize", 0) / (1024 * 1024),
+            "nodes": int(metrics.get("Nodes", 0)),
+            "documents": int(metrics.get("Documents", 0)),
+        }
+
+        if profile_dir and psutil is not None:
+            renderer = await asyncio.to_thread(self.renderer_memory_mb, profile_dir)
+            if renderer is not None:
+                sample["renderer_mb"] = renderer
+        return sample
+
+    async def detach(self):
+        """Encerra a sessão CDP atual (antes ou depois de reciclar a página)"""
+        session, self._session, self._session_page = self._session, None, None
+        if session is None:
+            return
+        try:
+            await session.detach()
+        except Exception:
+            pass  # a página ou o contexto já foram fechados
+
+    @staticmethod
+    def renderer_memory_mb(profile_dir):
+        """Soma a memória residente dos processos renderer do navegador
+
+        Args:
+            profile_dir (str): Diretório do perfil passado em --user-data-dir
+
+        Returns:
+            float | None: MB em uso pelos renderers; None se o navegador
+                não for encontrado ou o psutil não estiver instalado
+        """
+        if psutil is None:
+            return None
+
+        marker = "--user-data-dir=" + os.path.abspath(profile_dir)
+        for process in psutil.process_iter(["cmdline"]):
+            cmdline = process.info.get("cmdline") or []
+            # O processo principal recebe o perfil e não tem --type
+            if marker not in cmdline or any(arg.startswith("--type=") for arg in cmdline):
+                continue
+            total = 0
+            try:
+                for child in process.children(recursive=True):
+                    try:
+                        if "--type=renderer" in child.cmdline():
+                            total += child.memory_info().rss
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                return None
+            return total / (1024 * 1024)
+        return None
+
+    def recycle_reason(self, sample):
+        """Verifica se os limites configurados foram ultrapassados
+
+        Args:
+            sample (dict): Métricas retornadas por sample()
+
+        Returns:
+            str | None: Motivo da reciclagem ou None
+        """
+        heap = sample.get("heap_used_mb", 0)
+        if self.heap_limit_mb and heap > self.heap_limit_mb:
+            return f"heap JS em {heap:.0f} MB (limite {self.heap_limit_mb} MB)"
+
+        renderer = sample.get("renderer_mb", 0)
+        if self.process_limit_mb and renderer > self.process_limit_mb:
+            return f"renderer em {renderer:.0f} MB (limite {self.process_limit_mb} MB)"
+
+        if self.drift_ratio and self.baseline and self.latency > self.baseline * self.drift_ratio:
+            return f"tempo médio por mensagem subiu de {self.baseline:.1f}s para {self.latency:.1f}s"
+
+        return None
+
+    def record_recycle(self, before, after):
+        """Registra o resultado de uma reciclagem
+
+        Args:
+            before (dict): Métricas antes da reciclagem
+            after (dict): Métricas depois da reciclagem
+
+        Returns:
+            float: MB de heap recuperados
+        """
+        heap_before = before.get("heap_used_mb", 0)
+        heap_after = after.get("heap_used_mb", 0)
+        self.recycles.append((heap_before, heap_after))
+        self.reset_latency()
+        return heap_before - heap_after
+
+    def summary(self):
+        """Resumo das reciclagens para o relatório final
+
+        Returns:
+            str: Quantidade de reciclagens e memória recuperada
+        """
+        reclaimed = sum(before - after for before, after in self.recycles)
+        return f"{len(self.recycles)} reciclagens, {reclaimed:.0f} MB de heap recuperados"
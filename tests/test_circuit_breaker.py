@@ -0,0 +1,40 @@
+"""
+Testes do disjuntor de envios
+"""
+
+import unittest
+
+from utils.circuit_breaker import CircuitBreaker
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    """Aberturas, perdão após envios bem-sucedidos e encerramento"""
+
+    def test_isolated_trips_are_forgiven(self):
+        """Aberturas separadas por envios bem-sucedidos não encerram a campanha"""
+        breaker = CircuitBreaker(threshold=1, cooldown=0, max_trips=1, recovery_successes=5)
+        for _ in range(4):
+            breaker.record_failure()
+            for _ in range(5):
+                breaker.record_success()
+        self.assertEqual(breaker.trips, 0)
+        self.assertFalse(breaker.halted)
+
+    def test_repeated_trips_halt(self):
+        """Aberturas seguidas, sem recuperação, encerram a campanha"""
+        breaker = CircuitBreaker(threshold=1, cooldown=0, max_trips=1, recovery_successes=5)
+        for _ in range(2):
+            breaker.record_failure()
+            breaker.record_success()
+        self.assertTrue(breaker.halted)
+
+    def test_fatal_trip_is_not_forgiven(self):
+        """Sinal fatal (sessão desconectada, bloqueio) continua encerrando"""
+        breaker = CircuitBreaker(recovery_successes=1)
+        breaker.trip("sessão desconectada", fatal=True)
+        breaker.record_success()
+        self.assertTrue(breaker.halted)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Testes do endpoint local de ajustes da campanha
+"""
+
+import json
+import unittest
+import urllib.error
+import urllib.request
+
+from utils.control_server import ControlServer
+
+
+class ControlServerTest(unittest.TestCase):
+    """Autorização e tipo de conteúdo exigidos pelo ControlServer"""
+
+    def setUp(self):
+        self.settings = {"rate_per_minute": 6}
+        self.server = ControlServer(0, lambda: self.settings, self._update, "segredo")
+        self.assertTrue(self.server.start())
+        self.addCleanup(self.server.stop)
+        self.url = f"http://127.0.0.1:{self.server._server.server_address[1]}/settings"
+
+    def _update(self, settings):
+        self.settings.update(settings)
+        return self.settings
+
+    def _post(self, headers):
+        request = urllib.request.Request(self.url, data=b'{"rate_per_minute": 999}',
+                                         headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request) as resp:
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def test_rejects_request_without_token(self):
+        """Um POST sem token (como o de uma página com mode: 'no-cors') é recusado"""
+        self.assertEqual(self._post({"Content-Type": "text/plain"}), 401)
+        self.assertEqual(self.settings["rate_per_minute"], 6)
+
+    def test_rejects_non_json_content_type(self):
+        """Corpo sem Content-Type JSON é recusado mesmo com token"""
+        self.assertEqual(self._post({"Authorization": "Bearer segredo", "Content-Type": "text/plain"}), 415)
+        self.assertEqual(self.settings["rate_per_minute"], 6)
+
+    def test_accepts_authorized_json(self):
+        """Requisição com token e JSON altera as configurações"""
+        self.assertEqual(self._post({"Authorization": "Bearer segredo",
+                                     "Content-Type": "application/json"}), 200)
+        self.assertEqual(self.settings["rate_per_minute"], 999)
+
+    def test_get_requires_token(self):
+        """A leitura também exige o token"""
+        request = urllib.request.Request(self.url, headers={"Authorization": "Bearer segredo"})
+        with urllib.request.urlopen(request) as resp:
+            self.assertEqual(json.loads(resp.read()), self.settings)
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(self.url)
+        self.assertEqual(error.exception.code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
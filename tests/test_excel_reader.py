@@ -0,0 +1,58 @@
+"""
+Testes da leitura de várias planilhas
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import excel_reader
+from utils.excel_reader import ExcelReader
+
+
+class ReadManyTest(unittest.TestCase):
+    """Junção dos contatos de várias abas em ExcelReader.read_many"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def _read_many(self, sheets):
+        """Executa read_many com as abas simuladas (sem pandas)
+
+        Args:
+            sheets (dict): Nome da aba → linhas (telefone, mensagem, linha)
+
+        Returns:
+            tuple: Retorno de read_many
+        """
+        with mock.patch.object(ExcelReader, "sheet_names", return_value=list(sheets)), \
+                mock.patch.object(excel_reader, "_read_sheet", side_effect=lambda _, sheet: sheets[sheet]):
+            return ExcelReader.read_many([self.path], sheets="*", max_workers=1)
+
+    def test_keeps_different_messages_for_the_same_number(self):
+        """Mensagens diferentes para o mesmo telefone são todas mantidas"""
+        store, duplicates = self._read_many({"Aba1": [
+            ("11987654321", "Primeira", 2),
+            ("(11) 98765-4321", "Segunda", 3),
+            ("11987654321", "Terceira", 4),
+        ]})
+        self.assertEqual([store.message(i) for i in range(len(store))], ["Primeira", "Segunda", "Terceira"])
+        self.assertEqual(duplicates, 0)
+
+    def test_drops_same_message_repeated_across_sheets(self):
+        """A mesma mensagem para o mesmo telefone em outra aba é descartada"""
+        store, duplicates = self._read_many({
+            "Aba1": [("11987654321", "Olá", 2)],
+            "Aba2": [("+55 11 98765-4321", "Olá", 2), ("11987654321", "Outra", 3)],
+        })
+        self.assertEqual(len(store), 2)
+        self.assertEqual(duplicates, 1)
+        self.assertEqual(store.source(1), f"{os.path.basename(self.path)}:Aba2")
+        self.assertEqual(store.row(1), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
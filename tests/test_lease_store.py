@@ -0,0 +1,58 @@
+"""
+Testes da fonte de contatos arrendados
+"""
+
+import asyncio
+import threading
+import unittest
+
+from utils.lease_store import LeasedContactSource, MemoryLeaseStore
+
+
+class LeasedContactSourceTest(unittest.TestCase):
+    """Espera interrompível e prorrogação pela thread das gravações"""
+
+    def setUp(self):
+        self.store = MemoryLeaseStore()
+        self.store.load("campanha", [("5511999990001", "oi"), ("5511999990002", "oi")])
+
+    def test_stop_interrupts_the_wait(self):
+        """Com tudo arrendado por outra máquina, stop() encerra a espera na hora"""
+        self.store.claim("campanha", "outra", 10, 600)
+        source = LeasedContactSource(self.store, "campanha", worker="esta", poll_interval=60)
+
+        async def run():
+            async def consume():
+                return [rows async for rows in source.stream()]
+
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.1)
+            source.stop()
+            return await asyncio.wait_for(task, timeout=2)
+
+        self.assertEqual(asyncio.run(run()), [])
+
+    def test_renewal_runs_on_the_store_thread(self):
+        """A prorrogação usa a mesma thread que grava os resultados"""
+        threads = []
+        renew = self.store.renew
+
+        def tracking_renew(*args):
+            threads.append(threading.current_thread().name)
+            return renew(*args)
+
+        self.store.renew = tracking_renew
+        source = LeasedContactSource(self.store, "campanha", worker="esta", lease_seconds=0.15)
+
+        async def run():
+            async for _ in source.stream():
+                await asyncio.sleep(0.2)
+                source.stop()
+
+        asyncio.run(run())
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith("opsender-leases") for name in threads))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Testes da normalização e classificação de números de telefone
+"""
+
+import unittest
+
+from utils.phone_formatter import PhoneNumberFormatter
+
+
+class PhoneNumberFormatterTest(unittest.TestCase):
+    """Casos de PhoneNumberFormatter.classify"""
+
+    def test_float_suffix_is_ignored(self):
+        """Número lido como float não ganha um dígito extra"""
+        for value in ("11987654321.0", "11987654321.00", 11987654321.0):
+            with self.subTest(value=value):
+                self.assertEqual(PhoneNumberFormatter.classify(value),
+                                 ("5511987654321", PhoneNumberFormatter.KIND_MOBILE))
+
+    def test_float_suffix_with_country_code(self):
+        """O sufixo também é descartado com código de país explícito"""
+        self.assertEqual(PhoneNumberFormatter.classify("+5511987654321.0"),
+                         ("5511987654321", PhoneNumberFormatter.KIND_MOBILE))
+
+    def test_decimal_digits_are_kept(self):
+        """Só zeros após o ponto são descartados"""
+        self.assertEqual(PhoneNumberFormatter.normalize("1198765.4321"), "5511987654321")
+
+    def test_invalid_number(self):
+        """Números curtos demais são inválidos"""
+        self.assertEqual(PhoneNumberFormatter.classify("123")[1], PhoneNumberFormatter.KIND_INVALID)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Testes da gravação da cota diária do agendador de envios
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.rate_scheduler import RateScheduler
+
+
+class DailyQuotaPersistenceTest(unittest.TestCase):
+    """A contagem diária é gravada fora do caminho de cada envio"""
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir, True)
+        patcher = mock.patch("utils.config_manager.ConfigManager.get_config_dir", return_value=self.config_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _saved_count(self):
+        with open(os.path.join(self.config_dir, "daily_quota.json"), encoding="utf-8") as f:
+            return json.load(f)["perfil"]["count"]
+
+    def test_counts_in_memory_and_saves_on_close(self):
+        async def run():
+            scheduler = RateScheduler(per_day=100, profile="perfil")
+            with mock.patch.object(scheduler, "_save_daily", wraps=scheduler._save_daily) as save:
+                for _ in range(5):
+                    self.assertTrue(await scheduler.acquire())
+                await asyncio.sleep(0)
+                self.assertEqual(save.call_count, 0)
+                await scheduler.close()
+                self.assertEqual(save.call_count, 1)
+
+        asyncio.run(run())
+        self.assertEqual(self._saved_count(), 5)
+        self.assertEqual(RateScheduler(per_day=100, profile="perfil")._daily["count"], 5)
+
+    def test_saves_on_day_rollover(self):
+        async def run():
+            scheduler = RateScheduler(per_day=100, profile="perfil")
+            scheduler._saved = {"date": "2000-01-01", "count": 40}
+            await scheduler.acquire()
+            await scheduler._saving
+
+        asyncio.run(run())
+        self.assertEqual(self._saved_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Testes do distribuidor de resultados
+"""
+
+import asyncio
+import unittest
+
+from utils.result_sinks import ResultDispatcher
+
+
+class _ListSink:
+    """Destino em memória que pode recusar os lotes"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.events = []
+
+    def write(self, events):
+        if self.fail:
+            raise OSError("destino indisponível")
+        self.events.extend(events)
+
+    def close(self):
+        pass
+
+
+class ResultDispatcherTest(unittest.TestCase):
+    """Contagem dos resultados gravados e dos que falharam"""
+
+    def _publish(self, *sinks, count=5):
+        dispatcher = ResultDispatcher(sinks, batch_size=2, flush_interval=0.01)
+
+        async def run():
+            dispatcher.start()
+            for index in range(count):
+                dispatcher.publish(index=index, status="enviado")
+            await dispatcher.close()
+
+        asyncio.run(run())
+        return dispatcher
+
+    def test_counts_written_results(self):
+        sink = _ListSink()
+        dispatcher = self._publish(sink)
+        self.assertEqual(dispatcher.published, 5)
+        self.assertEqual(dispatcher.failed, 0)
+        self.assertEqual(len(sink.events), 5)
+
+    def test_failed_writes_are_not_counted_as_published(self):
+        healthy = _ListSink()
+        dispatcher = self._publish(healthy, _ListSink(fail=True))
+        self.assertEqual(dispatcher.published, 0)
+        self.assertEqual(dispatcher.failed, 5)
+        self.assertEqual(len(healthy.events), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Testes da atualização por manifesto contra um servidor HTTP local
+"""
+
+import functools
+import hashlib
+import http.server
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+try:
+    import requests  # noqa: F401
+    from updater import ManifestUpdater
+except ImportError:  # requests não instalado
+    ManifestUpdater = None
+
+
+class _RangeHandler(http.server.SimpleHTTPRequestHandler):
+    """Servidor de arquivos com suporte a Range, que registra cada requisição"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        with open(path, "rb") as f:
+            data = f.read()
+        body = data
+        requested = self.headers.get("Range")
+        if requested:
+            start = int(requested.split("=")[1].split("-")[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = data[start:]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@unittest.skipIf(ManifestUpdater is None, "requests não instalado")
+class ManifestUpdaterTest(unittest.TestCase):
+    """Plano de diferenças, retomada, conferência de hash e restauração do backup"""
+
+    REMOTE = {"a.txt": b"igual", "b.txt": b"conteudo novo de b " * 100, "pasta/c.txt": b"arquivo novo"}
+
+    def setUp(self):
+        self.served = tempfile.mkdtemp()
+        self.target = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.served, True)
+        self.addCleanup(shutil.rmtree, self.target, True)
+
+        for relative, content in self.REMOTE.items():
+            self._write(os.path.join(self.served, "arquivos", relative), content)
+        self._write(os.path.join(self.target, "a.txt"), b"igual")
+        self._write(os.path.join(self.target, "b.txt"), b"conteudo antigo de b")
+        self._write_manifest(ManifestUpdater.build_manifest(os.path.join(self.served, "arquivos"),
+                                                            "1.0.1", "arquivos/"))
+
+        handler = functools.partial(_RangeHandler, directory=self.served)
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.manifest_url = f"http://127.0.0.1:{self.server.server_address[1]}/manifest.json"
+
+    @staticmethod
+    def _write(path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def _write_manifest(self, manifest):
+        with open(os.path.join(self.served, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+    def _read(self, relative):
+        with open(os.path.join(self.target, *relative.split("/")), "rb") as f:
+            return f.read()
+
+    def _requested(self, relative):
+        return [byte_range for path, byte_range in self.server.requests if path.endswith(relative)]
+
+    def test_downloads_only_changed_files(self):
+        updated = ManifestUpdater(self.manifest_url, self.target).update()
+
+        self.assertEqual(sorted(updated), ["b.txt", "pasta/c.txt"])
+        self.assertEqual(self._requested("a.txt"), [])
+        for relative, content in self.REMOTE.items():
+            self.assertEqual(self._read(relative), content)
+
+    def test_resumes_partial_download(self):
+        updater = ManifestUpdater(self.manifest_url, self.target)
+        content = self.REMOTE["b.txt"]
+        self._write(os.path.join(updater.staging_dir, "b.txt.part"), content[:500])
+
+        progress = []
+        updater.progress = lambda done, total, _: progress.append((done, total))
+        updater.update()
+
+        self.assertEqual(self._requested("b.txt"), ["bytes=500-"])
+        self.assertEqual(self._read("b.txt"), content)
+        self.assertEqual(progress[-1][0], progress[-1][1])
+
+    def test_complete_part_without_size_is_downloaded_again(self):
+        manifest = ManifestUpdater.build_manifest(os.path.join(self.served, "arquivos"), "1.0.1", "arquivos/")
+        for info in manifest["files"].values():
+            del info["size"]
+        self._write_manifest(manifest)
+        updater = ManifestUpdater(self.manifest_url, self.target)
+        self._write(os.path.join(updater.staging_dir, "b.txt.part"), self.REMOTE["b.txt"])
+
+        updater.update()
+
+        self.assertEqual(self._requested("b.txt"), [f"bytes={len(self.REMOTE['b.txt'])}-", None])
+        self.assertEqual(self._read("b.txt"), self.REMOTE["b.txt"])
+
+    def test_hash_mismatch_keeps_installed_files(self):
+        manifest = ManifestUpdater.build_manifest(os.path.join(self.served, "arquivos"), "1.0.1", "arquivos/")
+        manifest["files"]["b.txt"]["sha256"] = hashlib.sha256(b"outro conteudo").hexdigest()
+        self._write_manifest(manifest)
+
+        with self.assertRaises(ValueError):
+            ManifestUpdater(self.manifest_url, self.target).update(retries=1)
+
+        self.assertEqual(len(self._requested("b.txt")), 2)
+        self.assertEqual(self._read("b.txt"), b"conteudo antigo de b")
+        self.assertFalse(os.path.exists(os.path.join(self.target, "pasta", "c.txt")))
+
+    def test_failed_swap_restores_previous_version(self):
+        updater = ManifestUpdater(self.manifest_url, self.target)
+        real_replace = os.replace
+        new_file = os.path.join(self.target, "pasta", "c.txt")
+
+        def failing_replace(source, destination):
+            if destination == new_file:
+                raise OSError("disco cheio")
+            return real_replace(source, destination)
+
+        with mock.patch("os.replace", side_effect=failing_replace):
+            with self.assertRaises(OSError):
+                updater.update()
+
+        self.assertEqual(self._read("a.txt"), b"igual")
+        self.assertEqual(self._read("b.txt"), b"conteudo antigo de b")
+        self.assertFalse(os.path.exists(new_file))
+        self.assertFalse(os.path.exists(updater.backup_dir))
+
+        # A nova tentativa reaproveita os arquivos que voltaram para a preparação
+        self.server.requests.clear()
+        updater.update()
+        self.assertEqual(self._requested("b.txt"), [])
+        self.assertEqual(self._read("b.txt"), self.REMOTE["b.txt"])
+
+    def test_rejects_paths_outside_the_installation(self):
+        updater = ManifestUpdater(self.manifest_url, self.target)
+        for relative in ("../fora.exe", "..\\..\\fora.exe", "C:/fora.exe", "/fora.exe"):
+            with self.subTest(relative=relative):
+                with self.assertRaises(ValueError):
+                    updater._safe_path(relative)
+
+
+if __name__ == "__main__":
+    unittest.main()
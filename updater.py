@@ -0,0 +1,406 @@
+"""
+Atualização incremental a partir de um manifesto com o hash de cada arquivo
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import sys
+import time
+from urllib.parse import quote, urljoin
+
+import requests
+
+
+class ManifestUpdater:
+    """Atualização incremental a partir de um manifesto com o hash de cada arquivo
+
+    O manifesto (JSON) lista os arquivos da versão publicada:
+
+        {"version": "1.0.3",
+         "base_url": "arquivos/",
+         "files": {"app/topchat_core.exe": {"sha256": "...", "size": 123}}}
+
+    `base_url` é relativo ao endereço do manifesto (ou absoluto). Apenas os
+    arquivos cujo hash local difere são baixados, para uma pasta de
+    preparação, com retomada via HTTP Range e conferência do SHA-256. Só
+    depois que todos foram verificados eles substituem os atuais, cada um
+    com os.replace (troca atômica no mesmo sistema de arquivos). Os
+    arquivos substituídos vão antes para uma pasta de backup: se a troca
+    falhar no meio (ou o processo for encerrado), a instalação volta
+    inteira para a versão anterior.
+    """
+
+    BACKUP_JOURNAL = "update_backup.json"  # arquivos da troca e se já existiam
+    CHUNK_SIZE = 64 * 1024
+    PROGRESS_INTERVAL = 0.1  # segundos entre notificações de progresso
+
+    def __init__(self, manifest_url, target_dir, staging_dir=None, progress=None,
+                 session=None, timeout=30):
+        """Inicializa o atualizador
+
+        Args:
+            manifest_url (str): Endereço do manifesto (pode apontar para um servidor local)
+            target_dir (str): Pasta da instalação a atualizar
+            staging_dir (str, optional): Pasta de preparação. Padrão: <target_dir>/data/update_staging
+            progress (callable, optional): Chamada com (bytes baixados, bytes totais, texto)
+            session (requests.Session, optional): Sessão HTTP
+            timeout (float): Tempo máximo de cada requisição em segundos
+        """
+        self.manifest_url = manifest_url
+        self.target_dir = os.path.abspath(target_dir)
+        self.staging_dir = staging_dir or os.path.join(self.target_dir, "data", "update_staging")
+        # Na mesma pasta da instalação, para que os.replace continue atômico
+        self.backup_dir = os.path.join(self.target_dir, "data", "update_backup")
+        self.progress = progress
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+        self._done = 0
+        self._total = 0
+        self._last_report = 0.0
+
+    def fetch_manifest(self):
+        """Baixa e valida o manifesto
+
+        Returns:
+            dict: Manifesto com "files" e "base_url" já resolvido
+
+        Raises:
+            ValueError: Se o manifesto for inválido
+            requests.RequestException: Se o download falhar
+        """
+        resp = self.session.get(self.manifest_url, timeout=self.timeout)
+        resp.raise_for_status()
+        manifest = resp.json()
+
+        files = manifest.get("files")
+        if not isinstance(files, dict):
+            raise ValueError("Manifesto sem a lista de arquivos")
+        for relative, info in files.items():
+            self._safe_path(relative)
+            if not isinstance(info, dict) or len(str(info.get("sha256", ""))) != 64:
+                raise ValueError(f"Hash ausente ou inválido no manifesto: {relative}")
+
+        manifest["base_url"] = urljoin(self.manifest_url, manifest.get("base_url") or "./")
+        return manifest
+
+    def _safe_path(self, relative):
+        """Converte um caminho do manifesto em caminho local dentro da instalação
+
+        Args:
+            relative (str): Caminho relativo com "/" como separador
+
+        Returns:
+            str: Caminho absoluto dentro de target_dir
+
+        Raises:
+            ValueError: Se o caminho sair da pasta da instalação
+        """
+        # "\" também separa pastas no Windows (ex.: "..\..\x.exe")
+        normalized = posixpath.normpath(relative)
+        if ("\\" in normalized or normalized.startswith(("../", "/")) or normalized in ("..", ".")
+                or ":" in normalized):
+            raise ValueError(f"Caminho inválido no manifesto: {relative}")
+
+        path = os.path.abspath(os.path.join(self.target_dir, *normalized.split("/")))
+        if os.path.commonpath([self.target_dir, path]) != self.target_dir:
+            raise ValueError(f"Caminho inválido no manifesto: {relative}")
+        return path
+
+    @classmethod
+    def file_hash(cls, path, hasher=None):
+        """Calcula o SHA-256 de um arquivo
+
+        Args:
+            path (str): Caminho do arquivo
+            hasher (optional): Objeto hashlib a continuar. Padrão: novo sha256
+
+        Returns:
+            hashlib object: Hash atualizado com o conteúdo do arquivo
+        """
+        hasher = hasher or hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher
+
+    def plan(self, manifest):
+        """Lista os arquivos que precisam ser baixados
+
+        Arquivos com tamanho diferente do manifesto são considerados
+        alterados sem calcular o hash.
+
+        Args:
+            manifest (dict): Manifesto retornado por fetch_manifest
+
+        Returns:
+            list: Tuplas (caminho relativo, informações do arquivo)
+        """
+        changed = []
+        for relative, info in sorted(manifest["files"].items()):
+            path = self._safe_path(relative)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                changed.append((relative, info))
+                continue
+
+            if info.get("size") is not None and size != info["size"]:
+                changed.append((relative, info))
+            elif self.file_hash(path).hexdigest() != info["sha256"].lower():
+                changed.append((relative, info))
+        return changed
+
+    def download(self, base_url, relative, info):
+        """Baixa um arquivo para a pasta de preparação e confere o hash
+
+        Um download interrompido deixa um arquivo .part, retomado na
+        próxima tentativa com o cabeçalho Range.
+
+        Args:
+            base_url (str): Endereço base dos arquivos
+            relative (str): Caminho relativo do arquivo
+            info (dict): sha256 e, opcionalmente, size
+
+        Returns:
+            str: Caminho do arquivo verificado na pasta de preparação
+
+        Raises:
+            ValueError: Se o hash não conferir
+            requests.RequestException: Se o download falhar
+        """
+        staged = self._staged_path(relative)
+        part = staged + ".part"
+        os.makedirs(os.path.dirname(staged), exist_ok=True)
+
+        expected = info["sha256"].lower()
+        if os.path.exists(staged) and self.file_hash(staged).hexdigest() == expected:
+            self._advance(os.path.getsize(staged), relative)
+            return staged
+
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        size = info.get("size")
+        if size is not None and offset > size:
+            os.remove(part)
+            offset = 0
+
+        hasher = hashlib.sha256()
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        url = urljoin(base_url, quote(relative))
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as resp:
+            if resp.status_code == 416 and offset and size is None:
+                # Sem o tamanho no manifesto não há como saber se o .part está
+                # completo: ele é descartado e o arquivo é baixado do início
+                resp.close()
+                os.remove(part)
+                return self.download(base_url, relative, info)
+            if resp.status_code == 416 and offset and offset == size:
+                mode = None  # O .part já está completo
+            elif resp.status_code == 206 and offset:
+                mode = "ab"
+            else:
+                resp.raise_for_status()
+                mode = "wb"
+                offset = 0
+
+            if offset:
+                self.file_hash(part, hasher)
+                self._advance(offset, relative)
+
+            if mode:
+                with open(part, mode) as f:
+                    for chunk in resp.iter_content(chunk_size=self.CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            hasher.update(chunk)
+                            self._advance(len(chunk), relative)
+            else:
+                hasher = self.file_hash(part)
+
+        if hasher.hexdigest() != expected:
+            os.remove(part)
+            raise ValueError(f"Hash não confere para {relative}; o download será refeito")
+
+        os.replace(part, staged)
+        return staged
+
+    def _advance(self, amount, relative):
+        """Contabiliza bytes baixados e notifica o progresso com limite de frequência
+
+        Args:
+            amount (int): Bytes acrescentados
+            relative (str): Arquivo em andamento
+        """
+        self._done += amount
+        now = time.monotonic()
+        if self.progress and (now - self._last_report >= self.PROGRESS_INTERVAL or self._done >= self._total):
+            self._last_report = now
+            self.progress(self._done, self._total, relative)
+
+    def apply(self, staged_files):
+        """Substitui os arquivos da instalação pelos já verificados
+
+        Antes da troca, o diário de backup registra quais arquivos já
+        existiam; cada arquivo atual é movido para o backup e só então o
+        novo entra no lugar. Qualquer falha restaura o backup, e um diário
+        deixado por uma troca interrompida é restaurado na próxima chamada
+        de update.
+
+        Args:
+            staged_files (list): Tuplas (caminho relativo, caminho na pasta de preparação)
+
+        Raises:
+            OSError: Se a troca falhar (a instalação já foi restaurada)
+        """
+        shutil.rmtree(self.backup_dir, ignore_errors=True)
+        os.makedirs(self.backup_dir)
+        journal = {relative: os.path.exists(self._safe_path(relative)) for relative, _ in staged_files}
+        journal_path = os.path.join(self.backup_dir, self.BACKUP_JOURNAL)
+        with open(journal_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(journal, f)
+        os.replace(journal_path + ".tmp", journal_path)
+
+        try:
+            for relative, staged in staged_files:
+                target = self._safe_path(relative)
+                if journal[relative]:
+                    backup = self._backup_path(relative)
+                    os.makedirs(os.path.dirname(backup), exist_ok=True)
+                    os.replace(target, backup)
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(staged, target)
+        except BaseException:
+            self.rollback()
+            raise
+
+        shutil.rmtree(self.backup_dir, ignore_errors=True)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def rollback(self):
+        """Restaura os arquivos do backup de uma troca que não terminou
+
+        Os arquivos novos que já tinham entrado voltam para a pasta de
+        preparação, onde a próxima tentativa os reaproveita. Sem diário de
+        backup, não há nada a restaurar.
+
+        Returns:
+            bool: True se havia uma troca a desfazer
+        """
+        journal_path = os.path.join(self.backup_dir, self.BACKUP_JOURNAL)
+        try:
+            with open(journal_path, encoding="utf-8") as f:
+                journal = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        for relative, existed in journal.items():
+            target = self._safe_path(relative)
+            backup = self._backup_path(relative)
+            swapped = os.path.exists(backup) or not existed
+            if swapped and os.path.exists(target):
+                staged = self._staged_path(relative)
+                os.makedirs(os.path.dirname(staged), exist_ok=True)
+                os.replace(target, staged)
+            if os.path.exists(backup):
+                os.replace(backup, target)
+
+        shutil.rmtree(self.backup_dir, ignore_errors=True)
+        return True
+
+    def _staged_path(self, relative):
+        """Caminho do arquivo na pasta de preparação
+
+        Args:
+            relative (str): Caminho relativo do arquivo
+
+        Returns:
+            str: Caminho dentro de staging_dir
+        """
+        return os.path.join(self.staging_dir, *posixpath.normpath(relative).split("/"))
+
+    def _backup_path(self, relative):
+        """Caminho do arquivo atual na pasta de backup
+
+        Args:
+            relative (str): Caminho relativo do arquivo
+
+        Returns:
+            str: Caminho dentro de backup_dir
+        """
+        return os.path.join(self.backup_dir, "files", *posixpath.normpath(relative).split("/"))
+
+    def update(self, retries=1):
+        """Executa a atualização completa
+
+        Args:
+            retries (int): Novas tentativas por arquivo em caso de falha
+
+        Returns:
+            list: Caminhos relativos dos arquivos atualizados
+        """
+        # Uma troca interrompida na execução anterior volta à versão antiga antes de comparar
+        self.rollback()
+
+        manifest = self.fetch_manifest()
+        changed = self.plan(manifest)
+
+        self._done = 0
+        self._total = sum(info.get("size") or 0 for _, info in changed)
+        self._last_report = 0.0
+
+        staged_files = []
+        for relative, info in changed:
+            for attempt in range(retries + 1):
+                done = self._done
+                try:
+                    staged_files.append((relative, self.download(manifest["base_url"], relative, info)))
+                    break
+                except (ValueError, requests.RequestException):
+                    # A nova tentativa conta de novo os bytes já baixados do arquivo
+                    self._done = done
+                    if attempt >= retries:
+                        raise
+
+        self.apply(staged_files)
+        return [relative for relative, _ in staged_files]
+
+    @classmethod
+    def build_manifest(cls, folder, version, base_url=""):
+        """Gera o manifesto de uma pasta de distribuição
+
+        Args:
+            folder (str): Pasta com os arquivos da versão
+            version (str): Versão publicada
+            base_url (str): Endereço base dos arquivos, relativo ao manifesto
+
+        Returns:
+            dict: Manifesto pronto para ser salvo em JSON
+        """
+        files = {}
+        for root, _, names in os.walk(folder):
+            for name in names:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, folder).replace(os.sep, "/")
+                files[relative] = {
+                    "sha256": cls.file_hash(path).hexdigest(),
+                    "size": os.path.getsize(path),
+                }
+        return {"version": version, "base_url": base_url, "files": files}
+
+
+if __name__ == "__main__":
+    # Uso: python updater.py <pasta da distribuição> <versão> [base_url]
+    if len(sys.argv) < 3:
+        print("Uso: python updater.py <pasta> <versão> [base_url]")
+        sys.exit(1)
+    manifesto = ManifestUpdater.build_manifest(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "")
+    with open("manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+    print(f"manifest.json gerado com {len(manifesto['files'])} arquivos")
@@ -0,0 +1,74 @@
+"""
+Laço asyncio persistente executado em uma thread dedicada
+"""
+
+import asyncio
+import threading
+
+
+class AsyncLoopThread:
+    """Laço asyncio persistente executado em uma thread dedicada
+
+    Um único laço atende todas as campanhas durante a vida do aplicativo.
+    A interface gráfica agenda corrotinas e chamadas nele de forma segura
+    entre threads, sem criar um novo laço a cada envio.
+    """
+
+    def __init__(self, name="opsender-asyncio"):
+        """Cria o laço e inicia a thread que o executa
+
+        Args:
+            name (str): Nome da thread
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Executa o laço até que shutdown() seja chamado"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Agenda uma corrotina no laço
+
+        Args:
+            coro: Corrotina a executar
+
+        Returns:
+            concurrent.futures.Future: Resultado da corrotina
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Executa uma corrotina no laço e aguarda o resultado
+
+        Não deve ser chamado a partir da própria thread do laço.
+
+        Args:
+            coro: Corrotina a executar
+            timeout (float, optional): Tempo máximo de espera em segundos
+
+        Returns:
+            object: Valor retornado pela corrotina
+        """
+        return self.submit(coro).result(timeout)
+
+    def call(self, callback, *args):
+        """Agenda uma função comum para rodar na thread do laço
+
+        Args:
+            callback (callable): Função a executar
+            *args: Argumentos da função
+        """
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def shutdown(self, timeout=2.0):
+        """Encerra o laço e aguarda o fim da thread
+
+        Args:
+            timeout (float): Tempo máximo de espera pela thread
+        """
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
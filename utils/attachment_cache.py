@@ -0,0 +1,105 @@
+"""
+Cache em memória de anexos enviados pelo WhatsApp Web
+"""
+
+import mimetypes
+import os
+from collections import OrderedDict
+
+
+class AttachmentCache:
+    """Cache em memória de anexos enviados pelo WhatsApp Web
+
+    Lê cada arquivo do disco uma única vez e reaproveita o conteúdo em
+    todos os envios, no formato aceito por ``set_input_files`` do Playwright.
+    O arquivo é relido apenas se for modificado durante a campanha.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """Inicializa o cache
+
+        Args:
+            max_bytes (int): Limite de memória ocupada pelos anexos em cache
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # caminho → (mtime, payload)
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        """Retorna o anexo pronto para envio
+
+        Args:
+            path (str): Caminho do arquivo
+
+        Returns:
+            dict: Payload com as chaves name, mimeType e buffer
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+        """
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Anexo não encontrado: {path}")
+
+        mtime = os.path.getmtime(path)
+        entry = self._entries.get(path)
+        if entry and entry[0] == mtime:
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        if entry:
+            self._discard(path)
+
+        with open(path, "rb") as f:
+            buffer = f.read()
+
+        mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        payload = {
+            "name": os.path.basename(path),
+            "mimeType": mime_type,
+            "buffer": buffer,
+        }
+
+        self._entries[path] = (mtime, payload)
+        self._total_bytes += len(buffer)
+        self._evict()
+        return payload
+
+    @staticmethod
+    def is_media(payload):
+        """Indica se o anexo é imagem ou vídeo (enviado com pré-visualização)
+
+        Args:
+            payload (dict): Payload retornado por get()
+
+        Returns:
+            bool: True para imagens e vídeos
+        """
+        return payload["mimeType"].startswith(("image/", "video/"))
+
+    def clear(self):
+        """Remove todos os anexos do cache"""
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def _discard(self, path):
+        """Remove um anexo do cache
+
+        Args:
+            path (str): Caminho absoluto do arquivo
+        """
+        _, payload = self._entries.pop(path)
+        self._total_bytes -= len(payload["buffer"])
+
+    def _evict(self):
+        """Remove os anexos menos usados até respeitar o limite de memória
+
+        O anexo mais recente nunca é removido, mesmo que sozinho ultrapasse
+        o limite.
+        """
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            self._discard(next(iter(self._entries)))
@@ -0,0 +1,158 @@
+"""
+Diário de eventos da campanha em formato JSON Lines
+"""
+
+import csv
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from utils.config_manager import ConfigManager
+
+
+class CampaignJournal:
+    """Diário de eventos da campanha em formato JSON Lines
+
+    Cada linha do arquivo é um evento (envio, falha, confirmação ou
+    verificação) de um telefone. O arquivo só recebe acréscimos, então
+    sobrevive a interrupções e pode ser relido para saber o estado atual
+    de cada destinatário.
+    """
+
+    EVENT_SENT = "sent"
+    EVENT_FAILED = "failed"
+    EVENT_DELIVERY = "delivery"
+    EVENT_CHECKED = "checked"
+
+    # Estados de entrega, na ordem em que avançam
+    STATES = ("pending", "sent", "delivered", "read")
+
+    def __init__(self, path):
+        """Inicializa o diário
+
+        Args:
+            path (str): Caminho do arquivo .jsonl
+        """
+        self.path = path
+
+    @classmethod
+    def for_campaign(cls, name):
+        """Retorna o diário de uma campanha no diretório de dados
+
+        Args:
+            name (str): Nome da campanha (normalmente o nome da planilha)
+
+        Returns:
+            CampaignJournal: Diário da campanha
+        """
+        directory = os.path.join(ConfigManager.get_config_dir(), "campanhas")
+        os.makedirs(directory, exist_ok=True)
+        safe_name = re.sub(r'[^\w.-]+', '_', name).strip("_") or "campanha"
+        return cls(os.path.join(directory, f"{safe_name}.jsonl"))
+
+    def append(self, event, phone, **fields):
+        """Acrescenta um evento ao diário
+
+        Args:
+            event (str): Um dos valores EVENT_*
+            phone (str): Telefone normalizado
+            **fields: Dados adicionais do evento (state, index, row, error...)
+        """
+        entry = {"ts": time.time(), "event": event, "phone": phone}
+        entry.update(fields)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def load_states(self):
+        """Reconstrói o estado atual de cada telefone a partir dos eventos
+
+        Returns:
+            dict: telefone → {"state", "row", "sent_at", "updated_at", "checked_at", "checks"}
+        """
+        states = {}
+        if not os.path.exists(self.path):
+            return states
+
+        rank = {state: i for i, state in enumerate(self.STATES)}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Linha incompleta de uma gravação interrompida
+                    continue
+
+                phone = entry.get("phone")
+                event = entry.get("event")
+                record = states.setdefault(phone, {
+                    "state": None, "row": None, "sent_at": None,
+                    "updated_at": None, "checked_at": None, "checks": 0,
+                })
+                if entry.get("row") is not None:
+                    record["row"] = entry["row"]
+
+                if event == self.EVENT_SENT:
+                    record["sent_at"] = entry["ts"]
+                    record["updated_at"] = entry["ts"]
+                    if record["state"] in (None, "failed"):
+                        record["state"] = "pending"
+                elif event == self.EVENT_FAILED:
+                    if record["state"] is None:
+                        record["state"] = "failed"
+                        record["updated_at"] = entry["ts"]
+                elif event == self.EVENT_DELIVERY:
+                    state = entry.get("state")
+                    if rank.get(state, -1) > rank.get(record["state"], -1):
+                        record["state"] = state
+                        record["updated_at"] = entry["ts"]
+                elif event == self.EVENT_CHECKED:
+                    record["checked_at"] = entry["ts"]
+                    record["checks"] += 1
+
+        return states
+
+    def unresolved(self, min_recheck=0):
+        """Lista os telefones enviados cuja leitura ainda não foi confirmada
+
+        Args:
+            min_recheck (float): Segundos mínimos desde a última verificação
+                para que o telefone seja visitado de novo
+
+        Returns:
+            list: Telefones a verificar
+        """
+        now = time.time()
+        phones = []
+        for phone, record in self.load_states().items():
+            if record["state"] in (None, "failed", "read"):
+                continue
+            if record["checked_at"] and now - record["checked_at"] < min_recheck:
+                continue
+            phones.append(phone)
+        return phones
+
+    def export_report(self, path=None):
+        """Exporta o estado atual de cada telefone em CSV
+
+        Args:
+            path (str, optional): Caminho do CSV. Padrão: ao lado do diário
+
+        Returns:
+            str: Caminho do arquivo gerado
+        """
+        path = path or os.path.splitext(self.path)[0] + "_relatorio.csv"
+
+        def fmt(ts):
+            return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else ""
+
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["telefone", "linha", "estado", "enviada_em", "atualizada_em", "verificacoes"])
+            for phone, record in self.load_states().items():
+                writer.writerow([
+                    phone, record["row"] or "", record["state"],
+                    fmt(record["sent_at"]), fmt(record["updated_at"]), record["checks"],
+                ])
+        return path
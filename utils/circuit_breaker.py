@@ -0,0 +1,118 @@
+"""
+Disjuntor para interromper envios quando a conta dá sinais de bloqueio
+"""
+
+import time
+
+
+class CircuitBreaker:
+    """Disjuntor para interromper envios quando a conta dá sinais de bloqueio
+
+    Fechado: os envios seguem normalmente. Após `threshold` falhas
+    consecutivas (ou um sinal grave, como banner de bloqueio) o disjuntor
+    abre e os envios ficam suspensos por `cooldown` segundos. Depois disso
+    fica meio-aberto: o próximo envio serve de teste e, se der certo, o
+    disjuntor fecha. Se abrir mais de `max_trips` vezes, a campanha deve
+    ser encerrada. Cada sequência de `recovery_successes` envios
+    bem-sucedidos perdoa uma abertura, para que aberturas isoladas, horas
+    distantes umas das outras, não encerrem uma campanha longa.
+    """
+
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    def __init__(self, threshold=3, cooldown=600, max_trips=3, recovery_successes=50):
+        """Inicializa o disjuntor fechado
+
+        Args:
+            threshold (int): Falhas consecutivas que abrem o disjuntor
+            cooldown (float): Segundos de suspensão após abrir
+            max_trips (int): Aberturas toleradas antes de encerrar a campanha
+            recovery_successes (int): Envios bem-sucedidos seguidos que perdoam uma abertura
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self.recovery_successes = recovery_successes
+
+        self.failures = 0
+        self.successes = 0  # Envios bem-sucedidos seguidos desde a última abertura ou perdão
+        self.trips = 0
+        self.reason = None
+        self.fatal = False
+        self._opened_at = None
+
+    @property
+    def state(self):
+        """Estado atual do disjuntor
+
+        Returns:
+            str: Um dos valores STATE_*
+        """
+        if self._opened_at is None:
+            return self.STATE_CLOSED
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return self.STATE_OPEN
+        return self.STATE_HALF_OPEN
+
+    @property
+    def halted(self):
+        """Indica se a campanha deve ser encerrada em vez de aguardar
+
+        Returns:
+            bool: True após um sinal fatal ou aberturas demais
+        """
+        return self.fatal or self.trips > self.max_trips
+
+    def remaining_cooldown(self):
+        """Segundos restantes de suspensão
+
+        Returns:
+            float: 0 se o disjuntor não estiver aberto
+        """
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        """Registra um envio bem-sucedido, fechando o disjuntor"""
+        self.successes += 1
+        if self.trips and not self.fatal and self.successes >= self.recovery_successes:
+            self.trips -= 1
+            self.successes = 0
+        self.failures = 0
+        self.reason = None
+        self._opened_at = None
+
+    def record_failure(self, reason="timeout"):
+        """Registra uma falha de envio
+
+        No estado meio-aberto uma única falha reabre o disjuntor.
+
+        Args:
+            reason (str): Descrição da falha
+
+        Returns:
+            bool: True se a falha abriu o disjuntor
+        """
+        self.failures += 1
+        self.successes = 0
+        if self.state == self.STATE_HALF_OPEN or self.failures >= self.threshold:
+            self.trip(f"{self.failures} falhas consecutivas ({reason})")
+            return True
+        return False
+
+    def trip(self, reason, fatal=False):
+        """Abre o disjuntor imediatamente
+
+        Args:
+            reason (str): Motivo da abertura
+            fatal (bool): Se o problema exige intervenção (ex.: sessão desconectada)
+        """
+        self.trips += 1
+        self.failures = 0
+        self.successes = 0
+        self.reason = reason
+        self.fatal = self.fatal or fatal
+        self._opened_at = time.monotonic()
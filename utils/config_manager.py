@@ -45,8 +45,65 @@ class ConfigManager:
     DEFAULT_CONFIG = {
         "last_directory": "",
         "browser_profile": "whatsapp_profile",
+        "profile_snapshot": "",  # nome em data/profile_snapshots (ou caminho) do instantâneo que cria o perfil ausente
+        # Manutenção do perfil ao fim de cada campanha: remove caches e compacta os bancos
+        "profile_compact_after_campaign": False,
+        "profile_compact_min_mb": 200,      # só compacta perfis maiores que isso
+        "profile_compact_measure": True,    # mede a inicialização depois da compactação
         "wait_time": 5,
         "max_retries": 3,
+        "attachment_path": "",
+        "message_attachments": {},  # texto da mensagem → caminho do anexo
+        "async_confirmation": True,
+        "text_insert_mode": "auto",  # "url", "insert" ou "auto"
+        "url_max_length": 2000,      # limite da mensagem codificada na URL no modo "auto"
+        "text_benchmark_phone": "",  # conversa de teste: compara URL e inserção antes do envio
+        "text_benchmark_rounds": 3,
+        "harvest_wait_time": 3,       # segundos entre conversas na verificação de entregas
+        "harvest_min_recheck": 1800,  # segundos até revisitar uma conversa já verificada
+        "verify_wait_time": 2,        # segundos entre números na verificação de registro
+        # Agendador de envios (0 ou vazio desativa o limite; sem limites vale o wait_time)
+        "rate_per_minute": 0,
+        "rate_per_hour": 0,
+        "rate_per_day": 0,
+        "rate_burst": 0,
+        "send_windows": "",   # ex.: "08:00-12:00,13:30-18:00"
+        "send_weekdays": "",  # ex.: "seg-sex"
+        # Monitor de memória: recicla a página ao passar do heap ou da degradação de latência
+        "memory_heap_limit_mb": 768,
+        "memory_process_limit_mb": 1536,  # renderers do Chromium (requer psutil)
+        "latency_drift_ratio": 2.0,
+        "memory_check_every": 25,
+        "recycle_mode": "page",  # "page" ou "context"
+        # Disjuntor: falhas consecutivas, suspensão em segundos e aberturas toleradas
+        "breaker_threshold": 3,
+        "breaker_cooldown": 600,
+        "breaker_max_trips": 3,
+        "breaker_recovery_successes": 50,  # envios seguidos bem-sucedidos que perdoam uma abertura
+        # Abas lidas de cada planilha: "" só a primeira, "*" todas, ou nomes separados por vírgula
+        "excel_sheets": "",
+        "excel_workers": 0,  # processos de leitura em paralelo (0 = número de núcleos)
+        # Contatos lidos de um banco SQLite: telefone, mensagem e colunas usadas como {variáveis}
+        "contact_db_query": "SELECT telefone, mensagem FROM contatos",
+        "contact_db_count_query": "",  # opcional, para o total da barra de progresso
+        "contact_db_batch_size": 500,
+        # Campanha distribuída: arquivo SQLite compartilhado com os arrendamentos (vazio desativa)
+        "lease_store_path": "",
+        "worker_id": "",        # identificador desta máquina (padrão: nome do host + sufixo)
+        "lease_batch_size": 20,
+        "lease_seconds": 600,
+        # Destinos do resultado de cada envio (vazio desativa cada um)
+        "result_webhook_url": "",
+        "result_webhook_headers": {},  # ex.: {"Authorization": "Bearer ..."}
+        "result_webhook_retries": 3,
+        "result_jsonl_path": "",
+        "result_csv_path": "",
+        "result_sqlite_path": "",
+        "result_batch_size": 100,      # resultados por lote
+        "result_flush_seconds": 2.0,   # espera máxima antes de gravar um lote incompleto
+        # Porta do endpoint local para ajustes durante a campanha (0 desativa)
+        "control_port": 0,
+        "control_token": "",  # gerado na primeira abertura do endpoint
     }
 
     _config_cache = None  # Cache para evitar leituras repetidas do arquivo
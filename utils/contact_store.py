@@ -0,0 +1,299 @@
+"""
+Armazenamento compacto de contatos em arrays paralelos
+"""
+
+import re
+import time
+from array import array
+
+from utils.phone_formatter import PhoneNumberFormatter
+
+
+class ContactStore:
+    """Armazenamento compacto de contatos em arrays paralelos
+
+    Cada contato ocupa 33 bytes fixos: telefone normalizado (int64), id da
+    mensagem (uint32), linha na planilha (uint32), id da origem (uint16) e
+    status (1 byte), além do resultado do último envio: horário (float64),
+    duração (float32), tentativas e classe do erro (1 byte cada). As
+    mensagens ficam em uma tabela deduplicada, já que uma campanha costuma
+    repetir o mesmo texto para milhares de contatos; as origens (arquivo e
+    aba de cada linha, quando a campanha junta várias) também.
+    """
+
+    STATUS_PENDING = 0
+    STATUS_SENT = 1
+    STATUS_FAILED = 2
+    STATUS_INVALID = 3
+    STATUS_DELIVERED = 4
+    STATUS_READ = 5
+
+    STATUS_NAMES = {
+        STATUS_PENDING: "pendente",
+        STATUS_SENT: "enviada",
+        STATUS_FAILED: "falha",
+        STATUS_INVALID: "inválido",
+        STATUS_DELIVERED: "entregue",
+        STATUS_READ: "lida",
+    }
+
+    # Classe do erro do último envio (WhatsAppSender.last_error)
+    ERROR_CODES = {
+        None: 0,
+        "invalid": 1,
+        "timeout": 2,
+        "error": 3,
+        "logout": 4,
+        "banned": 5,
+        "throttled": 6,
+    }
+    ERROR_NAMES = {code: name or "" for name, code in ERROR_CODES.items()}
+
+    # Arrays paralelos (status fica em um bytearray à parte)
+    _COLUMNS = (
+        ("phones", "q"),
+        ("timestamps", "d"),
+        ("latencies", "f"),
+        ("message_ids", "I"),
+        ("rows", "I"),
+        ("source_ids", "H"),
+        ("attempts", "B"),
+        ("errors", "B"),
+    )
+
+    # E.164 permite no máximo 15 dígitos; acima de 18 não cabe em int64
+    _MAX_DIGITS = 18
+
+    def __init__(self):
+        """Inicializa um armazenamento vazio em memória"""
+        for name, typecode in self._COLUMNS:
+            setattr(self, name, array(typecode))
+        self.status = bytearray()
+
+        self._messages = []
+        self._message_index = {}
+        self._sources = [""]
+        self._source_index = {"": 0}
+
+    @classmethod
+    def from_contacts(cls, contacts, first_row=2):
+        """Cria o armazenamento a partir de uma lista de tuplas
+
+        Args:
+            contacts (iterable): Tuplas (telefone, mensagem)
+            first_row (int): Linha da planilha correspondente ao primeiro contato
+
+        Returns:
+            ContactStore: Armazenamento preenchido
+        """
+        store = cls()
+        for offset, (phone, message) in enumerate(contacts):
+            store.append(phone, message, first_row + offset)
+        return store
+
+    def append(self, phone, message, row=0, source=""):
+        """Adiciona um contato ao armazenamento
+
+        Números classificados como inválidos por PhoneNumberFormatter.classify
+        entram com status inválido e não são enviados; os que não podem ser
+        representados (vazios ou longos demais) são gravados como 0.
+
+        Args:
+            phone (str): Número de telefone em qualquer formato
+            message (str): Texto da mensagem
+            row (int): Linha de origem na planilha
+            source (str): Arquivo e aba de origem, quando a campanha junta várias
+        """
+        normalized, kind = PhoneNumberFormatter.classify(phone)
+        representable = re.sub(r'\D', '', str(phone)) and len(normalized) <= self._MAX_DIGITS
+        self.phones.append(int(normalized) if representable else 0)
+        if representable and kind != PhoneNumberFormatter.KIND_INVALID:
+            self.status.append(self.STATUS_PENDING)
+        else:
+            self.status.append(self.STATUS_INVALID)
+
+        self.message_ids.append(self._intern_message(message))
+        self.rows.append(row)
+        self.source_ids.append(self._intern_source(source))
+        self.timestamps.append(0.0)
+        self.latencies.append(0.0)
+        self.attempts.append(0)
+        self.errors.append(0)
+
+    def _intern_message(self, message):
+        """Retorna o id da mensagem na tabela deduplicada
+
+        Args:
+            message (str): Texto da mensagem
+
+        Returns:
+            int: Id da mensagem
+        """
+        message_id = self._message_index.get(message)
+        if message_id is None:
+            message_id = len(self._messages)
+            self._messages.append(message)
+            self._message_index[message] = message_id
+        return message_id
+
+    def _intern_source(self, source):
+        """Retorna o id da origem na tabela de origens
+
+        Args:
+            source (str): Arquivo e aba de origem
+
+        Returns:
+            int: Id da origem
+        """
+        source_id = self._source_index.get(source)
+        if source_id is None:
+            source_id = len(self._sources)
+            if source_id > 0xFFFF:
+                raise ValueError("Origens demais em uma única campanha")
+            self._sources.append(source)
+            self._source_index[source] = source_id
+        return source_id
+
+    def __len__(self):
+        return len(self.phones)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        """Retorna o contato no formato (telefone, mensagem)
+
+        Mantém compatibilidade com o código que consome listas de tuplas,
+        inclusive para fatias.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.phone(index), self.message(index)
+
+    def phone(self, index):
+        """Retorna o telefone normalizado como texto no formato E.164
+
+        O "+" mantém explícito o código de país, de modo que normalizar o
+        valor de novo não o confunda com um número nacional.
+
+        Args:
+            index (int): Índice do contato
+
+        Returns:
+            str: Telefone normalizado ou string vazia se inválido
+        """
+        value = self.phones[index]
+        return f"+{value}" if value else ""
+
+    def message(self, index):
+        """Retorna o texto da mensagem do contato
+
+        Args:
+            index (int): Índice do contato
+
+        Returns:
+            str: Texto da mensagem
+        """
+        return self._messages[self.message_ids[index]]
+
+    def row(self, index):
+        """Retorna a linha de origem do contato na planilha
+
+        Args:
+            index (int): Índice do contato
+
+        Returns:
+            int: Número da linha
+        """
+        return self.rows[index]
+
+    def source(self, index):
+        """Retorna o arquivo e a aba de origem do contato
+
+        Args:
+            index (int): Índice do contato
+
+        Returns:
+            str: Origem, ou "" quando a campanha vem de uma única aba
+        """
+        return self._sources[self.source_ids[index]]
+
+    @property
+    def sources(self):
+        """Origens distintas da campanha, na ordem em que apareceram
+
+        Returns:
+            list: Arquivo e aba de cada origem (sem a origem vazia)
+        """
+        return [source for source in self._sources if source]
+
+    def get_status(self, index):
+        """Retorna o status do contato
+
+        Args:
+            index (int): Índice do contato
+
+        Returns:
+            int: Um dos valores STATUS_*
+        """
+        return self.status[index]
+
+    def set_status(self, index, status):
+        """Atualiza o status do contato
+
+        Args:
+            index (int): Índice do contato
+            status (int): Um dos valores STATUS_*
+        """
+        self.status[index] = status
+
+    def record_attempt(self, index, status, error=None, latency=0.0):
+        """Registra o resultado de uma tentativa de envio
+
+        Args:
+            index (int): Índice do contato
+            status (int): Um dos valores STATUS_*
+            error (str, optional): Classe do erro (chave de ERROR_CODES)
+            latency (float): Duração da tentativa em segundos
+        """
+        self.status[index] = status
+        self.timestamps[index] = time.time()
+        self.latencies[index] = latency
+        self.attempts[index] = min(self.attempts[index] + 1, 255)
+        self.errors[index] = self.ERROR_CODES.get(error, self.ERROR_CODES["error"])
+
+    def indices_with_status(self, status):
+        """Itera sobre os índices dos contatos com determinado status
+
+        Args:
+            status (int): Um dos valores STATUS_*
+
+        Yields:
+            int: Índice do contato
+        """
+        data = bytes(self.status)
+        marker = bytes([status])
+        index = data.find(marker)
+        while index != -1:
+            yield index
+            index = data.find(marker, index + 1)
+
+    def status_counts(self):
+        """Conta os contatos por status
+
+        Returns:
+            dict: Mapeamento status → quantidade
+        """
+        data = bytes(self.status)
+        return {status: data.count(bytes([status])) for status in self.STATUS_NAMES}
+
+    @property
+    def nbytes(self):
+        """Tamanho aproximado em bytes dos arrays de contatos
+
+        Returns:
+            int: Bytes ocupados pelos arrays paralelos
+        """
+        itemsizes = sum(array(typecode).itemsize for _, typecode in self._COLUMNS)
+        return len(self) * (itemsizes + 1)
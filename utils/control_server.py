@@ -0,0 +1,150 @@
+"""
+Endpoint HTTP local para ajustar a campanha em andamento
+"""
+
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ControlServer:
+    """Endpoint HTTP local para ajustar a campanha em andamento
+
+    Escuta apenas em 127.0.0.1. Rotas:
+        GET  /settings  → configurações em vigor
+        POST /settings  → corpo JSON com as configurações a alterar
+
+    Toda requisição precisa do cabeçalho "Authorization: Bearer <token>" e o
+    POST exige "Content-Type: application/json". Os dois obrigam o navegador
+    a uma consulta CORS prévia, que o servidor não atende, então uma página
+    aberta no navegador do operador não consegue alterar a campanha.
+
+    As funções recebidas são chamadas na thread do servidor; cabe a elas
+    encaminhar a alteração para a thread adequada.
+    """
+
+    MAX_BODY = 64 * 1024
+
+    def __init__(self, port, get_settings, update_settings, token, logger=None):
+        """Inicializa o servidor (sem começar a escutar)
+
+        Args:
+            port (int): Porta local
+            get_settings (callable): Retorna o dicionário de configurações em vigor
+            update_settings (callable): Recebe o dicionário de alterações e retorna as
+                configurações aceitas; levanta ValueError se forem inválidas
+            token (str): Token exigido no cabeçalho Authorization
+            logger (Logger, optional): Instância de Logger para registro de logs
+        """
+        self.port = port
+        self.get_settings = get_settings
+        self.update_settings = update_settings
+        self.token = token
+        self.logger = logger
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Começa a escutar em uma thread dedicada
+
+        Returns:
+            bool: True se o servidor foi iniciado
+        """
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler_class())
+        except OSError as e:
+            self._log(f"⚠️ Não foi possível abrir o endpoint de controle na porta {self.port}: {str(e)}")
+            return False
+
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="opsender-control", daemon=True)
+        self._thread.start()
+        self._log(f"🎛️ Endpoint de controle em http://127.0.0.1:{self.port}/settings "
+                  "(token em control_token no config.json)")
+        return True
+
+    def stop(self):
+        """Encerra o servidor"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _log(self, message):
+        """Registra uma mensagem se houver logger
+
+        Args:
+            message (str): Mensagem a registrar
+        """
+        if self.logger:
+            self.logger.log(message)
+
+    def authorized(self, header):
+        """Confere o cabeçalho Authorization
+
+        Args:
+            header (str | None): Valor recebido
+
+        Returns:
+            bool: True se o token confere
+        """
+        if not self.token or not header:
+            return False
+        return hmac.compare_digest(header.encode("utf-8"), f"Bearer {self.token}".encode("utf-8"))
+
+    def _handler_class(self):
+        """Cria a classe de tratamento de requisições ligada a este servidor
+
+        Returns:
+            type: Subclasse de BaseHTTPRequestHandler
+        """
+        control = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if not self._check_request():
+                    return
+                self._reply(200, control.get_settings())
+
+            def do_POST(self):
+                if not self._check_request():
+                    return
+                content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+                if content_type != "application/json":
+                    self._reply(415, {"erro": "use Content-Type: application/json"})
+                    return
+
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > control.MAX_BODY:
+                    self._reply(413, {"erro": "corpo grande demais"})
+                    return
+                try:
+                    settings = json.loads(self.rfile.read(length) or b"{}")
+                    if not isinstance(settings, dict):
+                        raise ValueError("o corpo deve ser um objeto JSON")
+                    self._reply(200, control.update_settings(settings))
+                except ValueError as e:
+                    self._reply(400, {"erro": str(e)})
+
+            def _check_request(self):
+                if self.path.rstrip("/") != "/settings":
+                    self._reply(404, {"erro": "rota desconhecida"})
+                    return False
+                if not control.authorized(self.headers.get("Authorization")):
+                    self._reply(401, {"erro": "token ausente ou inválido"})
+                    return False
+                return True
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Sem registro de cada requisição no console
+
+        return Handler
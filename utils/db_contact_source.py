@@ -0,0 +1,210 @@
+"""
+Fonte de contatos lida diretamente de um banco de dados
+"""
+
+import asyncio
+import pathlib
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DBContactSource:
+    """Fonte de contatos lida diretamente de um banco de dados
+
+    Executa uma consulta SQL cuja primeira coluna é o telefone e a segunda
+    a mensagem; as demais colunas viram variáveis que preenchem marcadores
+    {nome_da_coluna} no texto. As linhas são buscadas em lotes com
+    fetchmany, e em bancos com suporte (ex.: PostgreSQL via psycopg2) o
+    cursor nomeado fica no servidor, sem trazer o resultado inteiro para
+    a memória.
+
+    Com stream(), o lote seguinte é buscado em segundo plano enquanto o
+    anterior é enviado, de modo que o envio começa antes de a consulta
+    terminar.
+    """
+
+    _PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+    def __init__(self, connect, query, params=(), batch_size=500, cursor_name=None, count_query=None):
+        """Inicializa a fonte (a conexão só é aberta ao ler os contatos)
+
+        Args:
+            connect (callable): Função sem argumentos que retorna uma conexão DB-API
+            query (str): Consulta que retorna telefone, mensagem e variáveis
+            params (tuple | dict): Parâmetros da consulta
+            batch_size (int): Linhas buscadas por vez
+            cursor_name (str, optional): Nome do cursor no servidor, para drivers que
+                aceitam cursores nomeados; os demais usam um cursor comum
+            count_query (str, optional): Consulta que retorna o total de contatos, usada
+                para a barra de progresso
+        """
+        self.connect = connect
+        self.query = query
+        self.params = params
+        self.batch_size = batch_size
+        self.cursor_name = cursor_name
+        self.count_query = count_query
+
+    @classmethod
+    def sqlite(cls, path, query, params=(), batch_size=500, count_query=None):
+        """Cria uma fonte para um arquivo SQLite, aberto somente para leitura
+
+        Args:
+            path (str): Caminho do arquivo do banco
+            query (str): Consulta que retorna telefone, mensagem e variáveis
+            params (tuple | dict): Parâmetros da consulta
+            batch_size (int): Linhas buscadas por vez
+            count_query (str, optional): Consulta que retorna o total de contatos
+
+        Returns:
+            DBContactSource: Fonte configurada
+        """
+        # as_uri() escapa espaços, "?" e "#" no caminho
+        uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+        return cls(lambda: sqlite3.connect(uri, uri=True), query, params, batch_size,
+                   count_query=count_query)
+
+    @classmethod
+    def dbapi(cls, module, query, params=(), batch_size=500, cursor_name="opsender_contatos",
+              count_query=None, **connect_kwargs):
+        """Cria uma fonte para qualquer driver DB-API 2.0
+
+        Args:
+            module: Módulo do driver (ex.: psycopg2, pymysql)
+            query (str): Consulta que retorna telefone, mensagem e variáveis
+            params (tuple | dict): Parâmetros da consulta, no estilo do driver
+            batch_size (int): Linhas buscadas por vez
+            cursor_name (str, optional): Nome do cursor no servidor
+            count_query (str, optional): Consulta que retorna o total de contatos
+            **connect_kwargs: Argumentos repassados a module.connect
+
+        Returns:
+            DBContactSource: Fonte configurada
+        """
+        return cls(lambda: module.connect(**connect_kwargs), query, params, batch_size,
+                   cursor_name, count_query)
+
+    def _open_cursor(self, connection):
+        """Abre um cursor no servidor quando o driver aceitar, senão um cursor comum
+
+        Args:
+            connection: Conexão DB-API
+
+        Returns:
+            Cursor DB-API
+        """
+        if self.cursor_name:
+            try:
+                return connection.cursor(self.cursor_name)
+            except TypeError:
+                pass  # Driver sem cursores nomeados
+        return connection.cursor()
+
+    def count(self):
+        """Conta os contatos com a consulta de contagem, se configurada
+
+        Returns:
+            int | None: Total de contatos, ou None sem consulta de contagem
+        """
+        if not self.count_query:
+            return None
+        connection = self.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(self.count_query, self.params)
+            row = cursor.fetchone()
+            return int(row[0]) if row else 0
+        finally:
+            connection.close()
+
+    def batches(self):
+        """Lê os contatos em lotes, de forma síncrona
+
+        A conexão é aberta na primeira iteração e fechada ao final (ou quando
+        o gerador é fechado), sempre na mesma thread.
+
+        Yields:
+            list: Tuplas (telefone, mensagem, variáveis)
+        """
+        connection = self.connect()
+        try:
+            cursor = self._open_cursor(connection)
+            try:
+                cursor.arraysize = self.batch_size
+            except AttributeError:
+                pass
+            cursor.execute(self.query, self.params)
+
+            columns = [column[0] for column in cursor.description or ()]
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield [self._contact(row, columns) for row in rows]
+            cursor.close()
+        finally:
+            connection.close()
+
+    def _contact(self, row, columns):
+        """Converte uma linha da consulta em contato
+
+        Args:
+            row (tuple): Linha retornada pelo cursor
+            columns (list): Nomes das colunas
+
+        Returns:
+            tuple: (telefone, mensagem com as variáveis aplicadas, variáveis)
+        """
+        phone = "" if row[0] is None else str(row[0]).strip()
+        message = "" if len(row) < 2 or row[1] is None else str(row[1]).strip()
+        variables = {columns[i]: row[i] for i in range(2, min(len(row), len(columns)))}
+        return phone, self.render(message, variables), variables
+
+    @classmethod
+    def render(cls, message, variables):
+        """Preenche os marcadores {coluna} da mensagem
+
+        Marcadores sem coluna correspondente são mantidos como estão.
+
+        Args:
+            message (str): Texto com marcadores
+            variables (dict): Coluna → valor
+
+        Returns:
+            str: Mensagem personalizada
+        """
+        if not variables or "{" not in message:
+            return message
+
+        def replace(match):
+            value = variables.get(match.group(1))
+            return match.group(0) if value is None else str(value)
+
+        return cls._PLACEHOLDER.sub(replace, message)
+
+    async def stream(self):
+        """Entrega os lotes sem bloquear o laço asyncio
+
+        As leituras rodam em uma thread dedicada (conexões como as do SQLite
+        só podem ser usadas na thread que as criou). O próximo lote é
+        buscado enquanto o atual é processado.
+
+        Yields:
+            list: Tuplas (telefone, mensagem, variáveis)
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="opsender-db")
+        iterator = self.batches()
+        try:
+            pending = loop.run_in_executor(executor, next, iterator, None)
+            while True:
+                batch = await pending
+                if batch is None:
+                    break
+                pending = loop.run_in_executor(executor, next, iterator, None)
+                yield batch
+        finally:
+            # Fecha a conexão na mesma thread em que foi aberta
+            await loop.run_in_executor(executor, iterator.close)
+            executor.shutdown(wait=False)
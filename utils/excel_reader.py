@@ -3,7 +3,43 @@ Leitor de dados de planilhas Excel
 """
 
 import os
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.contact_store import ContactStore
+from utils.phone_formatter import PhoneNumberFormatter
+from utils.xlsx_inspector import XlsxInspector
+
+
+def _read_sheet(file_path, sheet=0):
+    """Lê uma aba ignorando o cabeçalho e as linhas sem número
+
+    Usada por todas as leituras de planilha, inclusive nos processos de
+    leitura de read_many.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        sheet (str | int): Nome ou posição da aba
+
+    Returns:
+        list: Tuplas (telefone, mensagem, linha na planilha)
+    """
+    import pandas as pd
+
+    df = pd.read_excel(
+        file_path,
+        sheet_name=sheet,
+        header=None,
+        skiprows=1,
+        usecols=[0, 1],
+        dtype={0: str, 1: str}
+    )
+    df = df.dropna(subset=[0])
+
+    # O índice do DataFrame começa em 0 na linha 2 da planilha
+    return [
+        (str(numero).strip(), str(mensagem).strip() if pd.notna(mensagem) else "", index + 2)
+        for index, numero, mensagem in zip(df.index, df[0], df[1])
+    ]
 
 
 class ExcelReader:
@@ -29,24 +65,160 @@ class ExcelReader:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
 
-        # Lê a planilha ignorando a primeira linha (linha de título)
-        # Usa otimização para ler apenas as colunas necessárias
-        df = pd.read_excel(
-            file_path, 
-            header=None, 
-            skiprows=1, 
-            usecols=[0, 1],  # Lê apenas as duas primeiras colunas
-            dtype={0: str, 1: str}
-        )
-
-        # Filtra linhas vazias de forma eficiente
-        df = df.dropna(subset=[0])  # Remove linhas com número vazio
-        
-        # Processa os dados de forma otimizada
-        contatos = []
-        for _, row in df.iterrows():
-            numero = str(row[0]).strip()
-            mensagem = str(row[1]).strip() if pd.notna(row[1]) else ""
-            contatos.append((numero, mensagem))
-
-        return contatos
+        return [(numero, mensagem) for numero, mensagem, _ in _read_sheet(file_path)]
+
+    @staticmethod
+    def read_contact_store(file_path):
+        """Lê os contatos da planilha em um armazenamento compacto
+
+        Equivalente a read_contacts, mas guarda os contatos em um
+        ContactStore e preserva a linha original de cada contato na planilha.
+
+        Args:
+            file_path (str): Caminho do arquivo Excel
+
+        Returns:
+            ContactStore: Contatos em arrays paralelos
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+            Exception: Se houver erro na leitura
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+        store = ContactStore()
+        for numero, mensagem, row in _read_sheet(file_path):
+            store.append(numero, mensagem, row)
+
+        return store
+
+    @staticmethod
+    def write_contacts(file_path, contacts):
+        """Grava contatos em uma planilha no mesmo formato lido pelo aplicativo
+
+        A primeira linha recebe o cabeçalho, seguida de uma linha por contato.
+
+        Args:
+            file_path (str): Caminho do arquivo Excel de destino
+            contacts (iterable): Tuplas (telefone, mensagem)
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(list(contacts), columns=["Telefone", "Mensagem"])
+        df.to_excel(file_path, index=False)
+
+    @staticmethod
+    def expand_paths(paths):
+        """Expande pastas na lista de planilhas
+
+        Arquivos temporários do Excel (~$) e cópias de resultado geradas
+        pelo aplicativo (_resultado, _verificado) são ignorados.
+
+        Args:
+            paths (list): Arquivos .xlsx e/ou pastas com planilhas
+
+        Returns:
+            list: Arquivos de planilha, pastas em ordem alfabética
+        """
+        files = []
+        for path in paths:
+            if not os.path.isdir(path):
+                files.append(path)
+                continue
+            for name in sorted(os.listdir(path)):
+                stem, ext = os.path.splitext(name)
+                if (ext.lower() in (".xlsx", ".xlsm", ".xls") and not name.startswith("~$")
+                        and not stem.endswith(("_resultado", "_verificado"))):
+                    files.append(os.path.join(path, name))
+        return files
+
+    @staticmethod
+    def sheet_names(file_path):
+        """Lista as abas de uma planilha
+
+        Args:
+            file_path (str): Caminho do arquivo Excel
+
+        Returns:
+            list: Nomes das abas
+        """
+        if file_path.lower().endswith((".xlsx", ".xlsm")):
+            return XlsxInspector.sheet_names(file_path)
+
+        import pandas as pd
+
+        with pd.ExcelFile(file_path) as workbook:
+            return list(workbook.sheet_names)
+
+    @classmethod
+    def read_many(cls, paths, sheets="*", max_workers=None):
+        """Lê várias abas e arquivos em paralelo e junta os contatos sem repetição
+
+        Cada aba é lida em um processo separado (a leitura de xlsx é
+        limitada pela CPU, então threads não ajudariam), de modo que o
+        tempo total acompanha o número de núcleos e não o de arquivos. A
+        junção segue a ordem dos arquivos e das abas: só é descartada a linha
+        com o mesmo telefone e a mesma mensagem de uma linha anterior, então
+        mensagens diferentes para o mesmo número continuam sendo enviadas,
+        como na leitura de uma única aba. Cada contato guarda o arquivo e a
+        aba de origem (ContactStore.source) e a linha na aba.
+
+        Args:
+            paths (list): Arquivos e/ou pastas com planilhas
+            sheets (str | list): "*" para todas as abas, "" para só a primeira,
+                ou nomes das abas (as ausentes em um arquivo são ignoradas)
+            max_workers (int, optional): Processos de leitura. Padrão: número de núcleos
+
+        Returns:
+            tuple: (ContactStore com os contatos, quantidade de repetidos descartados)
+
+        Raises:
+            FileNotFoundError: Se algum arquivo não existir
+        """
+        files = cls.expand_paths(paths)
+        for file_path in files:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+        if isinstance(sheets, str) and sheets not in ("*", ""):
+            sheets = [name.strip() for name in sheets.split(",") if name.strip()]
+
+        tasks = []
+        for file_path in files:
+            if sheets == "":
+                tasks.append((file_path, 0, os.path.basename(file_path)))
+                continue
+            names = cls.sheet_names(file_path)
+            if sheets != "*":
+                names = [name for name in names if name in sheets]
+            for name in names:
+                tasks.append((file_path, name, f"{os.path.basename(file_path)}:{name}"))
+
+        if len(tasks) <= 1 or max_workers == 1:
+            results = [_read_sheet(file_path, sheet) for file_path, sheet, _ in tasks]
+        else:
+            workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map devolve na ordem das abas, o que torna a remoção de repetidos determinística
+                results = list(executor.map(_read_sheet, [task[0] for task in tasks],
+                                            [task[1] for task in tasks]))
+
+        store = ContactStore()
+        seen = set()
+        duplicates = 0
+        # Com uma única aba a origem fica vazia, como em read_contact_store
+        single = len(tasks) == 1
+        for (_, _, label), rows in zip(tasks, results):
+            for numero, mensagem, row in rows:
+                normalized, kind = PhoneNumberFormatter.classify(numero)
+                if kind != PhoneNumberFormatter.KIND_INVALID:
+                    # Inválidos não são comparados: ficam todos para aparecer no relatório
+                    key = (normalized, mensagem)
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                store.append(numero, mensagem, row, "" if single else label)
+
+        return store, duplicates
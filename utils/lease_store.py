@@ -0,0 +1,516 @@
+"""
+Distribuição de uma campanha entre várias máquinas por arrendamento de lotes
+"""
+
+import asyncio
+import contextlib
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.contact_store import ContactStore
+
+
+def default_worker_id():
+    """Identificador da máquina e do processo para os arrendamentos
+
+    Returns:
+        str: "<hostname>-<sufixo aleatório>"
+    """
+    return f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+
+
+class SQLiteLeaseStore:
+    """Tabela de arrendamentos em um arquivo SQLite compartilhado
+
+    Cada contato da campanha é uma linha com o status (ContactStore.STATUS_*)
+    e, enquanto pendente, o trabalhador que o arrendou e o horário em que o
+    arrendamento expira. Arrendamentos vencidos (trabalhador parado ou
+    desligado) voltam a ser reivindicáveis por qualquer máquina.
+
+    O arquivo pode ficar em um volume de rede compartilhado: as operações
+    abrem uma conexão própria, usam o journal padrão (WAL não funciona em
+    sistemas de arquivos de rede) e reivindicam linhas dentro de uma
+    transação BEGIN IMMEDIATE, que serializa os trabalhadores.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            campaign TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            phone TEXT NOT NULL,
+            message TEXT NOT NULL,
+            row INTEGER NOT NULL DEFAULT 0,
+            source TEXT NOT NULL DEFAULT '',
+            status INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            expires REAL NOT NULL DEFAULT 0,
+            claims INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (campaign, idx)
+        );
+        CREATE INDEX IF NOT EXISTS leases_claim ON leases (campaign, status, expires);
+    """
+
+    def __init__(self, path, timeout=30.0):
+        """Abre (ou cria) a tabela de arrendamentos
+
+        Args:
+            path (str): Caminho do arquivo SQLite compartilhado
+            timeout (float): Espera máxima por bloqueios de outros trabalhadores
+        """
+        self.path = path
+        self.timeout = timeout
+        with self._connect() as connection:
+            connection.executescript(self._SCHEMA)
+            # Tabelas criadas antes da coluna de origem
+            columns = {column[1] for column in connection.execute("PRAGMA table_info(leases)")}
+            if "source" not in columns:
+                connection.execute("ALTER TABLE leases ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+
+    def _connect(self):
+        """Abre uma conexão em modo de transação manual
+
+        Returns:
+            sqlite3.Connection: Conexão que fecha ao sair do bloco with
+        """
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        # Fechar a conexão descarta uma transação interrompida por exceção
+        return contextlib.closing(connection)
+
+    def load(self, campaign, contacts):
+        """Cadastra os contatos da campanha, ignorando os já cadastrados
+
+        Pode ser chamado por todas as máquinas com a mesma planilha: a
+        posição de cada contato é a chave, então a carga é idempotente.
+
+        Args:
+            campaign (str): Nome da campanha
+            contacts (ContactStore | list): Contatos; de um ContactStore também
+                são copiados a linha e a origem na planilha e o status
+                inválido, que já entra como resultado final
+
+        Returns:
+            int: Contatos cadastrados nesta chamada
+        """
+        rows = []
+        for index, (phone, message) in enumerate(contacts):
+            if isinstance(contacts, ContactStore):
+                row, source, status = contacts.row(index), contacts.source(index), contacts.get_status(index)
+            else:
+                row, source, status = index + 2, "", ContactStore.STATUS_PENDING
+            rows.append((campaign, index, phone, message, row, source, status, time.time()))
+
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO leases (campaign, idx, phone, message, row, source, status, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            inserted = connection.total_changes - before
+            connection.execute("COMMIT")
+        return inserted
+
+    def claim(self, campaign, worker, limit, lease_seconds):
+        """Arrenda até `limit` contatos pendentes, inclusive de arrendamentos vencidos
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+            limit (int): Máximo de contatos
+            lease_seconds (float): Duração do arrendamento
+
+        Returns:
+            list: Tuplas (idx, telefone, mensagem, linha, status, origem)
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                "SELECT idx, phone, message, row, status, source FROM leases "
+                "WHERE campaign = ? AND status = ? AND (worker IS NULL OR expires < ?) "
+                "ORDER BY idx LIMIT ?",
+                (campaign, ContactStore.STATUS_PENDING, now, limit)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE leases SET worker = ?, expires = ?, claims = claims + 1, updated = ? "
+                "WHERE campaign = ? AND idx = ?",
+                [(worker, now + lease_seconds, now, campaign, row[0]) for row in rows])
+            connection.execute("COMMIT")
+        return rows
+
+    def renew(self, campaign, worker, lease_seconds):
+        """Prorroga todos os arrendamentos em aberto do trabalhador
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+            lease_seconds (float): Nova duração a partir de agora
+
+        Returns:
+            int: Arrendamentos prorrogados
+        """
+        now = time.time()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE leases SET expires = ?, updated = ? "
+                "WHERE campaign = ? AND worker = ? AND status = ?",
+                (now + lease_seconds, now, campaign, worker, ContactStore.STATUS_PENDING))
+            return cursor.rowcount
+
+    def complete(self, campaign, worker, idx, status, error=None):
+        """Registra o resultado de um contato arrendado
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+            idx (int): Posição do contato na campanha
+            status (int): ContactStore.STATUS_SENT, STATUS_FAILED ou STATUS_INVALID
+            error (str, optional): Classe do erro
+
+        Returns:
+            bool: False se o contato não pertence mais a este trabalhador
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE leases SET status = ?, error = ?, updated = ? "
+                "WHERE campaign = ? AND idx = ? AND worker = ?",
+                (status, error, time.time(), campaign, idx, worker))
+            return cursor.rowcount > 0
+
+    def release(self, campaign, worker):
+        """Devolve os contatos ainda não concluídos do trabalhador
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+
+        Returns:
+            int: Contatos devolvidos
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE leases SET worker = NULL, expires = 0, updated = ? "
+                "WHERE campaign = ? AND worker = ? AND status = ?",
+                (time.time(), campaign, worker, ContactStore.STATUS_PENDING))
+            return cursor.rowcount
+
+    def outstanding(self, campaign):
+        """Conta os contatos ainda não concluídos (livres ou arrendados)
+
+        Args:
+            campaign (str): Nome da campanha
+
+        Returns:
+            int: Contatos sem resultado final
+        """
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM leases WHERE campaign = ? AND status = ?",
+                (campaign, ContactStore.STATUS_PENDING)).fetchone()[0]
+
+    def counts(self, campaign):
+        """Resumo da campanha em todas as máquinas
+
+        Args:
+            campaign (str): Nome da campanha
+
+        Returns:
+            dict: Nome do status → quantidade
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT status, COUNT(*) FROM leases WHERE campaign = ? GROUP BY status",
+                (campaign,)).fetchall()
+        return {ContactStore.STATUS_NAMES.get(status, str(status)): count for status, count in rows}
+
+
+class MemoryLeaseStore:
+    """Tabela de arrendamentos em memória, com a mesma interface do SQLiteLeaseStore
+
+    Serve para uma única máquina (vários trabalhadores no mesmo processo) e
+    como substituto local do armazenamento compartilhado.
+    """
+
+    def __init__(self):
+        """Inicializa a tabela vazia"""
+        self._rows = {}  # (campanha, idx) → dict
+        self._lock = threading.Lock()
+
+    def load(self, campaign, contacts):
+        """Cadastra os contatos da campanha, ignorando os já cadastrados
+
+        Args:
+            campaign (str): Nome da campanha
+            contacts (ContactStore | list): Contatos
+
+        Returns:
+            int: Contatos cadastrados nesta chamada
+        """
+        inserted = 0
+        with self._lock:
+            for index, (phone, message) in enumerate(contacts):
+                if (campaign, index) in self._rows:
+                    continue
+                if isinstance(contacts, ContactStore):
+                    row, source, status = contacts.row(index), contacts.source(index), contacts.get_status(index)
+                else:
+                    row, source, status = index + 2, "", ContactStore.STATUS_PENDING
+                self._rows[(campaign, index)] = {
+                    "phone": phone, "message": message, "row": row, "source": source, "status": status,
+                    "worker": None, "expires": 0.0, "claims": 0, "error": None,
+                }
+                inserted += 1
+        return inserted
+
+    def _open(self, campaign):
+        """Linhas da campanha ainda sem resultado final, em ordem
+
+        Args:
+            campaign (str): Nome da campanha
+
+        Returns:
+            list: Tuplas (idx, linha)
+        """
+        return sorted((idx, entry) for (name, idx), entry in self._rows.items()
+                      if name == campaign and entry["status"] == ContactStore.STATUS_PENDING)
+
+    def claim(self, campaign, worker, limit, lease_seconds):
+        """Arrenda até `limit` contatos pendentes, inclusive de arrendamentos vencidos
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+            limit (int): Máximo de contatos
+            lease_seconds (float): Duração do arrendamento
+
+        Returns:
+            list: Tuplas (idx, telefone, mensagem, linha, status, origem)
+        """
+        now = time.time()
+        claimed = []
+        with self._lock:
+            for idx, entry in self._open(campaign):
+                if len(claimed) >= limit:
+                    break
+                if entry["worker"] is None or entry["expires"] < now:
+                    entry.update(worker=worker, expires=now + lease_seconds, claims=entry["claims"] + 1)
+                    claimed.append((idx, entry["phone"], entry["message"], entry["row"], entry["status"],
+                                    entry["source"]))
+        return claimed
+
+    def renew(self, campaign, worker, lease_seconds):
+        """Prorroga todos os arrendamentos em aberto do trabalhador
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+            lease_seconds (float): Nova duração a partir de agora
+
+        Returns:
+            int: Arrendamentos prorrogados
+        """
+        expires = time.time() + lease_seconds
+        with self._lock:
+            entries = [entry for _, entry in self._open(campaign) if entry["worker"] == worker]
+            for entry in entries:
+                entry["expires"] = expires
+        return len(entries)
+
+    def complete(self, campaign, worker, idx, status, error=None):
+        """Registra o resultado de um contato arrendado
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+            idx (int): Posição do contato na campanha
+            status (int): ContactStore.STATUS_SENT, STATUS_FAILED ou STATUS_INVALID
+            error (str, optional): Classe do erro
+
+        Returns:
+            bool: False se o contato não pertence mais a este trabalhador
+        """
+        with self._lock:
+            entry = self._rows.get((campaign, idx))
+            if entry is None or entry["worker"] != worker:
+                return False
+            entry.update(status=status, error=error)
+            return True
+
+    def release(self, campaign, worker):
+        """Devolve os contatos ainda não concluídos do trabalhador
+
+        Args:
+            campaign (str): Nome da campanha
+            worker (str): Identificador do trabalhador
+
+        Returns:
+            int: Contatos devolvidos
+        """
+        with self._lock:
+            entries = [entry for _, entry in self._open(campaign) if entry["worker"] == worker]
+            for entry in entries:
+                entry.update(worker=None, expires=0.0)
+        return len(entries)
+
+    def outstanding(self, campaign):
+        """Conta os contatos ainda não concluídos (livres ou arrendados)
+
+        Args:
+            campaign (str): Nome da campanha
+
+        Returns:
+            int: Contatos sem resultado final
+        """
+        with self._lock:
+            return len(self._open(campaign))
+
+    def counts(self, campaign):
+        """Resumo da campanha
+
+        Args:
+            campaign (str): Nome da campanha
+
+        Returns:
+            dict: Nome do status → quantidade
+        """
+        counts = {}
+        with self._lock:
+            for (name, _), entry in self._rows.items():
+                if name == campaign:
+                    label = ContactStore.STATUS_NAMES.get(entry["status"], str(entry["status"]))
+                    counts[label] = counts.get(label, 0) + 1
+        return counts
+
+
+class LeasedContactSource:
+    """Fonte de contatos que arrenda lotes de uma campanha compartilhada
+
+    Usada com WhatsAppSender.process_contacts como as demais fontes em
+    streaming: cada lote é arrendado quando o anterior termina, os
+    arrendamentos em aberto são prorrogados em segundo plano e o resultado
+    de cada contato é devolvido ao armazenamento sem bloquear o laço de
+    envio: as gravações rodam em uma thread dedicada, na ordem em que foram
+    pedidas, e os arrendamentos e liberações passam pela mesma thread,
+    então nunca ultrapassam um resultado ainda não gravado. Ao encerrar, os contatos
+    não concluídos são liberados para as outras máquinas. Quando não há
+    mais contatos livres mas ainda há arrendamentos de outras máquinas,
+    aguarda: se elas pararem, os contatos voltam a ficar livres quando o
+    arrendamento vencer.
+    """
+
+    def __init__(self, store, campaign, worker=None, batch_size=20, lease_seconds=600,
+                 poll_interval=30.0):
+        """Inicializa a fonte
+
+        Args:
+            store (SQLiteLeaseStore | MemoryLeaseStore): Armazenamento de arrendamentos
+            campaign (str): Nome da campanha
+            worker (str, optional): Identificador desta máquina. Padrão: default_worker_id()
+            batch_size (int): Contatos arrendados por vez
+            lease_seconds (float): Duração de cada arrendamento
+            poll_interval (float): Espera entre tentativas quando tudo está arrendado
+        """
+        self.store = store
+        self.campaign = campaign
+        self.worker = worker or default_worker_id()
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._indices = []  # posição local (ordem de chegada) → idx na campanha
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="opsender-leases")
+        self._stop_event = None
+
+    def count(self):
+        """Contatos ainda sem resultado final na campanha
+
+        Returns:
+            int: Estimativa do total para a barra de progresso
+        """
+        return self.store.outstanding(self.campaign)
+
+    async def stream(self):
+        """Arrenda e entrega os lotes até a campanha terminar
+
+        Yields:
+            list: Tuplas (telefone, mensagem, variáveis, linha, origem), com a
+                linha e a origem na planilha cadastrada
+        """
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        renewer = asyncio.create_task(self._renew_loop())
+        try:
+            while not self._stop_event.is_set():
+                rows = await loop.run_in_executor(
+                    self._executor, self.store.claim, self.campaign, self.worker, self.batch_size,
+                    self.lease_seconds)
+                if not rows:
+                    if not await loop.run_in_executor(self._executor, self.store.outstanding, self.campaign):
+                        break
+                    await self._wait(self.poll_interval)
+                    continue
+
+                self._indices.extend(row[0] for row in rows)
+                yield [(phone, message, {}, row, source) for _, phone, message, row, _, source in rows]
+        finally:
+            renewer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await renewer
+            await loop.run_in_executor(self._executor, self.store.release, self.campaign, self.worker)
+
+    def stop(self):
+        """Interrompe a espera por contatos livres (o envio foi interrompido)"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def _wait(self, seconds):
+        """Aguarda o intervalo ou até stop() ser chamado
+
+        Args:
+            seconds (float): Tempo máximo de espera
+        """
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _renew_loop(self):
+        """Prorroga os arrendamentos em aberto a cada terço da duração
+
+        A prorrogação passa pela mesma thread das gravações, que é a única
+        a usar a conexão com o armazenamento.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wait(self.lease_seconds / 3)
+            if self._stop_event.is_set():
+                return
+            try:
+                await loop.run_in_executor(self._executor, self.store.renew, self.campaign, self.worker,
+                                           self.lease_seconds)
+            except sqlite3.Error:
+                pass  # Tenta de novo na próxima rodada
+
+    def complete(self, index, status, error=None):
+        """Agenda a gravação do resultado de um contato, sem esperar
+
+        Args:
+            index (int): Posição local do contato (ordem de chegada nos lotes)
+            status (int): ContactStore.STATUS_SENT, STATUS_FAILED ou STATUS_INVALID
+            error (str, optional): Classe do erro
+
+        Returns:
+            concurrent.futures.Future: Resolve em False se o arrendamento já
+                tinha sido perdido para outra máquina
+        """
+        return self._executor.submit(
+            self.store.complete, self.campaign, self.worker, self._indices[index], status, error)
+
+    async def flush(self):
+        """Aguarda a gravação de todos os resultados já agendados"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, lambda: None)
+
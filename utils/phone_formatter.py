@@ -6,34 +6,191 @@ import re
 from functools import lru_cache
 
 
+def _build_country_table():
+    """Monta a tabela de códigos de país (E.164) indexada por tamanho
+
+    Os códigos de país formam um conjunto livre de prefixos: nenhum código
+    é prefixo de outro, então basta testar os prefixos de 1 a 3 dígitos.
+
+    Returns:
+        dict: Tamanho do código → conjunto de códigos
+    """
+    codes = {"1", "7"}
+    codes.update(str(code) for code in (
+        20, 27, 30, 31, 32, 33, 34, 36, 39, 40, 41, 43, 44, 45, 46, 47, 48, 49,
+        51, 52, 53, 54, 55, 56, 57, 58, 60, 61, 62, 63, 64, 65, 66, 81, 82, 84,
+        86, 90, 91, 92, 93, 94, 95, 98,
+    ))
+    codes.update(str(code) for code in (
+        211, 212, 213, 216, 218, 290, 291, 297, 298, 299, 420, 421, 423,
+        850, 852, 853, 855, 856, 880, 886, 992, 993, 994, 995, 996, 998,
+    ))
+    for start, end in ((220, 269), (350, 359), (370, 389), (500, 509),
+                       (590, 599), (670, 692), (960, 968), (970, 977)):
+        codes.update(str(code) for code in range(start, end + 1))
+
+    table = {1: set(), 2: set(), 3: set()}
+    for code in codes:
+        table[len(code)].add(code)
+    return table
+
+
 class PhoneNumberFormatter:
-    """Utilitário para formatação de números de telefone no padrão internacional"""
-    
+    """Utilitário para formatação de números de telefone no padrão internacional
+
+    A normalização usa tabelas pré-compiladas de códigos de país e de DDDs
+    brasileiros. Números sem código de país explícito são tratados como
+    brasileiros (país padrão), com inclusão do 9 apenas em celulares; fixos
+    e números estrangeiros são preservados.
+    """
+
+    DEFAULT_COUNTRY = "55"
+
+    COUNTRY_CODES = _build_country_table()
+
+    BRAZIL_DDDS = frozenset(str(ddd) for ddd in (
+        11, 12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 24, 27, 28,
+        31, 32, 33, 34, 35, 37, 38, 41, 42, 43, 44, 45, 46, 47, 48, 49,
+        51, 53, 54, 55, 61, 62, 63, 64, 65, 66, 67, 68, 69,
+        71, 73, 74, 75, 77, 79, 81, 82, 83, 84, 85, 86, 87, 88, 89,
+        91, 92, 93, 94, 95, 96, 97, 98, 99,
+    ))
+
+    KIND_MOBILE = "mobile"
+    KIND_LANDLINE = "landline"
+    KIND_INTERNATIONAL = "international"
+    KIND_INVALID = "invalid"
+
+    _NON_DIGITS = re.compile(r'\D')
+    _FLOAT_SUFFIX = re.compile(r'\.0+$')  # Célula numérica lida como float (ex.: "11987654321.0")
+
     @staticmethod
-    @lru_cache(maxsize=128)  # Cache para evitar processamento repetido de números
     def normalize(phone):
         """Normaliza o número de telefone para o formato internacional
-        
+
         Converte qualquer formato de número para o padrão internacional,
         adicionando código do país (55 para Brasil) e o 9 para celulares
         brasileiros quando necessário.
-        
+
         Args:
             phone (str): Número de telefone em qualquer formato
-            
+
         Returns:
             str: Número formatado no padrão internacional
         """
-        # Remove caracteres não numéricos
-        phone = re.sub(r'\D', '', str(phone))
+        return PhoneNumberFormatter.classify(phone)[0]
+
+    @staticmethod
+    @lru_cache(maxsize=65536)  # Cache para evitar processamento repetido de números
+    def classify(phone):
+        """Normaliza o número e identifica o tipo de linha
+
+        Regras:
+            - um ".0" no final (número lido como float) é descartado;
+            - "+" ou "00" no início indicam código de país explícito;
+            - sem código explícito, 10 ou 11 dígitos (com DDD, aceitando o 0
+              de longa distância) são números brasileiros;
+            - 12 ou 13 dígitos iniciados por 55 e DDD válido são brasileiros;
+            - números longos iniciados por outro código de país são mantidos;
+            - no Brasil, assinantes de 8 dígitos iniciados por 6-9 são
+              celulares sem o 9; os iniciados por 2-5 são fixos.
+
+        Args:
+            phone (str): Número de telefone em qualquer formato
+
+        Returns:
+            tuple: (número normalizado, tipo) com tipo em KIND_*
+        """
+        raw = PhoneNumberFormatter._FLOAT_SUFFIX.sub('', str(phone).strip())
+        digits = PhoneNumberFormatter._NON_DIGITS.sub('', raw)
+        if not digits:
+            return PhoneNumberFormatter.DEFAULT_COUNTRY, PhoneNumberFormatter.KIND_INVALID
+
+        # Código de país explícito
+        if raw.startswith("+") or digits.startswith("00"):
+            digits = digits[2:] if not raw.startswith("+") else digits
+            country = PhoneNumberFormatter._country_code(digits)
+            if country == "55":
+                return PhoneNumberFormatter._brazil(digits[2:])
+            if country and 8 <= len(digits) <= 15:
+                return digits, PhoneNumberFormatter.KIND_INTERNATIONAL
+            return digits, PhoneNumberFormatter.KIND_INVALID
+
+        # Prefixo 0 de longa distância (ex.: 011 98888-7777)
+        if digits.startswith("0") and len(digits) in (11, 12):
+            digits = digits[1:]
 
-        # Verifica se já tem código do país
-        if not phone.startswith('55') and len(phone) <= 11:
-            phone = '55' + phone
+        if len(digits) in (10, 11):
+            return PhoneNumberFormatter._brazil(digits)
 
-        # Adiciona 9 se for celular brasileiro sem o 9
-        if len(phone) == 12 and phone.startswith('55'):
-            # Insere o 9 após o DDD (posição 4)
-            phone = phone[:4] + '9' + phone[4:]
+        if len(digits) in (12, 13) and digits.startswith("55") and digits[2:4] in PhoneNumberFormatter.BRAZIL_DDDS:
+            return PhoneNumberFormatter._brazil(digits[2:])
 
-        return phone
+        if len(digits) >= 12 and PhoneNumberFormatter._country_code(digits) and len(digits) <= 15:
+            return digits, PhoneNumberFormatter.KIND_INTERNATIONAL
+
+        # Sem como identificar: mantém o comportamento de assumir o país padrão
+        if not digits.startswith(PhoneNumberFormatter.DEFAULT_COUNTRY) and len(digits) <= 11:
+            digits = PhoneNumberFormatter.DEFAULT_COUNTRY + digits
+        return digits, PhoneNumberFormatter.KIND_INVALID
+
+    @staticmethod
+    def _country_code(digits):
+        """Encontra o código de país no início do número
+
+        Args:
+            digits (str): Número com código de país, apenas dígitos
+
+        Returns:
+            str | None: Código de país ou None se não reconhecido
+        """
+        for length in (1, 2, 3):
+            prefix = digits[:length]
+            if prefix in PhoneNumberFormatter.COUNTRY_CODES[length]:
+                return prefix
+        return None
+
+    @staticmethod
+    def _brazil(national):
+        """Normaliza a parte nacional (DDD + assinante) de um número brasileiro
+
+        Args:
+            national (str): DDD e número do assinante, apenas dígitos
+
+        Returns:
+            tuple: (número com 55, tipo) com tipo em KIND_*
+        """
+        ddd, subscriber = national[:2], national[2:]
+        if ddd not in PhoneNumberFormatter.BRAZIL_DDDS:
+            return "55" + national, PhoneNumberFormatter.KIND_INVALID
+
+        if len(subscriber) == 9 and subscriber[0] == "9":
+            return "55" + national, PhoneNumberFormatter.KIND_MOBILE
+
+        if len(subscriber) == 8:
+            if subscriber[0] in "6789":
+                return "55" + ddd + "9" + subscriber, PhoneNumberFormatter.KIND_MOBILE
+            if subscriber[0] in "2345":
+                return "55" + national, PhoneNumberFormatter.KIND_LANDLINE
+
+        return "55" + national, PhoneNumberFormatter.KIND_INVALID
+
+    @staticmethod
+    def normalize_many(phones):
+        """Normaliza uma lista de números, processando cada valor distinto uma vez
+
+        Args:
+            phones (iterable): Números em qualquer formato
+
+        Returns:
+            list: Números normalizados, na mesma ordem
+        """
+        cache = {}
+        classify = PhoneNumberFormatter.classify
+        result = []
+        for phone in phones:
+            normalized = cache.get(phone)
+            if normalized is None:
+                normalized = cache[phone] = classify(phone)[0]
+            result.append(normalized)
+        return result
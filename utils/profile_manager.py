@@ -0,0 +1,408 @@
+"""
+Cópias e manutenção de perfis do navegador conectados ao WhatsApp Web
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+from utils.config_manager import ConfigManager
+
+
+class ProfileManager:
+    """Cópias e manutenção de perfis do navegador conectados ao WhatsApp Web
+
+    Um perfil conectado (após ler o QR code) é copiado para um instantâneo
+    sem caches e sem histórico, que guarda só o necessário para a sessão:
+    IndexedDB, Local Storage, cookies e preferências. Novos perfis são
+    criados a partir do instantâneo, sem QR code, e abrem mais rápido por
+    não terem caches acumulados.
+
+    Os arquivos são clonados (copy-on-write) quando o sistema de arquivos
+    permite (FICLONE no Btrfs/XFS, clonefile no APFS) e copiados nos
+    demais. Links físicos não são usados: o LevelDB e o SQLite do perfil
+    alteram arquivos no próprio lugar, e um link faria os perfis (e o
+    instantâneo) compartilharem as mesmas alterações.
+
+    compact() aplica a mesma limpeza a um perfil em uso entre campanhas,
+    para que ele não cresça indefinidamente.
+    """
+
+    # Pastas recriadas pelo navegador quando ausentes
+    CACHE_DIRS = frozenset((
+        "Cache", "Code Cache", "GPUCache", "DawnCache", "DawnGraphiteCache", "DawnWebGPUCache",
+        "GrShaderCache", "GraphiteDawnCache", "ShaderCache", "CacheStorage", "ScriptCache",
+        "blob_storage", "Crashpad", "Crash Reports", "BrowserMetrics", "Sessions",
+        "component_crx_cache", "optimization_guide_model_store", "Safe Browsing",
+    ))
+
+    # Histórico de navegação e sessões anteriores
+    HISTORY_FILES = frozenset((
+        "History", "History-journal", "Visited Links", "Top Sites", "Top Sites-journal",
+        "Favicons", "Favicons-journal", "Shortcuts", "Shortcuts-journal",
+        "Network Action Predictor", "Network Action Predictor-journal",
+        "Current Session", "Current Tabs", "Last Session", "Last Tabs",
+        "BrowserMetrics-spare.pma",
+    ))
+
+    # Travas da instância em execução, que não podem ir para a cópia
+    LOCK_FILES = frozenset(("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile"))
+
+    MANIFEST = "snapshot.json"
+
+    # Assinatura dos arquivos SQLite (Cookies, Web Data, Login Data...)
+    _SQLITE_HEADER = b"SQLite format 3\x00"
+
+    # ioctl de clonagem de arquivo no Linux (_IOW(0x94, 9, int))
+    _FICLONE = 0x40049409
+
+    @staticmethod
+    def snapshot_dir(name):
+        """Pasta padrão de um instantâneo no diretório de dados
+
+        Args:
+            name (str): Nome do instantâneo
+
+        Returns:
+            str: Caminho em data/profile_snapshots
+        """
+        return os.path.join(ConfigManager.get_config_dir(), "profile_snapshots", name)
+
+    @classmethod
+    def in_use(cls, profile_dir):
+        """Indica se o perfil está aberto por um navegador
+
+        Args:
+            profile_dir (str): Pasta do perfil
+
+        Returns:
+            bool: True se houver uma instância usando o perfil
+        """
+        # Linux e macOS: link simbólico criado pela instância em execução
+        if os.path.lexists(os.path.join(profile_dir, "SingletonLock")):
+            return True
+
+        # Windows: o navegador mantém o arquivo aberto sem compartilhamento
+        lockfile = os.path.join(profile_dir, "lockfile")
+        if os.path.exists(lockfile):
+            try:
+                with open(lockfile, "a"):
+                    pass
+            except OSError:
+                return True
+        return False
+
+    @classmethod
+    def _skip(cls, name, is_dir):
+        """Indica se um item do perfil fica fora da cópia
+
+        Args:
+            name (str): Nome do arquivo ou pasta
+            is_dir (bool): Se é uma pasta
+
+        Returns:
+            bool: True para caches, histórico e travas
+        """
+        if is_dir:
+            return name in cls.CACHE_DIRS
+        return name in cls.HISTORY_FILES or name in cls.LOCK_FILES
+
+    @classmethod
+    def clone_file(cls, source, target):
+        """Clona um arquivo com copy-on-write, ou copia se não for possível
+
+        Args:
+            source (str): Arquivo de origem
+            target (str): Arquivo de destino (não pode existir)
+
+        Returns:
+            bool: True se o arquivo foi clonado, False se foi copiado
+        """
+        if sys.platform.startswith("linux"):
+            import fcntl
+            try:
+                with open(source, "rb") as src, open(target, "xb") as dst:
+                    fcntl.ioctl(dst.fileno(), cls._FICLONE, src.fileno())
+                shutil.copystat(source, target)
+                return True
+            except OSError:
+                if os.path.exists(target):
+                    os.remove(target)
+        elif sys.platform == "darwin":
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.clonefile(os.fsencode(source), os.fsencode(target), 0) == 0:
+                return True
+
+        shutil.copy2(source, target)
+        return False
+
+    @classmethod
+    def _copy_tree(cls, source_dir, target_dir, skip=True):
+        """Copia uma pasta de perfil, clonando os arquivos quando possível
+
+        Args:
+            source_dir (str): Pasta de origem
+            target_dir (str): Pasta de destino (criada)
+            skip (bool): Se caches, histórico e travas ficam de fora
+
+        Returns:
+            dict: files, bytes e cloned (arquivos clonados sem cópia)
+        """
+        stats = {"files": 0, "bytes": 0, "cloned": 0}
+        for root, dirs, files in os.walk(source_dir):
+            if skip:
+                dirs[:] = [name for name in dirs if not cls._skip(name, True)]
+            relative = os.path.relpath(root, source_dir)
+            destination = os.path.normpath(os.path.join(target_dir, relative))
+            os.makedirs(destination, exist_ok=True)
+
+            for name in files:
+                if (skip and cls._skip(name, False)) or (root == source_dir and name == cls.MANIFEST):
+                    continue
+                path = os.path.join(root, name)
+                if os.path.islink(path):
+                    continue  # Travas e atalhos da instância, sem conteúdo
+                if cls.clone_file(path, os.path.join(destination, name)):
+                    stats["cloned"] += 1
+                stats["files"] += 1
+                stats["bytes"] += os.path.getsize(path)
+        return stats
+
+    @classmethod
+    def _replace_dir(cls, staging, target):
+        """Coloca a pasta preparada no lugar do destino
+
+        Args:
+            staging (str): Pasta completa
+            target (str): Pasta final (substituída se existir)
+        """
+        old = None
+        if os.path.exists(target):
+            old = f"{target}.old-{int(time.time())}"
+            os.rename(target, old)
+        os.rename(staging, target)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def snapshot(cls, profile_dir, snapshot_dir):
+        """Cria um instantâneo de um perfil conectado, sem caches e histórico
+
+        O navegador precisa estar fechado, para que os bancos do perfil
+        estejam consistentes em disco.
+
+        Args:
+            profile_dir (str): Pasta do perfil conectado
+            snapshot_dir (str): Pasta do instantâneo (substituída se existir)
+
+        Returns:
+            dict: Informações gravadas em snapshot.json
+
+        Raises:
+            FileNotFoundError: Se o perfil não existir
+            RuntimeError: Se o perfil estiver aberto em um navegador
+        """
+        if not os.path.isdir(profile_dir):
+            raise FileNotFoundError(f"Perfil não encontrado: {profile_dir}")
+        if cls.in_use(profile_dir):
+            raise RuntimeError(f"Feche o navegador que está usando o perfil {profile_dir}")
+
+        staging = snapshot_dir.rstrip("\\/") + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        stats = cls._copy_tree(profile_dir, staging)
+
+        info = {
+            "source": os.path.abspath(profile_dir),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "files": stats["files"],
+            "bytes": stats["bytes"],
+        }
+        with open(os.path.join(staging, cls.MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+
+        os.makedirs(os.path.dirname(os.path.abspath(snapshot_dir)), exist_ok=True)
+        cls._replace_dir(staging, snapshot_dir)
+        return info
+
+    @classmethod
+    def provision(cls, snapshot_dir, target_dir, overwrite=False):
+        """Cria um perfil a partir de um instantâneo
+
+        A cópia é montada em uma pasta temporária e renomeada ao final, de
+        modo que uma interrupção não deixa um perfil pela metade.
+
+        Args:
+            snapshot_dir (str): Pasta do instantâneo
+            target_dir (str): Pasta do novo perfil
+            overwrite (bool): Se um perfil existente pode ser substituído
+
+        Returns:
+            dict: files, bytes, cloned e elapsed (segundos)
+
+        Raises:
+            FileNotFoundError: Se o instantâneo não existir
+            FileExistsError: Se o perfil já existir e overwrite for False
+            RuntimeError: Se o perfil existente estiver aberto em um navegador
+        """
+        if not os.path.isfile(os.path.join(snapshot_dir, cls.MANIFEST)):
+            raise FileNotFoundError(f"Instantâneo de perfil não encontrado: {snapshot_dir}")
+        if os.path.isdir(target_dir) and os.listdir(target_dir):
+            if not overwrite:
+                raise FileExistsError(f"O perfil já existe: {target_dir}")
+            if cls.in_use(target_dir):
+                raise RuntimeError(f"Feche o navegador que está usando o perfil {target_dir}")
+
+        started = time.perf_counter()
+        staging = target_dir.rstrip("\\/") + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        stats = cls._copy_tree(snapshot_dir, staging, skip=False)
+        os.makedirs(os.path.dirname(os.path.abspath(target_dir)), exist_ok=True)
+        cls._replace_dir(staging, target_dir)
+
+        stats["elapsed"] = time.perf_counter() - started
+        return stats
+
+    @staticmethod
+    def size(path):
+        """Tamanho total de uma pasta
+
+        Args:
+            path (str): Pasta
+
+        Returns:
+            int: Bytes ocupados pelos arquivos (links simbólicos não contam)
+        """
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                if not os.path.islink(file_path):
+                    try:
+                        total += os.path.getsize(file_path)
+                    except OSError:
+                        pass
+        return total
+
+    @classmethod
+    def _is_sqlite(cls, path):
+        """Indica se o arquivo é um banco SQLite
+
+        Args:
+            path (str): Caminho do arquivo
+
+        Returns:
+            bool: True se o cabeçalho for o do SQLite
+        """
+        try:
+            with open(path, "rb") as f:
+                return f.read(len(cls._SQLITE_HEADER)) == cls._SQLITE_HEADER
+        except OSError:
+            return False
+
+    @classmethod
+    def compact(cls, profile_dir, min_bytes=0):
+        """Remove caches e histórico do perfil e compacta seus bancos SQLite
+
+        A sessão do WhatsApp (IndexedDB, Local Storage e cookies) é
+        mantida; o IndexedDB é compactado pelo próprio navegador, que
+        reorganiza o LevelDB ao abrir. O navegador precisa estar fechado.
+
+        Args:
+            profile_dir (str): Pasta do perfil
+            min_bytes (int): Tamanho abaixo do qual o perfil não é alterado
+
+        Returns:
+            dict | None: before e after (bytes), removed (arquivos e pastas
+                removidos) e vacuumed (bancos compactados), ou None se o perfil
+                estiver abaixo de min_bytes
+
+        Raises:
+            FileNotFoundError: Se o perfil não existir
+            RuntimeError: Se o perfil estiver aberto em um navegador
+        """
+        if not os.path.isdir(profile_dir):
+            raise FileNotFoundError(f"Perfil não encontrado: {profile_dir}")
+        if cls.in_use(profile_dir):
+            raise RuntimeError(f"Feche o navegador que está usando o perfil {profile_dir}")
+
+        before = cls.size(profile_dir)
+        if before < min_bytes:
+            return None
+
+        removed = 0
+        databases = []
+        for root, dirs, files in os.walk(profile_dir):
+            for name in [name for name in dirs if cls._skip(name, True)]:
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+                dirs.remove(name)
+                removed += 1
+
+            for name in files:
+                path = os.path.join(root, name)
+                if name in cls.HISTORY_FILES:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except OSError:
+                        pass
+                elif not name.endswith(("-journal", "-wal", "-shm")) and cls._is_sqlite(path):
+                    databases.append(path)
+
+        vacuumed = 0
+        for path in databases:
+            try:
+                connection = sqlite3.connect(path, timeout=5)
+                try:
+                    connection.execute("VACUUM")
+                finally:
+                    connection.close()
+                vacuumed += 1
+            except sqlite3.Error:
+                pass  # Banco em formato próprio do navegador ou bloqueado: fica como está
+
+        return {"before": before, "after": cls.size(profile_dir), "removed": removed, "vacuumed": vacuumed}
+
+    @classmethod
+    def provision_workers(cls, snapshot_dir, base_dir, count, overwrite=False):
+        """Cria vários perfis de trabalho a partir de um instantâneo
+
+        Args:
+            snapshot_dir (str): Pasta do instantâneo
+            base_dir (str): Prefixo das pastas (ex.: "whatsapp_profile" → "whatsapp_profile_1")
+            count (int): Quantidade de perfis
+            overwrite (bool): Se perfis existentes podem ser substituídos
+
+        Returns:
+            list: Pastas dos perfis criados
+        """
+        targets = [f"{base_dir}_{i}" for i in range(1, count + 1)]
+        for target in targets:
+            cls.provision(snapshot_dir, target, overwrite)
+        return targets
+
+
+if __name__ == "__main__":
+    # Uso: python -m utils.profile_manager snapshot <perfil> <nome>
+    #      python -m utils.profile_manager provision <nome> <perfil base> [quantidade]
+    #      python -m utils.profile_manager compact <perfil>
+    comandos = {"snapshot": 4, "provision": 4, "compact": 3}
+    if len(sys.argv) < 2 or len(sys.argv) < comandos.get(sys.argv[1], 99):
+        print("Uso: python -m utils.profile_manager snapshot <perfil> <nome>")
+        print("     python -m utils.profile_manager provision <nome> <perfil base> [quantidade]")
+        print("     python -m utils.profile_manager compact <perfil>")
+        sys.exit(1)
+
+    if sys.argv[1] == "snapshot":
+        resumo = ProfileManager.snapshot(sys.argv[2], ProfileManager.snapshot_dir(sys.argv[3]))
+        print(f"Instantâneo criado: {resumo['files']} arquivos, {resumo['bytes'] / 1024 / 1024:.1f} MB")
+    elif sys.argv[1] == "provision":
+        quantidade = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+        perfis = ProfileManager.provision_workers(ProfileManager.snapshot_dir(sys.argv[2]), sys.argv[3], quantidade)
+        print("Perfis criados: " + ", ".join(perfis))
+    else:
+        resumo = ProfileManager.compact(sys.argv[2])
+        print(f"Perfil compactado: {resumo['before'] / 1024 / 1024:.1f} MB → {resumo['after'] / 1024 / 1024:.1f} MB")
@@ -2,26 +2,55 @@
 Gerenciador de progresso com suporte a callbacks
 """
 
+import time
+from datetime import datetime, timedelta
+
 
 class ProgressTracker:
-    """Gerenciador de progresso com suporte a callbacks"""
-    
-    def __init__(self, callback=None):
+    """Gerenciador de progresso com suporte a callbacks
+
+    Além da posição atual, acompanha a taxa de envio (média móvel
+    exponencial do intervalo entre resultados), a taxa de sucesso, os
+    reenvios pendentes e a previsão de término. Com um agendador
+    associado (`schedule`), o tempo fora das janelas de envio é descontado
+    da taxa medida e somado à previsão.
+    """
+
+    # Intervalos maiores que isso (ex.: cota diária esgotada) não entram na taxa
+    MAX_INTERVAL = 3600
+
+    def __init__(self, callback=None, window=20):
         """Inicializa o rastreador de progresso
-        
+
         Args:
-            callback (callable, optional): Função de callback para atualizar progresso
+            callback (callable, optional): Função chamada com (atual, total, estatísticas)
+            window (int): Número aproximado de resultados considerados na média móvel
         """
         self.callback = callback
+        self.alpha = 2 / (window + 1)
+        self.schedule = None  # Objeto com in_window, next_window_start e window_end
+        self.reset()
+
+    def reset(self, total=0):
+        """Zera o progresso e as estatísticas para uma nova execução
+
+        Args:
+            total (int): Valor máximo do progresso
+        """
         self.current = 0
-        self.total = 0
-    
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.interval = None  # segundos por mensagem (média móvel)
+        self._last = None
+
     def update(self, current=None, total=None):
         """Atualiza o progresso
-        
+
         Atualiza os valores de progresso atual e total, e notifica
         o callback se configurado.
-        
+
         Args:
             current (int, optional): Valor atual do progresso
             total (int, optional): Valor máximo do progresso
@@ -30,17 +59,184 @@ class ProgressTracker:
             self.current = current
         if total is not None:
             self.total = total
-            
-        if self.callback:
-            self.callback(self.current, self.total)
-    
+
+        self._notify()
+
+    def record(self, success, retry=False, retriable=True):
+        """Registra o resultado de uma tentativa de envio
+
+        Falhas na primeira passagem entram nos reenvios pendentes; cada
+        reenvio realizado sai deles.
+
+        Args:
+            success (bool): Se a mensagem foi enviada
+            retry (bool): Se a tentativa é um reenvio
+            retriable (bool): Se uma falha na primeira passagem será reenviada
+        """
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+        if retry:
+            self.retries = max(0, self.retries - 1)
+        elif not success and retriable:
+            self.retries += 1
+
+        now = time.time()
+        if self._last is not None:
+            elapsed = self._active_seconds(datetime.fromtimestamp(self._last), datetime.fromtimestamp(now))
+            if 0 < elapsed <= self.MAX_INTERVAL:
+                if self.interval is None:
+                    self.interval = elapsed
+                else:
+                    self.interval = self.alpha * elapsed + (1 - self.alpha) * self.interval
+        self._last = now
+
+        self._notify()
+
+    def set_retries(self, pending):
+        """Define quantos reenvios ainda devem ser feitos
+
+        Args:
+            pending (int): Reenvios pendentes
+        """
+        self.retries = max(0, pending)
+        self._notify()
+
+    def idle(self):
+        """Descarta o intervalo em curso (pausa, disjuntor aberto)
+
+        O próximo resultado não entra na média móvel.
+        """
+        self._last = None
+
     @property
     def percentage(self):
         """Calcula a porcentagem de progresso
-        
+
         Returns:
             float: Porcentagem de progresso (0-100)
         """
         if self.total <= 0:
             return 0
         return (self.current / self.total) * 100
+
+    @property
+    def rate(self):
+        """Taxa de envio atual
+
+        Returns:
+            float | None: Mensagens por minuto, ou None antes de haver medição
+        """
+        if not self.interval:
+            return None
+        return 60 / self.interval
+
+    @property
+    def success_ratio(self):
+        """Fração das tentativas que resultaram em envio
+
+        Returns:
+            float | None: Valor entre 0 e 1, ou None antes da primeira tentativa
+        """
+        attempts = self.succeeded + self.failed
+        if not attempts:
+            return None
+        return self.succeeded / attempts
+
+    def eta(self, now=None):
+        """Previsão de término considerando reenvios e janelas de envio
+
+        Args:
+            now (datetime, optional): Horário de referência. Padrão: agora
+
+        Returns:
+            datetime | None: Horário previsto, ou None sem taxa medida
+        """
+        if not self.interval:
+            return None
+        remaining = max(0, self.total - self.current) + self.retries
+        return self._project(now or datetime.now(), remaining * self.interval)
+
+    def stats(self):
+        """Estatísticas repassadas ao callback
+
+        Returns:
+            dict: rate (msg/min), success_ratio, succeeded, failed, retries e eta
+        """
+        return {
+            "rate": self.rate,
+            "success_ratio": self.success_ratio,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "eta": self.eta(),
+        }
+
+    def _notify(self):
+        """Notifica o callback se configurado"""
+        if self.callback:
+            self.callback(self.current, self.total, self.stats())
+
+    def _active_seconds(self, start, end):
+        """Tempo entre dois horários que caiu dentro das janelas de envio
+
+        Args:
+            start (datetime): Início do intervalo
+            end (datetime): Fim do intervalo
+
+        Returns:
+            float: Segundos dentro das janelas
+        """
+        if not self.schedule:
+            return (end - start).total_seconds()
+
+        total = 0.0
+        moment = start
+        for _ in range(100):
+            if moment >= end:
+                break
+            if not self.schedule.in_window(moment):
+                following = self.schedule.next_window_start(moment)
+                if following <= moment:
+                    break
+                moment = following
+                continue
+            close = min(self.schedule.window_end(moment) or end, end)
+            if close <= moment:
+                break
+            total += (close - moment).total_seconds()
+            moment = close
+        return total
+
+    def _project(self, start, seconds):
+        """Projeta o término de `seconds` de trabalho dentro das janelas de envio
+
+        Args:
+            start (datetime): Horário de início
+            seconds (float): Tempo de envio necessário
+
+        Returns:
+            datetime | None: Horário de término, ou None se não houver janela futura
+        """
+        if not self.schedule:
+            return start + timedelta(seconds=seconds)
+
+        moment = start
+        for _ in range(1000):
+            if not self.schedule.in_window(moment):
+                following = self.schedule.next_window_start(moment)
+                if following <= moment:
+                    return None
+                moment = following
+                continue
+            close = self.schedule.window_end(moment)
+            available = (close - moment).total_seconds() if close else None
+            if available is None or available >= seconds:
+                return moment + timedelta(seconds=seconds)
+            if available <= 0:
+                return None
+            seconds -= available
+            moment = close
+        return None
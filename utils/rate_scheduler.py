@@ -0,0 +1,519 @@
+"""
+Agendador de envios com limites de taxa, janelas de horário e cotas
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from utils.config_manager import ConfigManager
+
+
+class TokenBucket:
+    """Balde de fichas para limitar a taxa de eventos
+
+    Recarrega `rate` fichas por `period` segundos, acumulando no máximo
+    `capacity` fichas (a rajada permitida).
+    """
+
+    def __init__(self, rate, period, capacity=None):
+        """Inicializa o balde cheio
+
+        Args:
+            rate (float): Fichas recarregadas por período
+            period (float): Duração do período em segundos
+            capacity (float, optional): Máximo acumulado. Padrão: rate
+        """
+        self.rate = rate
+        self.period = period
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        """Recarrega as fichas proporcionais ao tempo decorrido"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate / self.period)
+        self._updated = now
+
+    def wait_time(self):
+        """Calcula quanto falta para haver uma ficha disponível
+
+        Returns:
+            float: Segundos até a próxima ficha (0 se já houver)
+        """
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.period / self.rate
+
+    def consume(self):
+        """Consome uma ficha (pode deixar o saldo negativo)"""
+        self._refill()
+        self.tokens -= 1
+
+
+class RateScheduler:
+    """Agendador de envios com limites de taxa, janelas de horário e cotas
+
+    Combina limites por minuto e por hora (baldes de fichas com rajada),
+    uma cota diária por perfil persistida em disco e janelas de horário
+    permitidas. `acquire()` libera o próximo envio assim que houver
+    orçamento e mantém a campanha estacionada fora das janelas.
+
+    A contagem diária fica em memória e é gravada fora do laço asyncio a
+    cada SAVE_INTERVAL segundos, na virada do dia e em close(); uma queda
+    do aplicativo perde no máximo esse intervalo de envios na contagem.
+    """
+
+    SAVE_INTERVAL = 30.0  # segundos entre gravações da contagem diária
+
+    WEEKDAYS = {"seg": 0, "ter": 1, "qua": 2, "qui": 3, "sex": 4, "sab": 5, "sáb": 5, "dom": 6}
+
+    def __init__(self, per_minute=0, per_hour=0, per_day=0, burst=0,
+                 windows=None, weekdays=None, profile="whatsapp_profile", logger=None):
+        """Inicializa o agendador
+
+        Limites iguais a 0 são desativados.
+
+        Args:
+            per_minute (int): Mensagens por minuto
+            per_hour (int): Mensagens por hora
+            per_day (int): Mensagens por dia para o perfil
+            burst (int): Mensagens extras permitidas em rajada acima dos limites por minuto e por hora
+            windows (str | list, optional): Janelas como "08:00-12:00,13:30-18:00"
+            weekdays (str | list, optional): Dias permitidos como "seg-sex" ou "seg,qua,sex"
+            profile (str): Perfil do navegador ao qual a cota diária pertence
+            logger (Logger, optional): Instância de Logger para registro de logs
+        """
+        self.logger = logger
+        self.profile = profile
+        self.per_minute = per_minute
+        self.per_hour = per_hour
+        self.per_day = per_day
+        self.burst = burst
+        self.windows = self.parse_windows(windows)
+        self.weekdays = self.parse_weekdays(weekdays)
+
+        self.buckets = []
+        self._build_buckets()
+
+        # Sinalizado por reconfigure() para que uma espera em andamento reavalie os limites
+        self._changed = None
+
+        self._daily = self._load_daily()
+        self._saved = dict(self._daily)  # Última contagem gravada (ou lida) do disco
+        self._saved_at = time.monotonic()
+        self._saving = None  # Gravação em andamento no executor
+
+    def _build_buckets(self):
+        """Monta os baldes por minuto e por hora, preservando o saldo dos existentes"""
+        previous = {bucket.period: bucket for bucket in self.buckets}
+        self.buckets = []
+        for rate, period in ((self.per_minute, 60), (self.per_hour, 3600)):
+            if not rate:
+                continue
+            bucket = previous.get(period)
+            if bucket is None:
+                bucket = TokenBucket(rate, period, rate + self.burst)
+            else:
+                bucket._refill()
+                bucket.rate = rate
+                bucket.capacity = rate + self.burst
+                bucket.tokens = min(bucket.tokens, bucket.capacity)
+            self.buckets.append(bucket)
+
+    def reconfigure(self, per_minute=None, per_hour=None, per_day=None, burst=None,
+                    windows=None, weekdays=None):
+        """Altera os limites durante a campanha, valendo a partir do próximo envio
+
+        Parâmetros omitidos (None) mantêm o valor atual. O saldo dos baldes
+        e a contagem diária são preservados. Deve ser executado na thread do
+        laço asyncio.
+
+        Args:
+            per_minute (int, optional): Mensagens por minuto
+            per_hour (int, optional): Mensagens por hora
+            per_day (int, optional): Mensagens por dia para o perfil
+            burst (int, optional): Mensagens extras em rajada acima dos limites por minuto e por hora
+            windows (str | list, optional): Janelas de envio ("" remove todas)
+            weekdays (str | list, optional): Dias permitidos ("" libera todos)
+
+        Raises:
+            ValueError: Se alguma janela estiver mal formatada
+            KeyError: Se algum dia não for reconhecido
+        """
+        # Valida tudo antes de alterar qualquer limite
+        if windows is not None:
+            windows = self.parse_windows(windows)
+        if weekdays is not None:
+            weekdays = self.parse_weekdays(weekdays)
+
+        if per_minute is not None:
+            self.per_minute = per_minute
+        if per_hour is not None:
+            self.per_hour = per_hour
+        if per_day is not None:
+            self.per_day = per_day
+        if burst is not None:
+            self.burst = burst
+        if windows is not None:
+            self.windows = windows
+        if weekdays is not None:
+            self.weekdays = weekdays
+        self._build_buckets()
+
+        if self._changed is not None:
+            self._changed.set()
+
+    @classmethod
+    def from_config(cls, config, logger=None):
+        """Cria o agendador a partir das configurações do aplicativo
+
+        Args:
+            config (dict): Configurações carregadas pelo ConfigManager
+            logger (Logger, optional): Instância de Logger para registro de logs
+
+        Returns:
+            RateScheduler | None: Agendador, ou None se nenhum limite estiver configurado
+        """
+        scheduler = cls(
+            per_minute=config.get("rate_per_minute", 0),
+            per_hour=config.get("rate_per_hour", 0),
+            per_day=config.get("rate_per_day", 0),
+            burst=config.get("rate_burst", 0),
+            windows=config.get("send_windows", ""),
+            weekdays=config.get("send_weekdays", ""),
+            profile=config.get("browser_profile", "whatsapp_profile"),
+            logger=logger,
+        )
+        return scheduler if scheduler.enabled else None
+
+    @property
+    def enabled(self):
+        """Indica se há algum limite ativo
+
+        Returns:
+            bool: True se algum limite, janela ou cota estiver configurado
+        """
+        return bool(self.buckets or self.per_day or self.windows or self.weekdays)
+
+    @staticmethod
+    def parse_windows(windows):
+        """Converte a descrição das janelas em intervalos de minutos do dia
+
+        Args:
+            windows (str | list): "HH:MM-HH:MM" separadas por vírgula, ou lista delas
+
+        Returns:
+            list: Tuplas (início, fim) em minutos desde 00:00
+
+        Raises:
+            ValueError: Se alguma janela estiver mal formatada
+        """
+        if not windows:
+            return []
+        if isinstance(windows, str):
+            windows = windows.split(",")
+
+        parsed = []
+        for window in windows:
+            window = window.strip()
+            if not window:
+                continue
+            start, end = (part.strip() for part in window.split("-"))
+            parsed.append((RateScheduler._minutes(start), RateScheduler._minutes(end)))
+        return parsed
+
+    @staticmethod
+    def _minutes(hhmm):
+        """Converte "HH:MM" em minutos desde 00:00
+
+        Args:
+            hhmm (str): Horário
+
+        Returns:
+            int: Minutos desde 00:00
+        """
+        hours, _, minutes = hhmm.partition(":")
+        return int(hours) * 60 + int(minutes or 0)
+
+    @classmethod
+    def parse_weekdays(cls, weekdays):
+        """Converte a descrição dos dias permitidos em índices (segunda = 0)
+
+        Args:
+            weekdays (str | list): "seg-sex", "seg,qua,sex" ou lista de índices
+
+        Returns:
+            set: Dias da semana permitidos (vazio = todos)
+
+        Raises:
+            KeyError: Se algum dia não for reconhecido
+        """
+        if not weekdays:
+            return set()
+        if not isinstance(weekdays, str):
+            return set(weekdays)
+
+        days = set()
+        for part in weekdays.lower().split(","):
+            part = part.strip()
+            if "-" in part:
+                start, end = (cls.WEEKDAYS[p.strip()[:3]] for p in part.split("-"))
+                day = start
+                days.add(day)
+                while day != end:
+                    day = (day + 1) % 7
+                    days.add(day)
+            elif part:
+                days.add(cls.WEEKDAYS[part[:3]])
+        return days
+
+    def in_window(self, moment=None):
+        """Verifica se o horário está dentro de uma janela permitida
+
+        Janelas cujo fim é anterior ao início atravessam a meia-noite.
+
+        Args:
+            moment (datetime, optional): Horário a verificar. Padrão: agora
+
+        Returns:
+            bool: True se o envio é permitido nesse horário
+        """
+        moment = moment or datetime.now()
+        if self.weekdays and moment.weekday() not in self.weekdays:
+            return False
+        if not self.windows:
+            return True
+
+        minute = moment.hour * 60 + moment.minute
+        for start, end in self.windows:
+            if start <= end and start <= minute < end:
+                return True
+            if start > end and (minute >= start or minute < end):
+                return True
+        return False
+
+    def window_end(self, moment=None):
+        """Calcula quando termina a janela em que o horário se encontra
+
+        Args:
+            moment (datetime, optional): Horário de referência. Padrão: agora
+
+        Returns:
+            datetime | None: Fim da janela atual (o próprio horário se estiver
+            fora de janela), ou None se não houver restrição de horário
+        """
+        moment = moment or datetime.now()
+        if not self.in_window(moment):
+            return moment
+
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        ends = []
+        if self.weekdays:
+            ends.append(day + timedelta(days=1))
+
+        minute = moment.hour * 60 + moment.minute
+        latest = None
+        for start, end in self.windows:
+            if start <= end and start <= minute < end:
+                close = day + timedelta(minutes=end)
+            elif start > end and minute >= start:
+                close = day + timedelta(days=1, minutes=end)
+            elif start > end and minute < end:
+                close = day + timedelta(minutes=end)
+            else:
+                continue
+            latest = close if latest is None else max(latest, close)
+        if latest is not None:
+            ends.append(latest)
+
+        return min(ends) if ends else None
+
+    def next_window_start(self, moment=None):
+        """Calcula o próximo horário em que o envio será permitido
+
+        Args:
+            moment (datetime, optional): Horário de referência. Padrão: agora
+
+        Returns:
+            datetime: O próprio horário se já estiver na janela, ou o início da próxima
+        """
+        moment = (moment or datetime.now()).replace(second=0, microsecond=0)
+        if self.in_window(moment):
+            return moment
+
+        # Testa o início de cada janela nos próximos dias (uma semana cobre todos os dias permitidos)
+
+        starts = sorted({start for start, _ in self.windows}) or [0]
+        day = moment.replace(hour=0, minute=0)
+        for offset in range(8):
+            base = day + timedelta(days=offset)
+            for start in starts:
+                candidate = base + timedelta(minutes=start)
+                if candidate > moment and self.in_window(candidate):
+                    return candidate
+        return moment
+
+    def _daily_path(self):
+        """Caminho do arquivo com as contagens diárias por perfil
+
+        Returns:
+            str: Caminho do arquivo JSON
+        """
+        return os.path.join(ConfigManager.get_config_dir(), "daily_quota.json")
+
+    def _load_daily(self):
+        """Carrega a contagem de envios do dia para o perfil
+
+        Returns:
+            dict: {"date": "AAAA-MM-DD", "count": int}
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        try:
+            with open(self._daily_path(), "r", encoding="utf-8") as f:
+                entry = json.load(f).get(self.profile, {})
+            if entry.get("date") == today:
+                return entry
+        except (OSError, ValueError):
+            pass
+        return {"date": today, "count": 0}
+
+    def _save_daily(self, entry):
+        """Persiste a contagem de envios do dia para o perfil (fora do laço asyncio)
+
+        Args:
+            entry (dict): Cópia de {"date": "AAAA-MM-DD", "count": int}
+        """
+        path = self._daily_path()
+        try:
+            data = {}
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            data[self.profile] = entry
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+        except (OSError, ValueError) as e:
+            self._log(f"⚠️ Erro ao salvar a cota diária: {str(e)}")
+
+    def _persist_daily(self, force=False):
+        """Agenda a gravação da contagem diária no executor padrão, sem esperar
+
+        Só grava se a contagem mudou e passou SAVE_INTERVAL desde a última
+        gravação ou o dia virou; uma gravação por vez.
+
+        Args:
+            force (bool): Ignora o intervalo (usado em close)
+
+        Returns:
+            asyncio.Future | None: Gravação agendada
+        """
+        if self._daily == self._saved or (self._saving is not None and not self._saving.done()):
+            return None
+        rollover = self._daily["date"] != self._saved["date"]
+        if not (force or rollover or time.monotonic() - self._saved_at >= self.SAVE_INTERVAL):
+            return None
+
+        entry = dict(self._daily)
+        self._saved = entry
+        self._saved_at = time.monotonic()
+        self._saving = asyncio.get_running_loop().run_in_executor(None, self._save_daily, entry)
+        return self._saving
+
+    async def close(self):
+        """Grava a contagem diária pendente (fim da campanha)"""
+        if self._saving is not None:
+            await self._saving
+        pending = self._persist_daily(force=True)
+        if pending is not None:
+            await pending
+
+    def _log(self, message):
+        """Registra uma mensagem se houver logger
+
+        Args:
+            message (str): Mensagem a registrar
+        """
+        if self.logger:
+            self.logger.log(message)
+
+    def _daily_wait(self):
+        """Calcula a espera imposta pela cota diária
+
+        Returns:
+            float: Segundos até a virada do dia, ou 0 se ainda houver cota
+        """
+        now = datetime.now()
+        if self._daily["date"] != now.strftime("%Y-%m-%d"):
+            self._daily = {"date": now.strftime("%Y-%m-%d"), "count": 0}
+        if not self.per_day or self._daily["count"] < self.per_day:
+            return 0.0
+        tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (tomorrow - now).total_seconds()
+
+    def delay(self):
+        """Calcula quanto falta para o próximo envio ser liberado
+
+        Returns:
+            float: Segundos de espera (0 se o envio pode ocorrer agora)
+        """
+        now = datetime.now()
+        if not self.in_window(now):
+            return max((self.next_window_start(now) - now).total_seconds(), 1.0)
+
+        waits = [self._daily_wait()] + [bucket.wait_time() for bucket in self.buckets]
+        return max(waits)
+
+    async def acquire(self, should_continue=None, stop_event=None):
+        """Aguarda até que o próximo envio seja permitido e o contabiliza
+
+        Sem stop_event, a espera é feita em intervalos curtos para que
+        interrupções sejam atendidas rapidamente; com ele, a espera termina
+        assim que o evento é sinalizado.
+
+        Args:
+            should_continue (callable, optional): Retorna False para abandonar a espera
+            stop_event (asyncio.Event, optional): Evento que interrompe a espera
+
+        Returns:
+            bool: True se o envio foi liberado, False se a espera foi abandonada
+        """
+        announced = False
+        self._changed = asyncio.Event()
+        while True:
+            if should_continue and not should_continue():
+                return False
+
+            delay = self.delay()
+            if delay <= 0:
+                break
+
+            if not announced and delay >= 60:
+                retomada = datetime.now() + timedelta(seconds=delay)
+                self._log(f"⏸️ Fora da janela de envio ou cota esgotada. Retomando às {retomada:%d/%m %H:%M}.")
+                announced = True
+
+            if stop_event is None:
+                await asyncio.sleep(min(delay, 1.0))
+                continue
+
+            # Reavalia ao menos a cada minuto (mudança de janela ou de dia) e
+            # imediatamente após interrupção ou alteração dos limites
+            waiters = [asyncio.ensure_future(stop_event.wait()),
+                       asyncio.ensure_future(self._changed.wait())]
+            try:
+                await asyncio.wait(waiters, timeout=min(delay, 60.0), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+            self._changed.clear()
+
+        for bucket in self.buckets:
+            bucket.consume()
+        self._daily["count"] += 1
+        self._persist_daily()
+        return True
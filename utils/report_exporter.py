@@ -0,0 +1,138 @@
+"""
+Exportação do resultado da campanha de volta para a planilha de origem
+"""
+
+import os
+from datetime import datetime
+
+from utils.contact_store import ContactStore
+
+
+class ReportExporter:
+    """Exportação do resultado da campanha de volta para a planilha de origem
+
+    Grava uma cópia da planilha (xlsx ou CSV) com colunas de resultado por
+    linha. As colunas são montadas de forma vetorizada a partir dos arrays
+    do ContactStore e a cópia é escrita em uma única operação, sem acessar
+    células uma a uma.
+    """
+
+    COLUMNS = ["status", "data_hora", "tentativas", "erro", "latencia_s"]
+
+    @staticmethod
+    def default_output_path(source_path):
+        """Caminho padrão da cópia com resultados, ao lado da planilha original
+
+        Args:
+            source_path (str): Caminho da planilha de origem
+
+        Returns:
+            str: Caminho do arquivo de resultado
+        """
+        base, ext = os.path.splitext(source_path)
+        return f"{base}_resultado{ext or '.xlsx'}"
+
+    @staticmethod
+    def _read_source(source_path):
+        """Lê a planilha de origem inteira, sem interpretar os valores
+
+        Args:
+            source_path (str): Caminho do arquivo xlsx ou CSV
+
+        Returns:
+            DataFrame: Uma linha do DataFrame por linha do arquivo (inclusive o cabeçalho)
+        """
+        import pandas as pd  # pandas e numpy só são carregados ao exportar
+
+        if source_path.lower().endswith(".csv"):
+            return pd.read_csv(source_path, header=None, dtype=str, keep_default_na=False,
+                               sep=None, engine="python")
+        return pd.read_excel(source_path, header=None, dtype=object)
+
+    @classmethod
+    def build_columns(cls, store, length):
+        """Monta as colunas de resultado alinhadas às linhas da planilha
+
+        Args:
+            store (ContactStore): Contatos com o resultado de cada envio
+            length (int): Número de linhas do DataFrame de origem
+
+        Returns:
+            dict: Nome da coluna → array de tamanho `length`
+        """
+        import numpy as np
+        import pandas as pd
+
+        # Linha N da planilha corresponde à posição N-1 do DataFrame
+        positions = np.frombuffer(store.rows, dtype=np.uint32).astype(np.int64) - 1
+        valid = (positions >= 0) & (positions < length)
+        positions = positions[valid]
+
+        status = np.frombuffer(store.status, dtype=np.uint8)[valid]
+        timestamps = np.frombuffer(store.timestamps, dtype=np.float64)[valid]
+        latencies = np.frombuffer(store.latencies, dtype=np.float32)[valid]
+        attempts = np.frombuffer(store.attempts, dtype=np.uint8)[valid]
+        errors = np.frombuffer(store.errors, dtype=np.uint8)[valid]
+
+        status_names = np.array([ContactStore.STATUS_NAMES.get(i, "") for i in range(256)], dtype=object)
+        error_names = np.array([ContactStore.ERROR_NAMES.get(i, "") for i in range(256)], dtype=object)
+
+        attempted = timestamps > 0
+        offset = datetime.now().astimezone().utcoffset()
+        when = (pd.to_datetime(timestamps, unit="s") + offset).strftime("%Y-%m-%d %H:%M:%S")
+        when = np.where(attempted, np.asarray(when, dtype=object), "")
+
+        values = {
+            "status": status_names[status],
+            "data_hora": when,
+            "tentativas": np.where(attempted, attempts, 0),
+            "erro": error_names[errors],
+            "latencia_s": np.where(attempted, np.round(latencies, 2), np.nan),
+        }
+
+        columns = {}
+        for name in cls.COLUMNS:
+            column = np.full(length, "", dtype=object)
+            column[positions] = values[name]
+            if length:
+                column[0] = name  # A primeira linha é o cabeçalho
+            columns[name] = column
+        return columns
+
+    @classmethod
+    def export(cls, source_path, store, output_path=None):
+        """Grava a cópia da planilha com as colunas de resultado
+
+        Args:
+            source_path (str): Caminho da planilha de origem (xlsx ou CSV)
+            store (ContactStore): Contatos com o resultado de cada envio
+            output_path (str, optional): Caminho de destino. Padrão: <origem>_resultado
+
+        Returns:
+            str: Caminho do arquivo gerado
+        """
+        output_path = output_path or cls.default_output_path(source_path)
+        df = cls._read_source(source_path)
+
+        first_new = df.shape[1]
+        for offset, (name, column) in enumerate(cls.build_columns(store, len(df)).items()):
+            df[first_new + offset] = column
+
+        if output_path.lower().endswith(".csv"):
+            df.to_csv(output_path, header=False, index=False, sep=";", encoding="utf-8-sig")
+        else:
+            df.to_excel(output_path, header=False, index=False, engine=cls._excel_engine())
+        return output_path
+
+    @staticmethod
+    def _excel_engine():
+        """Escolhe o motor de escrita xlsx mais rápido disponível
+
+        Returns:
+            str: "xlsxwriter" se instalado, senão "openpyxl"
+        """
+        try:
+            import xlsxwriter  # noqa: F401
+            return "xlsxwriter"
+        except ImportError:
+            return "openpyxl"
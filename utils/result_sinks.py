@@ -0,0 +1,342 @@
+"""
+Publicação do resultado de cada envio em webhooks, arquivos e tabelas
+"""
+
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JSONLinesSink:
+    """Acrescenta os resultados a um arquivo JSON Lines, um por linha"""
+
+    def __init__(self, path):
+        """Inicializa o destino
+
+        Args:
+            path (str): Caminho do arquivo .jsonl
+        """
+        self.path = path
+
+    def write(self, events):
+        """Acrescenta um lote de resultados
+
+        Args:
+            events (list): Dicionários de resultado
+        """
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+
+    def close(self):
+        """Nada a liberar: o arquivo é aberto a cada lote"""
+
+
+class CSVSink:
+    """Acrescenta os resultados a um arquivo CSV, com cabeçalho no arquivo novo"""
+
+    FIELDS = ("ts", "campaign", "index", "source", "row", "phone", "status", "error", "latency", "attempt")
+
+    def __init__(self, path, delimiter=";"):
+        """Inicializa o destino
+
+        Args:
+            path (str): Caminho do arquivo .csv
+            delimiter (str): Separador de colunas
+        """
+        self.path = path
+        self.delimiter = delimiter
+
+    def write(self, events):
+        """Acrescenta um lote de resultados
+
+        Args:
+            events (list): Dicionários de resultado
+        """
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="", encoding="utf-8-sig" if new_file else "utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS, delimiter=self.delimiter,
+                                    extrasaction="ignore")
+            if new_file:
+                writer.writeheader()
+            writer.writerows(events)
+
+    def close(self):
+        """Nada a liberar: o arquivo é aberto a cada lote"""
+
+
+class SQLiteSink:
+    """Grava os resultados em uma tabela SQLite, um lote por transação"""
+
+    def __init__(self, path, table="resultados"):
+        """Inicializa o destino (a conexão é aberta no primeiro lote)
+
+        Args:
+            path (str): Caminho do arquivo do banco
+            table (str): Nome da tabela, criada se não existir
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Nome de tabela inválido: {table}")
+        self.path = path
+        self.table = table
+        self._connection = None
+
+    def write(self, events):
+        """Grava um lote de resultados
+
+        Args:
+            events (list): Dicionários de resultado
+        """
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "ts REAL, campaign TEXT, idx INTEGER, source TEXT, row INTEGER, phone TEXT, "
+                "status TEXT, error TEXT, latency REAL, attempt INTEGER)")
+            # Tabelas criadas antes da coluna de origem
+            columns = {column[1] for column in self._connection.execute(f"PRAGMA table_info({self.table})")}
+            if "source" not in columns:
+                self._connection.execute(f"ALTER TABLE {self.table} ADD COLUMN source TEXT")
+
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO {self.table} (ts, campaign, idx, source, row, phone, status, error, latency, attempt) "
+                "VALUES (:ts, :campaign, :index, :source, :row, :phone, :status, :error, :latency, :attempt)",
+                [{field: event.get(field) for field in CSVSink.FIELDS} for event in events])
+
+    def close(self):
+        """Fecha a conexão com o banco"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class WebhookSink:
+    """Envia os resultados em lotes por POST para um webhook HTTP
+
+    O corpo é um JSON {"events": [...]}. Falhas de rede, respostas 5xx e
+    429 são repetidas com espera crescente; outras respostas de erro
+    descartam o lote, já que repeti-lo não mudaria o resultado.
+    """
+
+    def __init__(self, url, headers=None, timeout=10, retries=3, backoff=1.0):
+        """Inicializa o destino
+
+        Args:
+            url (str): Endereço do webhook
+            headers (dict, optional): Cabeçalhos adicionais (ex.: autenticação)
+            timeout (float): Tempo máximo de cada requisição em segundos
+            retries (int): Novas tentativas por lote
+            backoff (float): Espera antes da primeira nova tentativa, dobrada a cada uma
+        """
+        self.url = url
+        self.headers = {"Content-Type": "application/json"}
+        self.headers.update(headers or {})
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def write(self, events):
+        """Envia um lote de resultados
+
+        Args:
+            events (list): Dicionários de resultado
+
+        Raises:
+            urllib.error.URLError: Se o lote não for aceito após as tentativas
+        """
+        body = json.dumps({"events": events}, ensure_ascii=False).encode("utf-8")
+        for attempt in range(self.retries + 1):
+            request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                    resp.read()
+                return
+            except urllib.error.HTTPError as e:
+                if (e.code != 429 and e.code < 500) or attempt >= self.retries:
+                    raise
+            except (urllib.error.URLError, OSError):
+                if attempt >= self.retries:
+                    raise
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def close(self):
+        """Nada a liberar: cada lote usa uma conexão própria"""
+
+
+class ResultDispatcher:
+    """Distribui o resultado de cada envio para os destinos configurados
+
+    O laço de envio só coloca o resultado em uma fila asyncio (publish não
+    espera nada). Uma task agrupa os resultados e os entrega aos destinos
+    quando o lote atinge `batch_size` ou quando passam `flush_interval`
+    segundos desde o primeiro resultado do lote. A gravação roda em uma
+    thread dedicada, então um webhook lento não atrasa os envios.
+    """
+
+    def __init__(self, sinks, batch_size=100, flush_interval=2.0, max_pending=10000, logger=None):
+        """Inicializa o distribuidor
+
+        Args:
+            sinks (list): Destinos com write(eventos) e close()
+            batch_size (int): Resultados por lote
+            flush_interval (float): Espera máxima em segundos antes de gravar um lote incompleto
+            max_pending (int): Resultados aguardando gravação além dos quais os novos são descartados
+            logger (Logger, optional): Instância de Logger para registro de logs
+        """
+        self.sinks = list(sinks)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.logger = logger
+        self.campaign = ""  # Nome da campanha incluído em cada resultado
+        self.published = 0  # Gravados em todos os destinos
+        self.failed = 0     # Recusados por pelo menos um destino
+        self.dropped = 0    # Descartados com a fila cheia
+
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, config, logger=None):
+        """Cria o distribuidor a partir das configurações do aplicativo
+
+        Args:
+            config (dict): Configurações carregadas pelo ConfigManager
+            logger (Logger, optional): Instância de Logger para registro de logs
+
+        Returns:
+            ResultDispatcher | None: Distribuidor, ou None se nenhum destino estiver configurado
+        """
+        sinks = []
+        if config.get("result_webhook_url"):
+            sinks.append(WebhookSink(
+                config["result_webhook_url"],
+                headers=config.get("result_webhook_headers") or None,
+                retries=config.get("result_webhook_retries", 3),
+            ))
+        if config.get("result_jsonl_path"):
+            sinks.append(JSONLinesSink(config["result_jsonl_path"]))
+        if config.get("result_csv_path"):
+            sinks.append(CSVSink(config["result_csv_path"]))
+        if config.get("result_sqlite_path"):
+            sinks.append(SQLiteSink(config["result_sqlite_path"]))
+        if not sinks:
+            return None
+
+        return cls(
+            sinks,
+            batch_size=config.get("result_batch_size", 100),
+            flush_interval=config.get("result_flush_seconds", 2.0),
+            logger=logger,
+        )
+
+    def start(self):
+        """Inicia a task de gravação no laço asyncio atual"""
+        self.published = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="opsender-results")
+        self._task = asyncio.create_task(self._run())
+
+    def publish(self, **event):
+        """Enfileira um resultado sem bloquear
+
+        Args:
+            **event: Campos do resultado (index, row, phone, status, error, latency, attempt)
+        """
+        if self._queue is None:
+            return
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+
+        event.setdefault("ts", time.time())
+        event.setdefault("campaign", self.campaign)
+        self._queue.put_nowait(event)
+
+    async def _run(self):
+        """Agrupa os resultados da fila e grava cada lote"""
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            event = await self._queue.get()
+            if event is None:
+                break
+
+            batch = [event]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), max(0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    closing = True
+                    break
+                batch.append(event)
+
+            await loop.run_in_executor(self._executor, self._write, batch)
+
+    def _write(self, batch):
+        """Entrega um lote a cada destino; a falha de um não afeta os demais
+
+        O lote conta como publicado só depois que todos os destinos o gravam.
+
+        Args:
+            batch (list): Dicionários de resultado
+        """
+        ok = True
+        for sink in self.sinks:
+            try:
+                sink.write(batch)
+            except Exception as e:
+                ok = False
+                self._log(f"⚠️ Erro ao publicar {len(batch)} resultados em "
+                          f"{type(sink).__name__}: {str(e)}")
+
+        if ok:
+            self.published += len(batch)
+        else:
+            self.failed += len(batch)
+
+    def _close_sinks(self):
+        """Fecha os destinos na thread em que foram usados"""
+        for sink in self.sinks:
+            with contextlib.suppress(Exception):
+                sink.close()
+
+    async def close(self):
+        """Grava os resultados pendentes e encerra a task e os destinos"""
+        if self._task is None:
+            return
+
+        self._queue.put_nowait(None)
+        try:
+            await self._task
+        finally:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._close_sinks)
+            self._executor.shutdown(wait=False)
+            self._task = None
+            self._queue = None
+            self._executor = None
+
+        if self.dropped:
+            self._log(f"⚠️ {self.dropped} resultados descartados: fila de publicação cheia")
+
+    def _log(self, message):
+        """Registra a mensagem no logger, se houver
+
+        Args:
+            message (str): Mensagem a ser registrada
+        """
+        if self.logger:
+            self.logger.log(message)
@@ -0,0 +1,187 @@
+"""
+Medição do tempo de inicialização e das importações até a janela aparecer
+"""
+
+import os
+import sys
+import time
+
+from utils.config_manager import ConfigManager
+
+
+class _TimedLoader:
+    """Carregador que mede a execução de um módulo e delega o resto ao original"""
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self._profiler._stack
+        depth = len(stack)
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            self._profiler.imports.append((self._name, total - children, total, depth))
+
+            # Restaura o carregador original no módulo já carregado
+            module.__loader__ = self._loader
+            if getattr(module, "__spec__", None) is not None and module.__spec__.loader is self:
+                module.__spec__.loader = self._loader
+
+
+class _TimingFinder:
+    """Localizador que envolve o carregador encontrado pelos demais em um _TimedLoader"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler, name)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """Medição do tempo de inicialização e das importações até a janela aparecer
+
+    Ativado com `--profile-startup` na linha de comando ou com a variável de
+    ambiente OPSENDER_PROFILE_STARTUP=1. Mede, como `python -X importtime`,
+    o tempo próprio e acumulado de cada módulo importado, registra marcos
+    da inicialização e grava o relatório em `data/startup_profile.txt`.
+    Com OPSENDER_STARTUP_BUDGET_MS definido, avisa quando a janela demora
+    mais que o orçamento. Desativado, não altera as importações.
+    """
+
+    FLAG = "--profile-startup"
+    ENV_ENABLED = "OPSENDER_PROFILE_STARTUP"
+    ENV_BUDGET = "OPSENDER_STARTUP_BUDGET_MS"
+
+    def __init__(self, enabled=False, budget_ms=0):
+        """Inicializa o medidor, marcando o início da contagem
+
+        Args:
+            enabled (bool): Se a medição está ativa
+            budget_ms (float): Tempo máximo esperado até a janela aparecer. 0 desativa
+        """
+        self.enabled = enabled
+        self.budget_ms = budget_ms
+        self.started = time.perf_counter()
+        self.imports = []  # (módulo, tempo próprio, tempo acumulado, profundidade)
+        self.marks = []    # (marco, segundos desde o início)
+        self._stack = []
+        self._finder = None
+
+    @classmethod
+    def from_environment(cls, argv=None):
+        """Cria o medidor conforme a linha de comando e as variáveis de ambiente
+
+        Args:
+            argv (list, optional): Argumentos da linha de comando. Padrão: sys.argv
+
+        Returns:
+            StartupProfiler: Medidor, ativo ou não
+        """
+        argv = sys.argv if argv is None else argv
+        enabled = cls.FLAG in argv or os.environ.get(cls.ENV_ENABLED, "").lower() in ("1", "true", "sim")
+        try:
+            budget_ms = float(os.environ.get(cls.ENV_BUDGET) or 0)
+        except ValueError:
+            budget_ms = 0
+        return cls(enabled, budget_ms)
+
+    def install(self):
+        """Passa a medir as importações seguintes"""
+        if self.enabled and self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """Para de medir as importações"""
+        if self._finder is not None:
+            if self._finder in sys.meta_path:
+                sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def mark(self, label):
+        """Registra um marco da inicialização
+
+        Args:
+            label (str): Descrição do marco
+        """
+        if self.enabled:
+            self.marks.append((label, time.perf_counter() - self.started))
+
+    def report(self, limit=30):
+        """Monta o relatório de inicialização
+
+        Args:
+            limit (int): Quantidade de módulos listados, do mais lento ao mais rápido
+
+        Returns:
+            str: Relatório em texto
+        """
+        lines = ["Marcos da inicialização:"]
+        for label, elapsed in self.marks:
+            lines.append(f"  {elapsed * 1000:9.1f} ms  {label}")
+
+        top_level = sum(total for _, _, total, depth in self.imports if depth == 0)
+        lines.append("")
+        lines.append(f"Importações: {len(self.imports)} módulos, {top_level * 1000:.1f} ms no total")
+        lines.append(f"  {'próprio (ms)':>12} | {'acumulado (ms)':>14} | módulo")
+        slowest = sorted(self.imports, key=lambda item: item[2], reverse=True)[:limit]
+        for name, own, total, depth in slowest:
+            lines.append(f"  {own * 1000:12.1f} | {total * 1000:14.1f} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+    def finish(self, label="janela exibida"):
+        """Encerra a medição, grava o relatório e confere o orçamento
+
+        Args:
+            label (str): Marco final
+
+        Returns:
+            str | None: Caminho do relatório, ou None se a medição estiver desativada
+        """
+        if not self.enabled:
+            return None
+
+        self.mark(label)
+        self.uninstall()
+
+        text = self.report()
+        elapsed_ms = self.marks[-1][1] * 1000
+        if self.budget_ms and elapsed_ms > self.budget_ms:
+            text = (f"⚠️ Inicialização acima do orçamento: {elapsed_ms:.0f} ms "
+                    f"(limite {self.budget_ms:.0f} ms)\n\n") + text
+
+        path = os.path.join(ConfigManager.get_config_dir(), "startup_profile.txt")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        except OSError as e:
+            print(f"Erro ao salvar o relatório de inicialização: {str(e)}")
+            path = None
+
+        print(text, file=sys.stderr)
+        return path
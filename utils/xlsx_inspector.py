@@ -0,0 +1,291 @@
+"""
+Inspeção rápida de planilhas .xlsx sem ler todas as células
+"""
+
+import os
+import re
+import time
+import zipfile
+from xml.etree import ElementTree
+
+from utils.phone_formatter import PhoneNumberFormatter
+
+
+class XlsxInspector:
+    """Inspeção rápida de planilhas .xlsx sem ler todas as células
+
+    Um .xlsx é um zip de XMLs. A contagem vem da referência <dimension>
+    gravada no início da aba (ex.: "A1:C5000"), e apenas as primeiras
+    linhas são lidas, em streaming, para mostrar as colunas e uma amostra
+    de problemas de normalização. As strings compartilhadas só são lidas
+    até o maior índice usado na amostra. Assim o tempo não depende do
+    tamanho da planilha, ao contrário da leitura completa com pandas.
+    """
+
+    _MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    _REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+    _PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+    _CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+    _ROW_TAG = re.compile(rb"<(?:\w+:)?row[ >]")
+    _COLUMNS = {"A": 0, "B": 1}
+
+    PROBLEM_INVALID = "número inválido"
+    PROBLEM_EMPTY_MESSAGE = "mensagem vazia"
+
+    @classmethod
+    def inspect(cls, file_path, sample_rows=200, max_problems=10):
+        """Conta os contatos e examina as primeiras linhas da primeira aba
+
+        Args:
+            file_path (str): Caminho do arquivo .xlsx
+            sample_rows (int): Linhas de contato examinadas
+            max_problems (int): Problemas listados no resultado
+
+        Returns:
+            dict: sheet (nome da aba), rows (contatos, sem o cabeçalho), exact
+                (False quando a contagem inclui linhas sem telefone), columns
+                (cabeçalho), sample (tuplas (telefone, mensagem)), problems
+                (tuplas (linha, telefone, problema)), problem_count (problemas
+                na amostra) e elapsed (segundos)
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+            ValueError: Se o arquivo não for um .xlsx válido
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+        started = time.perf_counter()
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                sheet, sheet_path = cls._first_sheet(archive)
+                last_row, rows = cls._read_rows(archive, sheet_path, sample_rows + 1)
+                strings = cls._shared_strings(archive, rows)
+                if last_row is None:
+                    last_row = cls._count_rows(archive, sheet_path)
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            raise ValueError(f"Planilha .xlsx inválida: {str(e)}")
+
+        values = [[cls._value(cell, strings) for cell in row] for _, row in rows]
+        header = values[0] if rows and rows[0][0] == 1 else []
+        body = [(number, row) for (number, _), row in zip(rows, values) if number > 1]
+
+        sample = []
+        problems = []
+        problem_count = 0
+        for number, row in body:
+            phone = row[0].strip() if row else ""
+            if not phone:
+                continue  # Linhas sem telefone são ignoradas na leitura
+            message = row[1].strip() if len(row) > 1 else ""
+            sample.append((phone, message))
+
+            problem = None
+            if PhoneNumberFormatter.classify(phone)[1] == PhoneNumberFormatter.KIND_INVALID:
+                problem = cls.PROBLEM_INVALID
+            elif not message:
+                problem = cls.PROBLEM_EMPTY_MESSAGE
+            if problem:
+                problem_count += 1
+                if len(problems) < max_problems:
+                    problems.append((number, phone, problem))
+
+        # Sem linhas além da amostra, a contagem pode ser exata
+        complete = len(body) < sample_rows
+        return {
+            "sheet": sheet,
+            "rows": len(sample) if complete else max(0, last_row - 1),
+            "exact": complete,
+            "columns": [value for value in header if value],
+            "sample": sample,
+            "problems": problems,
+            "problem_count": problem_count,
+            "elapsed": time.perf_counter() - started,
+        }
+
+    @classmethod
+    def sheet_names(cls, file_path):
+        """Lista as abas da planilha lendo só o índice do arquivo
+
+        Args:
+            file_path (str): Caminho do arquivo .xlsx
+
+        Returns:
+            list: Nomes das abas, na ordem do arquivo
+
+        Raises:
+            ValueError: Se o arquivo não for um .xlsx válido
+        """
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            raise ValueError(f"Planilha .xlsx inválida: {str(e)}")
+        return [sheet.get("name") for sheet in workbook.iter(f"{cls._MAIN}sheet")]
+
+    @classmethod
+    def _first_sheet(cls, archive):
+        """Localiza a primeira aba do arquivo
+
+        Args:
+            archive (zipfile.ZipFile): Arquivo .xlsx aberto
+
+        Returns:
+            tuple: (nome da aba, caminho do XML da aba no zip)
+        """
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        sheet = workbook.find(f"{cls._MAIN}sheets/{cls._MAIN}sheet")
+        if sheet is None:
+            raise ValueError("Planilha sem abas")
+
+        relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        relation_id = sheet.get(f"{cls._REL}id")
+        for relation in relations.iter(f"{cls._PKG_REL}Relationship"):
+            if relation.get("Id") == relation_id:
+                target = relation.get("Target").lstrip("/")
+                path = target if target.startswith("xl/") else "xl/" + target
+                return sheet.get("name"), path
+        raise ValueError("Aba sem arquivo correspondente")
+
+    @classmethod
+    def _read_rows(cls, archive, sheet_path, limit):
+        """Lê a referência de dimensão e as primeiras linhas da aba, em streaming
+
+        Args:
+            archive (zipfile.ZipFile): Arquivo .xlsx aberto
+            sheet_path (str): Caminho do XML da aba no zip
+            limit (int): Linhas lidas, incluindo o cabeçalho
+
+        Returns:
+            tuple: (última linha da dimensão ou None, lista de (número da linha,
+                células (tipo, valor) nas colunas A e B))
+        """
+        last_row = None
+        rows = []
+        with archive.open(sheet_path) as stream:
+            for _, element in ElementTree.iterparse(stream):
+                tag = element.tag
+                if tag == f"{cls._MAIN}dimension":
+                    refs = cls._CELL_REF.findall(element.get("ref", ""))
+                    if refs:
+                        last_row = int(refs[-1][1])
+                elif tag == f"{cls._MAIN}row":
+                    rows.append((int(element.get("r") or len(rows) + 1), cls._row_cells(element)))
+                    element.clear()
+                    if len(rows) >= limit:
+                        break
+
+        # Dimensão ausente ou só "A1" (gravada por alguns geradores) não serve para contar
+        if last_row is not None and last_row <= 1 and len(rows) > 1:
+            last_row = None
+        return last_row, rows
+
+    @classmethod
+    def _row_cells(cls, row):
+        """Extrai as células de telefone (coluna A) e mensagem (coluna B) de uma linha
+
+        Args:
+            row (Element): Elemento <row>
+
+        Returns:
+            list: [(tipo, valor) da coluna A, (tipo, valor) da coluna B]
+        """
+        cells = [(None, None), (None, None)]
+        for position, cell in enumerate(row.iter(f"{cls._MAIN}c")):
+            match = cls._CELL_REF.match(cell.get("r", ""))
+            column = cls._COLUMNS.get(match.group(1)) if match else position
+            if column is None or column > 1:
+                continue
+
+            kind = cell.get("t")
+            if kind == "inlineStr":
+                value = "".join(node.text or "" for node in cell.iter(f"{cls._MAIN}t"))
+            else:
+                node = cell.find(f"{cls._MAIN}v")
+                value = node.text if node is not None else None
+            cells[column] = (kind, value)
+        return cells
+
+    @classmethod
+    def _shared_strings(cls, archive, rows):
+        """Lê as strings compartilhadas só até o maior índice usado nas linhas lidas
+
+        Args:
+            archive (zipfile.ZipFile): Arquivo .xlsx aberto
+            rows (list): Linhas retornadas por _read_rows
+
+        Returns:
+            list: Strings nas posições 0..maior índice
+        """
+        needed = -1
+        for _, cells in rows:
+            for kind, value in cells:
+                if kind == "s" and value is not None:
+                    needed = max(needed, int(value))
+        if needed < 0 or "xl/sharedStrings.xml" not in archive.namelist():
+            return []
+
+        strings = []
+        with archive.open("xl/sharedStrings.xml") as stream:
+            for _, element in ElementTree.iterparse(stream):
+                if element.tag == f"{cls._MAIN}si":
+                    # Texto simples (<t>) ou formatado em trechos (<r><t>)
+                    strings.append("".join(node.text or "" for node in element.iter(f"{cls._MAIN}t")))
+                    element.clear()
+                    if len(strings) > needed:
+                        break
+        return strings
+
+    @staticmethod
+    def _value(cell, strings):
+        """Converte uma célula em texto, como na leitura completa
+
+        Números inteiros gravados em notação científica ou com ".0" (comum
+        em colunas de telefone) voltam a ser apenas dígitos.
+
+        Args:
+            cell (tuple): (tipo, valor) da célula
+            strings (list): Strings compartilhadas
+
+        Returns:
+            str: Valor da célula, ou "" se vazia
+        """
+        kind, value = cell
+        if value is None:
+            return ""
+        if kind == "s":
+            index = int(value)
+            return strings[index] if index < len(strings) else ""
+        if kind in (None, "n"):
+            try:
+                number = float(value)
+            except ValueError:
+                return value
+            if number.is_integer():
+                return str(int(number))
+        return value
+
+    @classmethod
+    def _count_rows(cls, archive, sheet_path):
+        """Conta as linhas da aba varrendo o XML, quando não há dimensão
+
+        Mais lento que ler a dimensão, mas ainda sem interpretar as células.
+
+        Args:
+            archive (zipfile.ZipFile): Arquivo .xlsx aberto
+            sheet_path (str): Caminho do XML da aba no zip
+
+        Returns:
+            int: Número de linhas, incluindo o cabeçalho
+        """
+        count = 0
+        tail = b""
+        with archive.open(sheet_path) as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                data = tail + chunk
+                count += len(cls._ROW_TAG.findall(data))
+                # Guarda o fim do bloco para não perder uma tag dividida entre dois blocos
+                tail = data[-8:]
+                count -= len(cls._ROW_TAG.findall(tail))
+        return count
@@ -3,21 +3,99 @@ Gerenciador de envio de mensagens via WhatsApp Web
 """
 
 import asyncio
+import contextlib
+import csv
+import functools
+import json
 import os
+import re
+import time
 from urllib.parse import quote
 
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-
+from delivery_tracker import DeliveryTracker, OPEN_CHAT_STATE_JS
+from memory_watchdog import MemoryWatchdog
+from utils.attachment_cache import AttachmentCache
+from utils.campaign_journal import CampaignJournal
+from utils.circuit_breaker import CircuitBreaker
+from utils.config_manager import ConfigManager
+from utils.contact_store import ContactStore
+from utils.excel_reader import ExcelReader
 from utils.phone_formatter import PhoneNumberFormatter
 from utils.logger import Logger
+from utils.profile_manager import ProfileManager
 from utils.progress_tracker import ProgressTracker
-
-from plyer import notification
+from utils.rate_scheduler import RateScheduler
+from utils.report_exporter import ReportExporter
+
+
+def _playwright():
+    """Importa a API assíncrona do Playwright no primeiro uso
+
+    O Playwright só é carregado quando um envio começa, para não atrasar a
+    abertura da janela. Depois da primeira chamada o módulo vem do cache
+    de importações.
+
+    Returns:
+        module: playwright.async_api
+    """
+    from playwright import async_api
+    return async_api
+
+
+# Seletores da tela de login (QR code), exibida quando a sessão é desconectada
+LOGIN_SCREEN_SELECTOR = 'canvas[aria-label*="can"], div[data-ref], [data-testid="qrcode"]'
+
+# Procura sinais de problemas na conta: sessão desconectada, bloqueio ou limitação.
+# Só lê diálogos e alertas, para não confundir com o texto das conversas.
+ACCOUNT_HEALTH_JS = """() => {
+    if (document.querySelector('%s')) return 'logout';
+    const text = Array.from(document.querySelectorAll(
+        'div[role="dialog"], div[role="alert"], div[data-animate-modal-body="true"]'))
+        .map((node) => node.innerText.toLowerCase()).join(' ');
+    if (/banid|banned|proibid|suspens/.test(text)) return 'banned';
+    if (/spam|temporariamente|temporarily|too many|muitas mensagens/.test(text)) return 'throttled';
+    return null;
+}""" % LOGIN_SCREEN_SELECTOR
+
+# Resultado da abertura de uma conversa sem texto: campo de mensagem (número
+# registrado), modal com botão OK (número inválido) ou tela de login
+REGISTRATION_STATE_JS = """() => {
+    if (document.querySelector('%s')) return 'logout';
+    if (document.querySelector('footer div[contenteditable="true"]')) return 'registered';
+    const modal = document.querySelector('div[data-animate-modal-body="true"]');
+    if (modal && modal.querySelector('button')) return 'invalid';
+    return false;
+}""" % LOGIN_SCREEN_SELECTOR
 
 
 class WhatsAppSender:
     """Gerenciador de envio de mensagens via WhatsApp Web"""
 
+    # Falhas listadas individualmente no relatório final; o restante vai só na planilha
+    MAX_FAILURES_LOGGED = 50
+
+    # Configurações ajustáveis durante a campanha → conversor do valor
+    LIVE_SETTINGS = {
+        "wait_time": float,
+        "max_retries": int,
+        "rate_per_minute": int,
+        "rate_per_hour": int,
+        "rate_per_day": int,
+        "rate_burst": int,
+        "send_windows": str,
+        "send_weekdays": str,
+    }
+
+    # Configuração → parâmetro de RateScheduler.reconfigure
+    SCHEDULER_SETTINGS = {
+        "rate_per_minute": "per_minute",
+        "rate_per_hour": "per_hour",
+        "rate_per_day": "per_day",
+        "rate_burst": "burst",
+        "send_windows": "windows",
+        "send_weekdays": "weekdays",
+    }
+
     def __init__(self, logger=None, progress_tracker=None):
         """Inicializa o gerenciador de envio de mensagens
 
@@ -33,17 +111,66 @@ class WhatsAppSender:
         self.running = False
         self.paused = False
 
+        # Eventos de controle: pausa/retomada e interrupção acordam as esperas na hora
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+        self._stop_event = asyncio.Event()
+
         # Estatísticas
         self.total_messages = 0
         self.sent_messages = 0
         self.failed_messages = []
         self.retry_count = {}
 
+        # Armazenamento compacto dos contatos, quando fornecido
+        self.contact_store = None
+
+        # Fonte em streaming da campanha atual (banco de dados ou arrendamentos)
+        self.contact_source = None
+
+        # Diário de eventos da campanha, quando configurado
+        self.journal = None
+
+        # Destinos do resultado de cada envio (webhook, arquivos, tabela), quando configurados
+        self.results = None
+
+        # Planilha de origem, que recebe uma cópia com o resultado por linha
+        self.source_path = None
+
         # Configurações
         self.max_retries = 3
         self.wait_time = 5  # segundos
         self.headless = False
         self.user_data_dir = "whatsapp_profile"
+        self.profile_snapshot = None  # Instantâneo usado para criar o perfil ausente, sem QR code
+        self.last_startup_seconds = None  # Abertura do navegador até a lista de conversas
+
+        # Agendador com limites de taxa e janelas; sem ele vale o wait_time fixo
+        self.scheduler = None
+
+        # Disjuntor contra limitação e bloqueio da conta
+        self.breaker = CircuitBreaker()
+        self.last_error = None
+
+        # Anexos: um arquivo para a campanha toda ou um por texto de mensagem
+        self.attachment_path = None
+        self.message_attachments = {}
+        self.attachment_cache = AttachmentCache()
+        self.upload_times = []
+
+        # Preenchimento do texto: "url" (parâmetro text=), "insert" (digitação em
+        # bloco no campo) ou "auto" (inserção quando a URL ficaria longa demais)
+        self.text_insert_mode = "auto"
+        self.url_max_length = 2000
+        self.text_timings = {"url": [], "insert": []}
+
+        # Confirmação assíncrona: registra o envio e concilia os ícones depois
+        self.async_confirmation = True
+        self.delivery_tracker = DeliveryTracker(on_update=self._on_delivery_update)
+
+        # Monitor de memória: recicla a página ("page") ou o contexto ("context")
+        self.watchdog = MemoryWatchdog()
+        self.recycle_mode = "page"
 
         # Recursos do navegador
         self.browser = None
@@ -53,17 +180,28 @@ class WhatsAppSender:
         # Task principal para controle de cancelamento
         self.main_task = None
 
-    async def initialize_browser(self):
+    async def initialize_browser(self, timeout=0):
         """Inicializa o navegador para a sessão do WhatsApp Web
 
         Configura e inicia o navegador Chromium via Playwright,
-        otimizando configurações para reduzir uso de recursos.
+        otimizando configurações para reduzir uso de recursos. O tempo
+        até a lista de conversas aparecer fica em last_startup_seconds.
+
+        Args:
+            timeout (float): Tempo máximo em ms para o WhatsApp carregar (0 = sem limite)
 
         Returns:
             bool: True se inicializado com sucesso
         """
         self.logger.log("\U0001F680 Inicializando navegador...")
 
+        # Perfil novo: criado a partir do instantâneo de um perfil já conectado
+        if self.profile_snapshot and not (os.path.isdir(self.user_data_dir) and os.listdir(self.user_data_dir)):
+            stats = await asyncio.to_thread(ProfileManager.provision, self.profile_snapshot,
+                                            self.user_data_dir, True)
+            self.logger.log(f"🧬 Perfil {self.user_data_dir} criado a partir do instantâneo "
+                            f"em {stats['elapsed']:.1f}s ({stats['cloned']}/{stats['files']} arquivos clonados)")
+
         # Garante que o diretório existe
         os.makedirs(self.user_data_dir, exist_ok=True)
 
@@ -72,10 +210,11 @@ class WhatsAppSender:
 
         playwright = None
         browser = None
+        started = time.perf_counter()
 
         try:
             # Inicia o Playwright e o navegador
-            playwright = await async_playwright().start()
+            playwright = await _playwright().async_playwright().start()
             self.playwright = playwright
 
             # Configurações otimizadas para o navegador
@@ -98,18 +237,9 @@ class WhatsAppSender:
             # Obtém a página ou cria uma nova
             self.page = browser.pages[0] if browser.pages else await browser.new_page()
 
-            # Otimiza o carregamento da página no modo headless
-            if self.headless:
-                # Bloqueia recursos não essenciais para melhorar performance
-                await self.page.route('**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2,ttf,otf}',
-                                    lambda route: route.abort())
-
-            # Acessa o WhatsApp Web e aguarda o carregamento
-            await self.page.goto("https://web.whatsapp.com/", wait_until="domcontentloaded")
             self.logger.log("\U0001F50D Verificando status do login no WhatsApp...")
-
-            # Aguarda até que o WhatsApp esteja carregado (conversas visíveis)
-            await self.page.wait_for_selector('div[role="grid"]', timeout=0)
+            await self._open_whatsapp(self.page, timeout)
+            self.last_startup_seconds = time.perf_counter() - started
             self.logger.log("✅ WhatsApp Web carregado e pronto para envio!")
 
             return True
@@ -133,39 +263,132 @@ class WhatsAppSender:
             # Propaga a exceção para tratamento adequado
             raise
 
-    async def send_message(self, phone, message):
+    async def _open_whatsapp(self, page, timeout=0):
+        """Carrega o WhatsApp Web na página e aguarda a lista de conversas
+
+        Args:
+            page: Página do Playwright
+            timeout (float): Tempo máximo em ms para o carregamento (0 = sem limite,
+                para dar tempo de escanear o QR code)
+        """
+        # Otimiza o carregamento da página no modo headless
+        if self.headless:
+            # Bloqueia recursos não essenciais para melhorar performance
+            await page.route('**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2,ttf,otf}',
+                             lambda route: route.abort())
+
+        # Acessa o WhatsApp Web e aguarda o carregamento
+        await page.goto("https://web.whatsapp.com/", wait_until="domcontentloaded")
+
+        # Aguarda até que o WhatsApp esteja carregado (conversas visíveis)
+        await page.wait_for_selector('div[role="grid"]', timeout=timeout)
+
+    async def _check_memory(self, processed):
+        """Coleta as métricas do navegador e recicla a página se necessário
+
+        Args:
+            processed (int): Mensagens processadas até agora
+        """
+        if not self.watchdog.due(processed) or not self.page:
+            return
+
+        before = await self.watchdog.sample(self.page, self.user_data_dir)
+        reason = self.watchdog.recycle_reason(before)
+        if not reason:
+            return
+
+        self.logger.log(f"♻️ Reciclando {'o contexto' if self.recycle_mode == 'context' else 'a página'}: {reason}")
+        try:
+            await self._recycle_page()
+        except Exception as e:
+            self.logger.log(f"❌ Erro ao reciclar o navegador: {str(e)}")
+            raise
+
+        after = await self.watchdog.sample(self.page, self.user_data_dir)
+        reclaimed = self.watchdog.record_recycle(before, after)
+        self.logger.log(f"♻️ Heap JS: {before.get('heap_used_mb', 0):.0f} MB → "
+                        f"{after.get('heap_used_mb', 0):.0f} MB ({reclaimed:.0f} MB liberados)")
+        if "renderer_mb" in before and "renderer_mb" in after:
+            self.logger.log(f"♻️ Renderer: {before['renderer_mb']:.0f} MB → {after['renderer_mb']:.0f} MB")
+
+    async def _recycle_page(self):
+        """Substitui a página (ou o contexto inteiro) por uma nova
+
+        No modo "page", a nova aba é criada antes de fechar a antiga para
+        manter o contexto aberto e só então carrega o WhatsApp Web, evitando
+        duas abas ativas ao mesmo tempo. A sessão continua logada, pois fica
+        no perfil.
+        """
+        if self.async_confirmation:
+            await self.delivery_tracker.sample_open_chat(self.page)
+            await self.delivery_tracker.stop()
+
+        # A sessão CDP pertence à página antiga
+        await self.watchdog.detach()
+
+        if self.recycle_mode == "context":
+            await self._close_browser_resources()
+            await self.initialize_browser(timeout=120000)
+        else:
+            old_page = self.page
+            self.page = await self.browser.new_page()
+            await old_page.close()
+            await self._open_whatsapp(self.page, timeout=60000)
+
+        if self.async_confirmation:
+            self.delivery_tracker.start(self.page)
+
+    async def send_message(self, phone, message, attachment=None, index=None):
         """Envia uma mensagem para um número específico
 
         Acessa a conversa do WhatsApp com o número especificado,
-        envia a mensagem e aguarda confirmação de envio.
+        envia a mensagem e aguarda confirmação de envio. Quando há anexo,
+        a mensagem é enviada como legenda do arquivo.
+
+        Uma mensagem pode ser dividida em várias partes com uma linha
+        contendo apenas "---". As partes são enviadas em sequência na mesma
+        conversa, cada uma com sua própria confirmação, sem recarregar a página.
 
         Args:
             phone (str): Número de telefone do destinatário
             message (str): Texto da mensagem a ser enviada
+            attachment (str, optional): Caminho do arquivo a anexar. Se omitido,
+                usa o anexo configurado para a mensagem ou para a campanha
+            index (int, optional): Índice do contato na campanha, usado para
+                associar a confirmação assíncrona à linha
 
         Returns:
             bool: True se a mensagem foi enviada com sucesso
         """
-        if not message.strip():
+        attachment = attachment or self._resolve_attachment(message)
+        self.last_error = None
+
+        if not message.strip() and not attachment:
             self.logger.log(f"⚠️ Mensagem vazia para {phone}, pulando...")
             return False
 
         if not self.running or not self.browser or not self.page:
             return False
 
+        parts = self.split_message_parts(message) or [""]
+
+        # Com anexo, o texto vai como legenda; mensagens longas são inseridas no campo
+        text_mode = None if attachment else self._choose_text_mode(parts[0])
+
         try:
             # Normaliza o número de telefone
             normalized_phone = PhoneNumberFormatter.normalize(phone)
 
-            # Codifica a mensagem para URL
-            encoded_message = quote(message)
-
-            # Constrói a URL do WhatsApp
-            url = f"https://web.whatsapp.com/send/?phone={normalized_phone}&text={encoded_message}&type=phone_number&app_absent=0"
+            url = self._build_chat_url(normalized_phone, parts[0] if text_mode == "url" else None)
 
             self.logger.log(f"🔗 Acessando conversa com {normalized_phone}...")
 
+            # Aproveita a conversa anterior ainda aberta para ler a confirmação
+            if self.async_confirmation:
+                await self.delivery_tracker.sample_open_chat(self.page)
+
             # Otimiza o carregamento da página
+            started = time.perf_counter()
             await self.page.goto(url, wait_until="domcontentloaded")
 
             # Espera até que a página carregue e o campo de mensagem esteja disponível
@@ -174,17 +397,22 @@ class WhatsAppSender:
                 if not self.running:
                     return False
 
-                # Usa uma estratégia de espera mais eficiente
-                await self.page.wait_for_selector('div[contenteditable="true"]',
+                # Usa uma estratégia de espera mais eficiente; a tela de login
+                # também encerra a espera, para não aguardar o timeout à toa
+                await self.page.wait_for_selector(f'div[contenteditable="true"], {LOGIN_SCREEN_SELECTOR}',
                                                 state="visible",
                                                 timeout=30000)
 
                 # Pequena pausa para garantir que a página está completamente carregada
                 await asyncio.sleep(1.5)  # Mais eficiente que wait_for_timeout
 
+                if await self._check_account_health():
+                    return False
+
                 # Verifica se há mensagem de erro de número inválido
                 invalid_number = await self.page.query_selector('div[data-animate-modal-body="true"]')
                 if invalid_number:
+                    self.last_error = "invalid"
                     self.logger.log(f"❌ Número inválido: {normalized_phone}")
                     return False
 
@@ -192,29 +420,281 @@ class WhatsAppSender:
                 if not self.running:
                     return False
 
-                # Envia a mensagem
-                await self.page.keyboard.press("Enter")
-                self.logger.log(f"📤 Mensagem enviada para {normalized_phone}, aguardando confirmação...")
+                for number, part in enumerate(parts, start=1):
+                    if not self.running:
+                        return False
 
-                # Espera pela confirmação de envio de forma mais eficiente
-                await self.page.wait_for_selector('div.message-out',
-                                                state="visible",
-                                                timeout=15000)
-                await self.page.wait_for_selector('span[data-icon="msg-check"], span[data-icon="msg-dblcheck"]',
-                                                state="visible",
-                                                timeout=10000)
+                    sent_count = await self._count_outgoing_messages()
 
-                self.logger.log(f"✅ Mensagem confirmada para {normalized_phone}")
+                    # A primeira parte já está no campo (URL) ou vai como legenda do anexo
+                    if number == 1 and attachment:
+                        await self._send_attachment(attachment, part)
+                    else:
+                        if number > 1 or text_mode == "insert":
+                            await self.page.click('footer div[contenteditable="true"]')
+                            await self._insert_text(part)
+                        if number == 1:
+                            self.text_timings[text_mode].append(time.perf_counter() - started)
+                        await self.page.keyboard.press("Enter")
+
+                    label = f" (parte {number}/{len(parts)})" if len(parts) > 1 else ""
+
+                    # No modo assíncrono basta a mensagem aparecer na conversa;
+                    # os ícones de confirmação são conciliados em segundo plano
+                    if self.async_confirmation:
+                        await self._wait_for_outgoing(sent_count)
+                        self.logger.log(f"📤 Mensagem enviada para {normalized_phone}{label}")
+                    else:
+                        self.logger.log(f"📤 Mensagem enviada para {normalized_phone}{label}, aguardando confirmação...")
+                        await self._wait_for_outgoing(sent_count)
+                        await self._wait_for_sent_tick()
+
+                if self.async_confirmation:
+                    self.delivery_tracker.record(normalized_phone, index)
+                else:
+                    self.logger.log(f"✅ Mensagem confirmada para {normalized_phone}")
                 return True
 
-            except PlaywrightTimeoutError as e:
+            except _playwright().TimeoutError as e:
+                self.last_error = "timeout"
                 self.logger.log(f"⚠️ Timeout ao enviar mensagem para {normalized_phone}: {str(e)}")
+                await self._check_account_health()
                 return False
 
         except Exception as e:
+            self.last_error = "error"
             self.logger.log(f"❌ Erro ao enviar mensagem para {normalized_phone}: {str(e)}")
             return False
 
+    async def _check_account_health(self):
+        """Procura na página sinais de sessão desconectada, bloqueio ou limitação
+
+        Quando encontra, registra o motivo em last_error.
+
+        Returns:
+            str | None: "logout", "banned", "throttled" ou None se nada for encontrado
+        """
+        try:
+            problem = await self.page.evaluate(ACCOUNT_HEALTH_JS)
+        except Exception:
+            return None
+
+        if problem:
+            self.last_error = problem
+        return problem
+
+    def _update_breaker(self, success):
+        """Alimenta o disjuntor com o resultado do último envio
+
+        Números inválidos não contam como falha da conta.
+
+        Args:
+            success (bool): Se o envio foi bem-sucedido
+        """
+        if success:
+            self.breaker.record_success()
+            return
+
+        reason = self.last_error
+        if reason == "logout":
+            self.breaker.trip("sessão do WhatsApp desconectada", fatal=True)
+        elif reason == "banned":
+            self.breaker.trip("aviso de bloqueio da conta", fatal=True)
+        elif reason == "throttled":
+            self.breaker.trip("aviso de limitação de envios")
+        elif reason in ("timeout", "error"):
+            self.breaker.record_failure(reason)
+
+    async def _wait_for_breaker(self):
+        """Segura o envio enquanto o disjuntor estiver aberto
+
+        Encerra a campanha se o disjuntor indicar problema que exige
+        intervenção ou se abrir vezes demais.
+
+        Returns:
+            bool: True se o envio pode continuar
+        """
+        if self.breaker.state == CircuitBreaker.STATE_CLOSED:
+            return True
+
+        if self.breaker.halted:
+            self.logger.log(f"🚨 Envio encerrado para proteger o número: {self.breaker.reason}.")
+            if hasattr(self.contact_source, "complete"):
+                # O encerramento da fonte libera os arrendamentos em aberto
+                self.logger.log("🔁 Os contatos ainda não enviados voltam para as outras máquinas da campanha.")
+            self.running = False
+            return False
+
+        remaining = self.breaker.remaining_cooldown()
+        if remaining > 0:
+            self.logger.log(f"🧯 Envios suspensos ({self.breaker.reason}). "
+                            f"Nova tentativa em {remaining / 60:.0f} min...")
+
+        while self.running and self.breaker.state == CircuitBreaker.STATE_OPEN:
+            await self._sleep(max(self.breaker.remaining_cooldown(), 0.1))
+        self.progress.idle()  # A suspensão não entra na taxa de envio
+
+        return self.running
+
+    @staticmethod
+    def split_message_parts(message):
+        """Divide a mensagem nas partes enviadas em sequência
+
+        As partes são separadas por uma linha contendo apenas "---".
+        Partes vazias são descartadas.
+
+        Args:
+            message (str): Texto da mensagem
+
+        Returns:
+            list: Partes da mensagem, sem espaços nas extremidades
+        """
+        parts = re.split(r'^[ \t]*---[ \t]*$', message, flags=re.MULTILINE)
+        return [part.strip() for part in parts if part.strip()]
+
+    async def _count_outgoing_messages(self):
+        """Conta as mensagens enviadas visíveis na conversa aberta
+
+        Returns:
+            int: Quantidade de elementos div.message-out
+        """
+        return await self.page.evaluate("document.querySelectorAll('div.message-out').length")
+
+    async def _wait_for_outgoing(self, previous_count):
+        """Aguarda a nova mensagem aparecer na conversa
+
+        Compara com a contagem anterior ao envio para não confundir a
+        mensagem nova com mensagens antigas da conversa.
+
+        Args:
+            previous_count (int): Quantidade de mensagens enviadas antes do envio
+
+        Raises:
+            playwright.async_api.TimeoutError: Se a mensagem não aparecer a tempo
+        """
+        await self.page.wait_for_function(
+            """(previous) => {
+                const outgoing = document.querySelectorAll('div.message-out');
+                return outgoing.length > previous;
+            }""",
+            arg=previous_count,
+            timeout=15000
+        )
+
+    async def _wait_for_sent_tick(self):
+        """Aguarda o ícone de enviada na última mensagem da conversa
+
+        Raises:
+            playwright.async_api.TimeoutError: Se a confirmação não chegar a tempo
+        """
+        await self.page.wait_for_function(
+            """() => {
+                const outgoing = document.querySelectorAll('div.message-out');
+                const last = outgoing[outgoing.length - 1];
+                return !!last && !!last.querySelector(
+                    'span[data-icon="msg-check"], span[data-icon="msg-dblcheck"]');
+            }""",
+            timeout=10000
+        )
+
+    @staticmethod
+    def _build_chat_url(phone, message=None):
+        """Monta a URL que abre a conversa no WhatsApp Web
+
+        Args:
+            phone (str): Número normalizado
+            message (str, optional): Texto a pré-preencher no campo de mensagem
+
+        Returns:
+            str: URL da conversa
+        """
+        url = f"https://web.whatsapp.com/send/?phone={phone}"
+        if message:
+            url += f"&text={quote(message)}"
+        return url + "&type=phone_number&app_absent=0"
+
+    def _choose_text_mode(self, text):
+        """Escolhe como o texto chega ao campo de mensagem
+
+        No modo "auto", textos cuja codificação na URL passaria de
+        url_max_length caracteres são inseridos direto no campo, evitando
+        URLs enormes (lentas de carregar e sujeitas a truncamento).
+
+        Args:
+            text (str): Texto da primeira parte da mensagem
+
+        Returns:
+            str: "url" ou "insert"
+        """
+        if self.text_insert_mode in ("url", "insert"):
+            return self.text_insert_mode
+        return "insert" if len(quote(text)) > self.url_max_length else "url"
+
+    def _resolve_attachment(self, message):
+        """Retorna o anexo configurado para a mensagem
+
+        Um anexo associado ao texto da mensagem tem prioridade sobre o
+        anexo da campanha.
+
+        Args:
+            message (str): Texto da mensagem
+
+        Returns:
+            str | None: Caminho do anexo ou None
+        """
+        return self.message_attachments.get(message.strip()) or self.attachment_path
+
+    async def _insert_text(self, text):
+        """Insere texto no campo focado de uma só vez
+
+        Quebras de linha viram Shift+Enter, já que Enter envia a mensagem.
+
+        Args:
+            text (str): Texto a inserir
+        """
+        for i, line in enumerate(text.split("\n")):
+            if i:
+                await self.page.keyboard.press("Shift+Enter")
+            if line:
+                await self.page.keyboard.insert_text(line)
+
+    async def _send_attachment(self, path, caption=""):
+        """Envia um arquivo pela conversa aberta usando o menu de anexos
+
+        O conteúdo vem do cache em memória, então o arquivo é lido do disco
+        apenas uma vez por campanha. O tempo até a pré-visualização ficar
+        pronta é registrado em upload_times.
+
+        Args:
+            path (str): Caminho do arquivo
+            caption (str): Legenda enviada junto com o arquivo
+        """
+        payload = self.attachment_cache.get(path)
+
+        await self.page.click('div[title="Anexar"], span[data-icon="plus"], span[data-icon="attach-menu-plus"]',
+                              timeout=10000)
+
+        # Imagens e vídeos usam o input com pré-visualização; o resto vai como documento
+        if AttachmentCache.is_media(payload):
+            file_input = 'input[type="file"][accept*="image"]'
+        else:
+            file_input = 'input[type="file"]:not([accept*="image"])'
+
+        started = time.perf_counter()
+        await self.page.set_input_files(file_input, files=[payload], timeout=10000)
+        await self.page.wait_for_selector('span[data-icon="send"], div[aria-label="Enviar"]',
+                                          state="visible",
+                                          timeout=30000)
+        elapsed = time.perf_counter() - started
+        self.upload_times.append(elapsed)
+        self.logger.log(f"📎 Anexo {payload['name']} carregado em {elapsed:.2f}s")
+
+        # O campo de legenda recebe o foco ao abrir a pré-visualização
+        if caption.strip():
+            await self._insert_text(caption)
+
+        await self.page.keyboard.press("Enter")
+
     async def process_contacts(self, contacts):
         """Processa a lista de contatos e envia mensagens
 
@@ -222,18 +702,40 @@ class WhatsAppSender:
         tenta reenviar mensagens que falharam.
 
         Args:
-            contacts (list): Lista de tuplas (telefone, mensagem)
+            contacts (list | ContactStore | DBContactSource): Lista de tuplas
+                (telefone, mensagem), armazenamento compacto, que recebe o status
+                de cada linha, ou fonte com stream() que entrega os contatos em
+                lotes enquanto a consulta ainda está em andamento
         """
         # Inicializa o estado do processo
-        self.running = True
-        self.paused = False
-        self.total_messages = len(contacts)
+        self._begin_run()
+        streaming = hasattr(contacts, "stream")
+        self.total_messages = (await asyncio.to_thread(contacts.count) or 0) if streaming else len(contacts)
         self.sent_messages = 0
         self.failed_messages = []
         self.retry_count = {}
-
-        # Inicializa a barra de progresso
-        self.progress.update(0, self.total_messages)
+        self.upload_times = []
+        self.text_timings = {"url": [], "insert": []}
+        self.watchdog = MemoryWatchdog(self.watchdog.heap_limit_mb, self.watchdog.drift_ratio,
+                                       self.watchdog.check_every,
+                                       process_limit_mb=self.watchdog.process_limit_mb)
+        self.delivery_tracker = DeliveryTracker(on_update=self._on_delivery_update)
+        if streaming:
+            # Os contatos recebidos da fonte são acumulados no formato compacto
+            self.contact_store = ContactStore()
+            self.contact_source = contacts
+        else:
+            self.contact_store = contacts if isinstance(contacts, ContactStore) else None
+            self.contact_source = None
+
+        # Inicializa a barra de progresso e as estatísticas de taxa e previsão
+        self.progress.reset(self.total_messages)
+        self.progress.schedule = self.scheduler
+        self.progress.update()
+
+        # Publicação dos resultados em segundo plano, agrupados em lotes
+        if self.results:
+            self.results.start()
 
         try:
             # Cria uma task principal para poder cancelar facilmente
@@ -262,55 +764,87 @@ class WhatsAppSender:
             # Inicializa o navegador uma única vez
             browser_initialized = await self.initialize_browser()
 
-            # Processa cada contato em lotes para melhor performance
-            batch_size = min(10, self.total_messages)  # Tamanho do lote adaptativo
-
-            for i in range(0, self.total_messages, batch_size):
-                # Verifica se o processo foi interrompido
-                if not self.running:
-                    break
-
-                # Cria um lote de contatos
-                batch = contacts[i:i+batch_size]
+            if self.async_confirmation:
+                self.delivery_tracker.start(self.page)
 
-                # Processa o lote
-                for j, (phone, message) in enumerate(batch):
-                    current_index = i + j
+            # Processa cada contato em lotes para melhor performance
+            batch_size = max(1, min(10, self.total_messages))  # Tamanho do lote adaptativo
 
+            async with contextlib.aclosing(self._contact_batches(contacts, batch_size)) as batches:
+                async for i, batch in batches:
                     # Verifica se o processo foi interrompido
                     if not self.running:
-                        self.logger.log("🛑 Processo interrompido pelo usuário.")
                         break
 
-                    # Verifica se está pausado
-                    while self.paused and self.running:
-                        await asyncio.sleep(0.5)  # Reduz o intervalo de verificação
-
-                    # Atualiza o progresso
-                    self.progress.update(current_index)
+                    # Processa o lote
+                    for j, (phone, message) in enumerate(batch):
+                        current_index = i + j
+
+                        # Verifica se o processo foi interrompido
+                        if not self.running:
+                            self.logger.log("🛑 Processo interrompido pelo usuário.")
+                            break
+
+                        # Verifica se está pausado
+                        await self._wait_if_paused()
+
+                        # Atualiza o progresso
+                        self.progress.update(current_index)
+
+                        # Números já identificados como inválidos não são enviados
+                        if (self.contact_store is not None and
+                                self.contact_store.get_status(current_index) == ContactStore.STATUS_INVALID):
+                            self.logger.log(f"❌ Número inválido na linha {self.contact_store.row(current_index)}, pulando...")
+                            self.failed_messages.append((phone, message, current_index))
+                            self._report_to_source(current_index, ContactStore.STATUS_INVALID, "invalid")
+                            self._publish_result(current_index, phone, ContactStore.STATUS_INVALID, "invalid")
+                            continue
+
+                        # Respeita o disjuntor antes de consumir orçamento do agendador
+                        if not await self._wait_for_breaker():
+                            break
+
+                        # Aguarda orçamento do agendador (taxa, cota e janela de envio)
+                        if self.scheduler and not await self.scheduler.acquire(lambda: self.running, self._stop_event):
+                            break
+
+                        # Tenta enviar a mensagem
+                        started = time.perf_counter()
+                        success = await self.send_message(phone, message, index=current_index)
+                        self._update_breaker(success)
+                        latency = time.perf_counter() - started
+                        self.watchdog.record_latency(latency)
+                        self._record_result(current_index, phone, success, latency)
+                        self.progress.record(success, retriable=self.max_retries > 0)
 
-                    # Tenta enviar a mensagem
-                    success = await self.send_message(phone, message)
+                        if success:
+                            self.sent_messages += 1
+                            self._journal(CampaignJournal.EVENT_SENT, phone, current_index)
+                        else:
+                            # Adiciona à lista de falhas
+                            self.failed_messages.append((phone, message, current_index))
+                            self._journal(CampaignJournal.EVENT_FAILED, phone, current_index)
 
-                    if success:
-                        self.sent_messages += 1
-                    else:
-                        # Adiciona à lista de falhas
-                        self.failed_messages.append((phone, message))
+                        await self._check_memory(current_index + 1)
 
-                    # Pausa entre mensagens para evitar bloqueio (inclusive após a última)
-                    if self.running:  # Só aguarda se ainda estiver rodando
-                        self.logger.log(f"⏳ Aguardando {self.wait_time} segundos antes de continuar...")
-                        await asyncio.sleep(self.wait_time)
+                        # Pausa entre mensagens para evitar bloqueio (inclusive após a última)
+                        # Com agendador, o ritmo é controlado pelo acquire antes do envio
+                        if self.running and not self.scheduler:
+                            self.logger.log(f"⏳ Aguardando {self.wait_time} segundos antes de continuar...")
+                            await self._sleep(self.wait_time)
 
-                # Verifica novamente se o processo foi interrompido após o lote
-                if not self.running:
-                    break
+                    # Verifica novamente se o processo foi interrompido após o lote
+                    if not self.running:
+                        break
 
             # Tenta reenviar mensagens que falharam (até max_retries vezes)
             if self.running and browser_initialized:
                 await self._retry_failed_messages()
 
+            # Última conciliação das confirmações antes de fechar o navegador
+            if self.running and self.async_confirmation:
+                await self.delivery_tracker.stop(self.page)
+
         except Exception as e:
             self.logger.log(f"❌ Erro durante o processamento: {str(e)}")
             raise
@@ -322,6 +856,137 @@ class WhatsAppSender:
                 except Exception as e:
                     self.logger.log(f"⚠️ Erro ao fechar recursos do navegador: {str(e)}")
 
+    def _on_delivery_update(self, phone, index, state):
+        """Reflete no armazenamento de contatos a confirmação conciliada
+
+        Args:
+            phone (str): Telefone normalizado do destinatário
+            index (int): Índice do contato na campanha
+            state (str): Um dos valores DeliveryTracker.STATE_*
+        """
+        if self.journal:
+            self.journal.append(CampaignJournal.EVENT_DELIVERY, phone, state=state)
+
+        if index is None:
+            return
+        if state == DeliveryTracker.STATE_DELIVERED:
+            self._mark_status(index, ContactStore.STATUS_DELIVERED)
+        elif state == DeliveryTracker.STATE_READ:
+            self._mark_status(index, ContactStore.STATUS_READ)
+
+    def _journal(self, event, phone, index=None, **fields):
+        """Registra um evento do contato no diário da campanha, se houver
+
+        Args:
+            event (str): Um dos valores CampaignJournal.EVENT_*
+            phone (str): Telefone do contato (normalizado aqui)
+            index (int, optional): Índice do contato na campanha
+            **fields: Dados adicionais do evento
+        """
+        if not self.journal:
+            return
+        if index is not None and self.contact_store is not None:
+            fields["row"] = self.contact_store.row(index)
+        try:
+            self.journal.append(event, PhoneNumberFormatter.normalize(phone), **fields)
+        except OSError as e:
+            self.logger.log(f"⚠️ Erro ao gravar o diário da campanha: {str(e)}")
+
+    def _record_result(self, index, phone, success, latency, attempt=1):
+        """Registra o resultado da tentativa no armazenamento de contatos e nos destinos
+
+        Args:
+            index (int): Índice do contato na campanha
+            phone (str): Telefone do contato
+            success (bool): Se o envio foi bem-sucedido
+            latency (float): Duração da tentativa em segundos
+            attempt (int): Número da tentativa (1 na primeira passagem)
+        """
+        if success:
+            status, error = ContactStore.STATUS_SENT, None
+        elif self.last_error == "invalid":
+            status, error = ContactStore.STATUS_INVALID, self.last_error
+        else:
+            status, error = ContactStore.STATUS_FAILED, self.last_error
+
+        self._publish_result(index, phone, status, error, latency, attempt)
+        if self.contact_store is None:
+            return
+
+        self.contact_store.record_attempt(index, status, error, latency)
+        self._report_to_source(index, status, error)
+
+    def _publish_result(self, index, phone, status, error=None, latency=None, attempt=1):
+        """Enfileira o resultado para os destinos configurados, sem esperar a gravação
+
+        Args:
+            index (int): Índice do contato na campanha
+            phone (str): Telefone do contato
+            status (int): Um dos valores ContactStore.STATUS_*
+            error (str, optional): Classe do erro
+            latency (float, optional): Duração da tentativa em segundos
+            attempt (int): Número da tentativa
+        """
+        if not self.results:
+            return
+        self.results.publish(
+            index=index,
+            source=self.contact_store.source(index) if self.contact_store is not None else "",
+            row=self.contact_store.row(index) if self.contact_store is not None else index + 2,
+            phone=PhoneNumberFormatter.normalize(phone),
+            status=ContactStore.STATUS_NAMES[status],
+            error=error,
+            latency=None if latency is None else round(latency, 3),
+            attempt=attempt,
+        )
+
+    def _report_to_source(self, index, status, error=None):
+        """Devolve o resultado do contato à fonte, quando ela aceita (arrendamentos)
+
+        A fonte só agenda a gravação; o retorno é verificado quando ela
+        termina, sem parar o laço de envio.
+
+        Args:
+            index (int): Índice do contato na campanha
+            status (int): Um dos valores ContactStore.STATUS_*
+            error (str, optional): Classe do erro
+        """
+        complete = getattr(self.contact_source, "complete", None)
+        if complete is None:
+            return
+        try:
+            pending = asyncio.wrap_future(complete(index, status, error))
+        except Exception as e:
+            self.logger.log(f"⚠️ Erro ao registrar o resultado na campanha compartilhada: {str(e)}")
+            return
+        pending.add_done_callback(functools.partial(self._on_source_reported, index))
+
+    def _on_source_reported(self, index, pending):
+        """Registra no log a gravação do resultado que falhou ou chegou tarde
+
+        Args:
+            index (int): Índice do contato na campanha
+            pending (asyncio.Future): Gravação agendada por _report_to_source
+        """
+        if pending.cancelled():
+            return
+        if pending.exception() is not None:
+            self.logger.log("⚠️ Erro ao registrar o resultado na campanha compartilhada: "
+                            f"{str(pending.exception())}")
+        elif not pending.result():
+            self.logger.log(f"⚠️ O arrendamento do contato {index + 1} expirou; "
+                            "outra máquina pode enviá-lo novamente")
+
+    def _mark_status(self, index, status):
+        """Registra o status do contato no armazenamento compacto, se houver
+
+        Args:
+            index (int): Índice do contato na campanha
+            status (int): Um dos valores ContactStore.STATUS_*
+        """
+        if self.contact_store is not None:
+            self.contact_store.set_status(index, status)
+
     async def _close_browser_resources(self):
         """Fecha os recursos do navegador de forma segura"""
         try:
@@ -341,6 +1006,41 @@ class WhatsAppSender:
             self.playwright = None
             self.page = None
 
+    async def _contact_batches(self, contacts, batch_size):
+        """Entrega os contatos em lotes, de uma lista ou de uma fonte em streaming
+
+        Com uma fonte em streaming, cada lote é acrescentado ao ContactStore
+        da campanha e o total da barra de progresso cresce conforme os lotes
+        chegam (a não ser que a fonte informe a contagem antes). Fontes que
+        entregam tuplas (telefone, mensagem, variáveis, linha, origem) mantêm
+        a linha e a origem da planilha; nas demais, a linha é a ordem de chegada.
+
+        Args:
+            contacts (list | ContactStore | DBContactSource): Contatos da campanha
+            batch_size (int): Tamanho do lote para listas e ContactStore
+
+        Yields:
+            tuple: (índice do primeiro contato, lista de tuplas (telefone, mensagem))
+        """
+        if not hasattr(contacts, "stream"):
+            for i in range(0, self.total_messages, batch_size):
+                yield i, contacts[i:i+batch_size]
+            return
+
+        start = 0
+        async with contextlib.aclosing(contacts.stream()) as batches:
+            async for rows in batches:
+                for offset, (phone, message, _, *origin) in enumerate(rows):
+                    row, source = origin if origin else (start + offset + 1, "")
+                    self.contact_store.append(phone, message, row, source)
+
+                if start + len(rows) > self.total_messages:
+                    self.total_messages = start + len(rows)
+                    self.progress.update(total=self.total_messages)
+
+                yield start, [(phone, message) for phone, message, *_ in rows]
+                start += len(rows)
+
     async def _retry_failed_messages(self):
         """Tenta reenviar mensagens que falharam
 
@@ -355,6 +1055,14 @@ class WhatsAppSender:
         retry_messages = self.failed_messages.copy()
         self.failed_messages = []
 
+        # Números inválidos ficam de fora da previsão de término
+        if self.contact_store is not None:
+            invalid = sum(1 for _, _, index in retry_messages
+                          if self.contact_store.get_status(index) == ContactStore.STATUS_INVALID)
+        else:
+            invalid = 0
+        self.progress.set_retries(len(retry_messages) - invalid)
+
         # Processa as mensagens com falha em lotes para melhor performance
         batch_size = min(5, len(retry_messages))  # Tamanho do lote menor para retry
 
@@ -368,34 +1076,52 @@ class WhatsAppSender:
                 # Cria um lote de mensagens com falha
                 batch = retry_messages[i:i+batch_size]
 
-                for phone, message in batch:
+                for phone, message, index in batch:
                     # Verifica se o processo foi interrompido
                     if not self.running:
                         self.logger.log("🛑 Processo de retry interrompido pelo usuário.")
                         break
 
                     # Verifica se está pausado
-                    while self.paused and self.running:
-                        await asyncio.sleep(0.5)
+                    await self._wait_if_paused()
+
+                    # Números inválidos não são reenviados
+                    if (self.contact_store is not None and
+                            self.contact_store.get_status(index) == ContactStore.STATUS_INVALID):
+                        self.failed_messages.append((phone, message, index))
+                        continue
 
                     # Verifica o número de tentativas
                     self.retry_count[phone] = self.retry_count.get(phone, 0) + 1
 
                     if self.retry_count[phone] <= self.max_retries:
+                        if not await self._wait_for_breaker():
+                            break
+                        if self.scheduler and not await self.scheduler.acquire(lambda: self.running, self._stop_event):
+                            break
+
                         self.logger.log(f"🔄 Tentativa {self.retry_count[phone]} para {phone}...")
-                        success = await self.send_message(phone, message)
+                        started = time.perf_counter()
+                        success = await self.send_message(phone, message, index=index)
+                        self._update_breaker(success)
+                        self._record_result(index, phone, success, time.perf_counter() - started,
+                                            attempt=self.retry_count[phone] + 1)
+                        self.progress.record(success, retry=True)
 
                         if success:
                             self.sent_messages += 1
+                            self._journal(CampaignJournal.EVENT_SENT, phone, index)
                         else:
-                            self.failed_messages.append((phone, message))
+                            self.failed_messages.append((phone, message, index))
+                            self._journal(CampaignJournal.EVENT_FAILED, phone, index, attempt=self.retry_count[phone])
 
                         # Pausa entre mensagens
-                        if self.running:  # Só aguarda se ainda estiver rodando
-                            await asyncio.sleep(self.wait_time)
+                        if self.running and not self.scheduler:
+                            await self._sleep(self.wait_time)
                     else:
                         self.logger.log(f"❌ Número máximo de tentativas excedido para {phone}")
-                        self.failed_messages.append((phone, message))
+                        self.failed_messages.append((phone, message, index))
+                        self.progress.set_retries(self.progress.retries - 1)
 
                 # Verifica novamente se o processo foi interrompido após o lote
                 if not self.running:
@@ -413,6 +1139,9 @@ class WhatsAppSender:
         # Atualiza o progresso final
         self.progress.update(self.total_messages)
 
+        # Garante que a conciliação em segundo plano não sobreviva ao navegador
+        await self.delivery_tracker.stop()
+
         # Fecha o navegador de forma limpa
         try:
             await self._close_browser_resources()
@@ -422,20 +1151,79 @@ class WhatsAppSender:
             # Garante que o estado seja atualizado mesmo em caso de erro
             self.running = False
 
+        # Grava a contagem da cota diária mantida em memória durante a campanha
+        if self.scheduler:
+            await self.scheduler.close()
+
+        # Grava os últimos resultados ainda na fila de publicação
+        if self.results:
+            try:
+                await self.results.close()
+                self.logger.log(f"📤 Resultados publicados: {self.results.published}")
+                if self.results.failed:
+                    self.logger.log(f"⚠️ Resultados com falha na publicação: {self.results.failed}")
+            except Exception as e:
+                self.logger.log(f"⚠️ Erro ao publicar os resultados: {str(e)}")
+
+        # Aguarda os resultados ainda não gravados na campanha compartilhada
+        flush = getattr(self.contact_source, "flush", None)
+        if flush is not None:
+            try:
+                await flush()
+            except Exception as e:
+                self.logger.log(f"⚠️ Erro ao registrar os resultados na campanha compartilhada: {str(e)}")
+
         # Relatório final
         self.logger.log("\n📊 RELATÓRIO FINAL:")
         self.logger.log(f"✅ Mensagens enviadas com sucesso: {self.sent_messages}/{self.total_messages}")
         self.logger.log(f"❌ Mensagens com falha: {len(self.failed_messages)}/{self.total_messages}")
 
+        if self.breaker.halted:
+            self.logger.log(f"🚨 Campanha encerrada pelo disjuntor: {self.breaker.reason}")
+
+        if self.delivery_tracker.records:
+            self.logger.log(f"📬 Confirmações: {self.delivery_tracker.summary()}")
+
+        for mode, label in (("url", "via URL"), ("insert", "por inserção")):
+            timings = self.text_timings[mode]
+            if timings:
+                media = sum(timings) / len(timings)
+                self.logger.log(f"⏱️ Abertura e preenchimento {label}: {media:.2f}s em média ({len(timings)} mensagens)")
+
+        if self.watchdog.recycles:
+            self.logger.log(f"♻️ Navegador: {self.watchdog.summary()}")
+
+        if self.upload_times:
+            media = sum(self.upload_times) / len(self.upload_times)
+            self.logger.log(f"📎 Anexos enviados: {len(self.upload_times)} (carregamento médio: {media:.2f}s)")
+
         if self.failed_messages:
             self.logger.log("\n⚠️ Números com falha no envio:")
-            for index, (phone, message, _) in enumerate(self.failed_messages):
-                self.logger.log(f"  - Linha {index+2}: {phone} → '{message}'")
+            for phone, message, index in self.failed_messages[:self.MAX_FAILURES_LOGGED]:
+                row = self.contact_store.row(index) if self.contact_store is not None else index + 2
+                source = self.contact_store.source(index) if self.contact_store is not None else ""
+                origem = f"{source}, linha" if source else "Linha"
+                self.logger.log(f"  - {origem} {row}: {phone} → '{message}'")
+
+            restantes = len(self.failed_messages) - self.MAX_FAILURES_LOGGED
+            if restantes > 0:
+                self.logger.log(f"  ... e mais {restantes} falhas (veja a planilha de resultado)")
+
+        # Grava o resultado de cada linha em uma cópia da planilha de origem
+        if self.contact_store is not None and self.source_path:
+            try:
+                report_path = await asyncio.to_thread(
+                    ReportExporter.export, self.source_path, self.contact_store)
+                self.logger.log(f"📄 Resultado por linha salvo em: {report_path}")
+            except Exception as e:
+                self.logger.log(f"⚠️ Erro ao gravar a planilha de resultado: {str(e)}")
 
         self.logger.log("\n🏁 Processo finalizado.")
 
         #Notificação
         if self.sent_messages > 0 or self.failed_messages:
+            from plyer import notification  # Carregado só ao final da campanha
+
             mensagem = f"{self.sent_messages} enviadas com sucesso, {len(self.failed_messages)} com falha."
             notification.notify(
                 title="TopChat – Envio Finalizado",
@@ -447,6 +1235,459 @@ class WhatsAppSender:
         self.logger.log("\n🏁 Processo finalizado.")
 
 
+    async def harvest_delivery_states(self, journal, wait_time=3, min_recheck=1800):
+        """Verifica a entrega e leitura das mensagens já enviadas
+
+        Visita, com o navegador já logado, apenas as conversas cujo estado
+        ainda não é "lida" e que não foram verificadas nos últimos
+        min_recheck segundos. O resultado é gravado no diário e exportado
+        em CSV ao final.
+
+        Args:
+            journal (CampaignJournal): Diário da campanha
+            wait_time (float): Pausa em segundos entre conversas
+            min_recheck (float): Intervalo mínimo entre verificações do mesmo telefone
+
+        Returns:
+            str | None: Caminho do relatório exportado
+        """
+        phones = journal.unresolved(min_recheck)
+        if not phones:
+            self.logger.log("📬 Nenhuma conversa com confirmação pendente para verificar.")
+            return journal.export_report()
+
+        self._begin_run()
+        self.logger.log(f"📬 Verificando confirmações de {len(phones)} conversas...")
+        self.progress.reset(len(phones))
+        self.progress.schedule = None
+        self.progress.update()
+
+        try:
+            await self.initialize_browser()
+
+            for i, phone in enumerate(phones):
+                if not self.running:
+                    self.logger.log("🛑 Verificação interrompida pelo usuário.")
+                    break
+
+                self.progress.update(i)
+                state = None
+                try:
+                    await self.page.goto(self._build_chat_url(phone), wait_until="domcontentloaded")
+                    await self.page.wait_for_selector('div.message-out', state="visible", timeout=20000)
+                    state = await self.page.evaluate(OPEN_CHAT_STATE_JS)
+                except _playwright().TimeoutError:
+                    self.logger.log(f"⚠️ Conversa com {phone} não carregou a tempo")
+                except Exception as e:
+                    self.logger.log(f"❌ Erro ao verificar {phone}: {str(e)}")
+
+                journal.append(CampaignJournal.EVENT_CHECKED, phone)
+                if state:
+                    journal.append(CampaignJournal.EVENT_DELIVERY, phone, state=state)
+                    self.logger.log(f"📬 {phone}: {state}")
+
+                if self.running and i < len(phones) - 1:
+                    await self._sleep(wait_time)
+
+            self.progress.update(len(phones))
+        finally:
+            await self._close_browser_resources()
+            self.running = False
+
+        report_path = journal.export_report()
+        self.logger.log(f"📄 Relatório de confirmações exportado: {report_path}")
+        return report_path
+
+    async def verify_contacts(self, contacts, output_path, wait_time=2):
+        """Verifica quais números da lista estão registrados no WhatsApp
+
+        Abre a conversa de cada número distinto sem texto e classifica como
+        registrado, inválido ou desconhecido (quando a página não respondeu
+        a tempo). Gera uma planilha apenas com os contatos registrados e um
+        CSV com a classificação de cada número.
+
+        Args:
+            contacts (list | ContactStore): Tuplas (telefone, mensagem)
+            output_path (str): Caminho da planilha filtrada (.xlsx)
+            wait_time (float): Pausa em segundos entre verificações
+
+        Returns:
+            dict: telefone normalizado → "registered", "invalid" ou "unknown"
+        """
+        results = {}
+        for phone, _ in contacts:
+            if re.sub(r'\D', '', str(phone)):
+                results.setdefault(PhoneNumberFormatter.normalize(phone), "unknown")
+
+        phones = list(results)
+        self._begin_run()
+        self.logger.log(f"🔎 Verificando {len(phones)} números distintos...")
+        self.progress.reset(len(phones))
+        self.progress.schedule = None
+        self.progress.update()
+
+        try:
+            await self.initialize_browser()
+
+            for i, phone in enumerate(phones):
+                if not self.running:
+                    self.logger.log("🛑 Verificação interrompida pelo usuário.")
+                    break
+
+                self.progress.update(i)
+                state = await self._check_registration(phone)
+                if state == "logout":
+                    self.logger.log("🚨 Sessão do WhatsApp desconectada. Verificação encerrada.")
+                    break
+
+                results[phone] = state
+                self.logger.log(f"🔎 {phone}: {state}")
+
+                if self.running and i < len(phones) - 1:
+                    await self._sleep(wait_time)
+
+            self.progress.update(len(phones))
+        finally:
+            await self._close_browser_resources()
+            self.running = False
+
+        self._write_verification(contacts, results, output_path)
+
+        counts = {state: list(results.values()).count(state) for state in ("registered", "invalid", "unknown")}
+        self.logger.log(f"📊 Verificação: {counts['registered']} registrados, "
+                        f"{counts['invalid']} inválidos, {counts['unknown']} desconhecidos.")
+        self.logger.log(f"📄 Planilha filtrada salva em: {output_path}")
+        return results
+
+    async def benchmark_text_modes(self, phone, length=1000, rounds=3):
+        """Compara os dois modos de preenchimento com o mesmo texto
+
+        Abre a conversa com o número `rounds` vezes em cada modo, alternando
+        a ordem a cada rodada, e mede o tempo da abertura até o texto estar
+        no campo. O texto é apagado em seguida: nada é enviado. Ao contrário
+        de text_timings, que só mede o modo escolhido para cada mensagem, os
+        dois modos recebem exatamente o mesmo texto.
+
+        Args:
+            phone (str): Telefone de uma conversa de teste
+            length (int): Tamanho do texto de teste em caracteres
+            rounds (int): Medições por modo
+
+        Returns:
+            dict: "url" e "insert" → lista de tempos em segundos
+        """
+        line = "Mensagem de teste com acentuação, pontuação e emoji 🚀 para medir o preenchimento.\n"
+        text = (line * (length // len(line) + 1))[:length].strip()
+        phone = PhoneNumberFormatter.normalize(phone)
+        timings = {"url": [], "insert": []}
+
+        self._begin_run()
+        self.logger.log(f"⏱️ Comparando URL e inserção com um texto de {len(text)} caracteres...")
+        try:
+            await self.initialize_browser()
+
+            for number in range(rounds):
+                modes = ("url", "insert") if number % 2 == 0 else ("insert", "url")
+                for mode in modes:
+                    if not self.running:
+                        break
+                    try:
+                        timings[mode].append(await self._fill_chat(phone, text, mode))
+                    except Exception as e:
+                        self.logger.log(f"⚠️ Falha na medição {mode} ({number + 1}/{rounds}): {str(e)}")
+        finally:
+            await self._close_browser_resources()
+            self.running = False
+
+        parts = []
+        for mode, label in (("url", "URL"), ("insert", "inserção")):
+            values = sorted(timings[mode])
+            if values:
+                parts.append(f"{label} {values[len(values) // 2]:.2f}s (mediana de {len(values)})")
+        if parts:
+            self.logger.log(f"⏱️ Texto de {len(text)} caracteres: {' · '.join(parts)} | "
+                            f"URL codificada com {len(quote(text))} caracteres")
+        return timings
+
+    async def _fill_chat(self, phone, text, mode):
+        """Abre a conversa e preenche o campo com o texto, sem enviar
+
+        Args:
+            phone (str): Telefone normalizado
+            text (str): Texto a preencher
+            mode (str): "url" ou "insert"
+
+        Returns:
+            float: Segundos da abertura até o texto estar no campo
+        """
+        field = 'footer div[contenteditable="true"]'
+        started = time.perf_counter()
+        await self.page.goto(self._build_chat_url(phone, text if mode == "url" else None),
+                             wait_until="domcontentloaded")
+        await self.page.wait_for_selector(field, state="visible", timeout=30000)
+        if mode == "insert":
+            await self.page.click(field)
+            await self._insert_text(text)
+        await self.page.wait_for_function(
+            "(selector) => { const f = document.querySelector(selector); "
+            "return f && f.innerText.trim().length > 0; }",
+            arg=field, timeout=30000)
+        elapsed = time.perf_counter() - started
+
+        # Apaga o rascunho para a próxima medição
+        await self.page.click(field)
+        await self.page.keyboard.press("Control+A")
+        await self.page.keyboard.press("Backspace")
+        return elapsed
+
+    async def _check_registration(self, phone):
+        """Abre a conversa sem texto e identifica se o número está registrado
+
+        Args:
+            phone (str): Telefone normalizado
+
+        Returns:
+            str: "registered", "invalid", "unknown" ou "logout"
+        """
+        try:
+            await self.page.goto(self._build_chat_url(phone), wait_until="domcontentloaded")
+            handle = await self.page.wait_for_function(REGISTRATION_STATE_JS, timeout=30000)
+            return await handle.json_value()
+        except _playwright().TimeoutError:
+            return "unknown"
+        except Exception as e:
+            self.logger.log(f"❌ Erro ao verificar {phone}: {str(e)}")
+            return "unknown"
+
+    @staticmethod
+    def _write_verification(contacts, results, output_path):
+        """Grava a planilha filtrada e o CSV com a classificação dos números
+
+        Args:
+            contacts (list | ContactStore): Tuplas (telefone, mensagem)
+            results (dict): telefone normalizado → classificação
+            output_path (str): Caminho da planilha filtrada (.xlsx)
+        """
+        registered = [
+            (phone, message) for phone, message in contacts
+            if re.sub(r'\D', '', str(phone))
+            and results.get(PhoneNumberFormatter.normalize(phone)) == "registered"
+        ]
+        ExcelReader.write_contacts(output_path, registered)
+
+        labels = {"registered": "registrado", "invalid": "inválido", "unknown": "desconhecido"}
+        csv_path = os.path.splitext(output_path)[0] + ".csv"
+        with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["telefone", "situacao"])
+            for phone, state in results.items():
+                writer.writerow([phone, labels[state]])
+
+    @property
+    def interrupted(self):
+        """Indica se a última execução foi interrompida pelo usuário
+
+        Returns:
+            bool: True se stop() foi chamado desde o início da execução
+        """
+        return self._stop_event.is_set()
+
+    async def maintain_profile(self, min_mb=0, measure=True):
+        """Compacta o perfil do navegador entre campanhas
+
+        Remove caches e histórico e compacta os bancos SQLite do perfil,
+        mantendo o login. Com `measure`, abre o WhatsApp Web em seguida
+        para medir o tempo de inicialização, que é comparado ao da última
+        abertura. O resultado vai para o log e para
+        data/profile_maintenance.jsonl, para acompanhar a evolução.
+
+        Args:
+            min_mb (float): Tamanho do perfil abaixo do qual nada é feito
+            measure (bool): Se a inicialização é medida após a compactação
+
+        Returns:
+            dict | None: Tamanhos e tempos antes e depois, ou None se nada foi feito
+        """
+        if self.running or self.browser:
+            self.logger.log("⚠️ O perfil só pode ser compactado com o navegador fechado.")
+            return None
+
+        startup_before = self.last_startup_seconds
+        try:
+            stats = await asyncio.to_thread(ProfileManager.compact, self.user_data_dir,
+                                            int(min_mb * 1024 * 1024))
+        except (OSError, RuntimeError) as e:
+            self.logger.log(f"⚠️ Erro ao compactar o perfil: {str(e)}")
+            return None
+        if stats is None:
+            return None
+
+        stats["startup_before"] = startup_before
+        stats["startup_after"] = None
+        if measure:
+            self.logger.log("⏱️ Medindo a inicialização do perfil compactado...")
+            try:
+                await self.initialize_browser(timeout=120000)
+                stats["startup_after"] = self.last_startup_seconds
+            except Exception as e:
+                self.logger.log(f"⚠️ Erro ao medir a inicialização: {str(e)}")
+            finally:
+                await self._close_browser_resources()
+
+        mb = 1024 * 1024
+        self.logger.log(f"🧹 Perfil compactado: {stats['before'] / mb:.0f} MB → {stats['after'] / mb:.0f} MB "
+                        f"({stats['removed']} caches e históricos removidos, {stats['vacuumed']} bancos compactados)")
+        if stats["startup_before"] is not None and stats["startup_after"] is not None:
+            self.logger.log(f"⏱️ Inicialização: {stats['startup_before']:.1f}s → {stats['startup_after']:.1f}s")
+
+        entry = {"ts": time.time(), "profile": self.user_data_dir}
+        entry.update(stats)
+        try:
+            with open(os.path.join(ConfigManager.get_config_dir(), "profile_maintenance.jsonl"),
+                      "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            self.logger.log(f"⚠️ Erro ao gravar o histórico de manutenção: {str(e)}")
+        return stats
+
+    def _begin_run(self):
+        """Prepara o estado e os eventos de controle para uma nova execução"""
+        self.running = True
+        self.paused = False
+        self._resume_event.set()
+        self._stop_event.clear()
+
+    async def _sleep(self, seconds):
+        """Aguarda o tempo indicado, retornando antes se o envio for interrompido
+
+        Args:
+            seconds (float): Tempo de espera em segundos
+
+        Returns:
+            bool: True se o processo continua em execução
+        """
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self.running
+
+    async def _wait_if_paused(self):
+        """Bloqueia enquanto o envio estiver pausado, sem consultas periódicas"""
+        if self.paused and self.running:
+            self.logger.log("⏸️ Envio pausado.")
+            await self._resume_event.wait()
+            self.progress.idle()  # O tempo pausado não entra na taxa de envio
+
+    def pause(self):
+        """Pausa o envio antes do próximo contato
+
+        Deve ser executado na thread do laço asyncio (ver AsyncLoopThread.call).
+        """
+        if not self.running or self.paused:
+            return
+        self.paused = True
+        self._resume_event.clear()
+
+    def resume(self):
+        """Retoma um envio pausado
+
+        Deve ser executado na thread do laço asyncio (ver AsyncLoopThread.call).
+        """
+        if not self.paused:
+            return
+        self.paused = False
+        self._resume_event.set()
+        if self.running:
+            self.logger.log("▶️ Envio retomado.")
+
+    @classmethod
+    def parse_settings(cls, settings):
+        """Valida configurações recebidas da interface ou do endpoint de controle
+
+        Args:
+            settings (dict): Nome da configuração → novo valor
+
+        Returns:
+            dict: Valores convertidos, apenas das chaves em LIVE_SETTINGS
+
+        Raises:
+            ValueError: Se alguma chave for desconhecida ou algum valor for inválido
+        """
+        parsed = {}
+        for key, value in settings.items():
+            convert = cls.LIVE_SETTINGS.get(key)
+            if convert is None:
+                raise ValueError(f"Configuração desconhecida: {key}")
+            try:
+                value = convert(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Valor inválido para {key}: {value!r}")
+            if convert is not str and value < 0:
+                raise ValueError(f"Valor negativo para {key}: {value}")
+            parsed[key] = value
+
+        try:
+            RateScheduler.parse_windows(parsed.get("send_windows"))
+            RateScheduler.parse_weekdays(parsed.get("send_weekdays"))
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Janela de envio inválida: {str(e)}")
+        return parsed
+
+    def current_settings(self):
+        """Valores em vigor das configurações ajustáveis durante a campanha
+
+        Returns:
+            dict: Nome da configuração → valor atual
+        """
+        scheduler = self.scheduler
+        settings = {"wait_time": self.wait_time, "max_retries": self.max_retries}
+        for key, attribute in self.SCHEDULER_SETTINGS.items():
+            settings[key] = getattr(scheduler, attribute, 0) if scheduler else 0
+        if scheduler:
+            settings["send_windows"] = ",".join(
+                f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+                for start, end in scheduler.windows)
+            weekdays = {index: name for name, index in RateScheduler.WEEKDAYS.items() if name != "sáb"}
+            settings["send_weekdays"] = ",".join(weekdays[day] for day in sorted(scheduler.weekdays))
+        else:
+            settings["send_windows"] = settings["send_weekdays"] = ""
+        return settings
+
+    def update_settings(self, settings):
+        """Aplica novas configurações sem reiniciar a campanha
+
+        Valem a partir do próximo envio: o intervalo e as tentativas são lidos
+        a cada contato e o agendador é reconfigurado no lugar (ou criado e
+        removido conforme algum limite fique ativo). Deve ser executado na
+        thread do laço asyncio (ver AsyncLoopThread.call).
+
+        Args:
+            settings (dict): Nome da configuração → novo valor
+        """
+        try:
+            settings = self.parse_settings(settings)
+        except ValueError as e:
+            self.logger.log(f"⚠️ {str(e)}")
+            return
+
+        if "wait_time" in settings:
+            self.wait_time = settings["wait_time"]
+        if "max_retries" in settings:
+            self.max_retries = settings["max_retries"]
+
+        limits = {self.SCHEDULER_SETTINGS[key]: value
+                  for key, value in settings.items() if key in self.SCHEDULER_SETTINGS}
+        if limits:
+            scheduler = self.scheduler or RateScheduler(profile=self.user_data_dir, logger=self.logger)
+            scheduler.reconfigure(**limits)
+            self.scheduler = scheduler if scheduler.enabled else None
+            self.progress.schedule = self.scheduler
+
+        if self.running:
+            changes = ", ".join(f"{key}={value}" for key, value in settings.items())
+            self.logger.log(f"🎛️ Configurações atualizadas: {changes}")
+
     async def stop(self):
         """Interrompe o envio e encerra imediatamente o navegador"""
         if not self.running:
@@ -454,6 +1695,14 @@ class WhatsAppSender:
 
         self.logger.log("🛑 Interrompendo o processo... Fechando navegador...")
         self.running = False
+        self.paused = False
+
+        # Acorda esperas de pausa, intervalo entre mensagens e agendador
+        self._stop_event.set()
+        self._resume_event.set()
+        stop_source = getattr(self.contact_source, "stop", None)
+        if stop_source is not None:
+            stop_source()
 
         # Cancela a task principal se existir
         if self.main_task and not self.main_task.done():